@@ -1,26 +1,313 @@
+import argparse
+import bisect
 import sqlite3
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import mplcursors
-
-# Database connection (using original SubManager.py database path)
-connection = sqlite3.connect("Desktop/NEA Test/DB_Login_Test.db")
-cursor = connection.cursor()
-
-# Only create user table for login system (don't touch existing tables)
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS User (
-        userid INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE,
-        password TEXT,
-        firstname TEXT,
-        surname TEXT
-    )""")
-connection.commit()
+from submanager_alerts import generate_renewal_alerts
+from submanager_core import (
+    MAX_BILLING_YEARS_AHEAD, ValidationError, normalise_billing_cycle, normalise_cost, parse_billing_date
+)
+from submanager_db import (
+    ID_CHUNK_SIZE, Database, delete_subscriptions, id_chunks, placeholders,
+    resolve_database_path, to_storage_date, to_display_date, update_subscriptions
+)
+from submanager_events import (
+    EventBus, Coalescer, net_changes, SUBSCRIPTION_EVENTS, ALERT_EVENTS,
+    SubscriptionsAdded, SubscriptionsUpdated, SubscriptionsDeleted, AlertsCreated, AlertsDeleted
+)
+from submanager_io import EXPORT_FORMATS, export_data, filter_conditions, import_subscriptions, read_records
+from submanager_profiling import ProfiledConnection, profile_requested, profiled, profiler, slow_log_path
+from submanager_scheduler import AlertScheduler, alert_due, MAX_TIMER_MS
+from submanager_search import search_subscription_ids
+
+# Above this many subscriptions the list switches to a paged, virtual Treeview
+VIRTUAL_LIST_THRESHOLD = 20000
+
+# Rows kept in memory either side of the visible part of the virtual list
+VIRTUAL_LIST_BUFFER = 50
+
+# Rows shown in the subscription list: id first, then the Treeview columns
+SUBSCRIPTION_ROWS_SQL = """
+    SELECT s.subscriptionid, s.subscriptionName, s.cost,
+           b.brandName, f.folderName, s.billingCycle, strftime('%d/%m/%Y', s.nextBillingDate)
+    FROM Subscription s
+    INNER JOIN Brand b ON s.brandid = b.brandid
+    INNER JOIN Folder f ON s.folderid = f.folderid
+"""
+
+# Alerts with their subscription's name, as listed on the alerts page (alerts belong
+# to their subscription's owner)
+ALERT_ROWS_SQL = """
+    SELECT a.alertid, s.subscriptionName, a.alert_date, a.alert_type, a.alert_message, a.subscriptionid
+    FROM Alert a
+    JOIN Subscription s ON a.subscriptionid = s.subscriptionid
+"""
+
+# Reminders listed individually when several fire at once
+REMINDERS_SHOWN = 5
+
+# Quiet period after the last keystroke before a search runs
+SEARCH_DEBOUNCE_MS = 150
+
+# How often the UI checks whether a background query has finished
+QUERY_POLL_MS = 15
+
+# Worker threads for background queries (each gets its own reader connection)
+QUERY_WORKERS = 2
+
+# How often the import/export status line is refreshed while one runs
+TRANSFER_PROGRESS_MS = 250
+
+# Rejected rows listed individually when an import finishes
+IMPORT_ERRORS_SHOWN = 10
+
+# How many months of recurring charges the "All Years" insights view projects
+PROJECTION_HORIZON_MONTHS = 24
+
+# How often the diagnostics panel (Ctrl+Shift+D when profiling) refreshes its figures
+DIAGNOSTICS_REFRESH_MS = 1000
+
+# SQLite's NOCASE collation folds only ASCII letters; sort keys built with this
+# put names in the same order as the paged list's ORDER BY ... COLLATE NOCASE
+NOCASE_FOLD = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# Database access, set up by open_database() before the Window is created.
+# connection/cursor are the main thread's writer; other threads use database.reader()
+database = None
+connection = None
+cursor = None
+
+
+def open_database(path=None, profile=False):
+    """Open (and migrate) the database at path, or wherever the config points.
+
+    With profile, every statement is timed and slow ones are logged beside the database.
+    """
+    global database, connection, cursor
+    path = resolve_database_path(path)
+    if profile:
+        profiler.enable(slow_log_path(path))
+    database = Database(path, factory=ProfiledConnection if profile else sqlite3.Connection)
+    connection = database.writer
+    cursor = connection.cursor()
+
+
+def run_search(worker, userid, term):
+    """Worker-thread search: ranked rows for term, or None if it needs a prefix search"""
+    subscription_ids = search_subscription_ids(worker, term, userid=userid)
+    if not subscription_ids:
+        return subscription_ids
+
+    rows = worker.execute(
+        SUBSCRIPTION_ROWS_SQL + f" WHERE s.subscriptionid IN ({placeholders(subscription_ids)})", subscription_ids
+    ).fetchall()
+    rows_by_id = {row[0]: row for row in rows}
+    return [rows_by_id[subscription_id] for subscription_id in subscription_ids if subscription_id in rows_by_id]
+
+
+def fetch_summary(worker, userid):
+    """Worker-thread query: (subscription count, total cost) for the welcome page"""
+    # One row per folder of the user's, kept up to date by triggers
+    return worker.execute("""
+        SELECT
+            COALESCE(SUM(subscriptions), 0) as total_subs,
+            COALESCE(SUM(total_pence), 0) / 100.0 as total_cost
+        FROM FolderSpend
+        WHERE userid = ?
+    """, (userid,)).fetchone()
+
+
+def fetch_catalog(worker, userid):
+    """Worker-thread query: the user's subscription rows, or None if the list must be paged"""
+    count = worker.execute("SELECT COUNT(*) FROM Subscription WHERE userid = ?", (userid,)).fetchone()[0]
+    if count > VIRTUAL_LIST_THRESHOLD:
+        return None
+    return worker.execute(SUBSCRIPTION_ROWS_SQL + " WHERE s.userid = ?", (userid,)).fetchall()
+
+
+def fetch_subscription_rows(worker, query, params=()):
+    """Worker-thread query: every row of a subscription list query"""
+    return worker.execute(query, params).fetchall()
+
+
+def load_subscription_columns(worker, userid):
+    """Worker-thread load of the user's columnar snapshot (NumPy is imported on first use)"""
+    from submanager_columns import SubscriptionColumns
+    return SubscriptionColumns.load(worker, userid)
+
+
+def refresh_subscription_columns(worker, columns, changed_ids, deleted_ids):
+    """Worker-thread re-read of written rows into a new columns snapshot"""
+    return columns.refreshed(worker, changed_ids, deleted_ids)
+
+
+def project_chart_totals(worker, columns, first_month, months):
+    """Worker-thread projection over the columns snapshot: (YYYY-MM, total) for each month with charges"""
+    totals = columns.projected_totals(first_month, months)
+    return [(month_start(first_month + offset)[:7], total)
+            for offset, total in enumerate(totals) if total > 0]
+
+
+def fetch_cost_sorted_rows(worker, columns, query, params, descending):
+    """Worker-thread query: the rows of a filter query, ordered by cost from the columns snapshot"""
+    rows = worker.execute(query, params).fetchall()
+    order = columns.cost_order([row[0] for row in rows], descending)
+    return [rows[index] for index in order]
+
+
+def generate_alerts(worker, userid, days_before, horizon_days, include_trials):
+    """Worker-thread bulk alert generation for the user; returns the new alert ids"""
+    # Readers are query-only, so the job writes through a connection of its own
+    writer = database.open_writer()
+    try:
+        return generate_renewal_alerts(writer, days_before, horizon_days, include_trials, userid=userid)
+    finally:
+        writer.close()
+
+
+def run_import(worker, userid, path, progress):
+    """Worker-thread import of a subscription file for the user; returns the ImportResult"""
+    writer = database.open_writer()
+    try:
+        return import_subscriptions(writer, read_records(path), progress=progress, userid=userid)
+    finally:
+        writer.close()
+
+
+def load_chart_libraries():
+    """Import matplotlib, mplcursors and NumPy the first time the insights page opens.
+
+    They account for most of the app's import time and only the chart needs them.
+    pyplot is never imported: figures are embedded directly in Tk.
+    """
+    global mdates, FigureCanvasTkAgg, mplcursors, Figure, setp, rcParams
+    global FuncFormatter, NullFormatter, NullLocator
+    global month_number, month_start
+    import matplotlib
+    matplotlib.use("TkAgg")
+    import matplotlib.dates as mdates
+    import mplcursors
+    from matplotlib.artist import setp
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    from matplotlib import rcParams
+    from matplotlib.ticker import FuncFormatter, NullFormatter, NullLocator
+    from submanager_projection import month_number, month_start
+
+
+class QueryRunner:
+    """Runs database reads on worker threads and hands the results back to Tk.
+
+    ``submit(key, func, *args, on_done=...)`` calls ``func(reader, *args)`` on a
+    worker with that thread's reader connection and returns the future.  When
+    it finishes, ``on_done(result)`` (or ``on_error(exception)``) is called on
+    the Tk main thread via ``after()``; worker threads never touch widgets.
+
+    Requests sharing a key replace each other: submitting again cancels the
+    previous request if it has not started, interrupts its SQL if it has, and
+    drops its result either way.  ``on_busy(True/False)`` is called as the
+    runner goes from idle to busy and back.
+
+    When profiling, each request is timed three ways: ``query`` (func on the
+    worker), ``ui`` (on_done on the Tk thread) and ``refresh`` (submit to the
+    end of on_done), the last two named by key.
+    """
+
+    def __init__(self, widget, on_busy=None, workers=QUERY_WORKERS):
+        self.widget = widget
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+
+        # Latest request per key: (generation, future)
+        self.pending = {}
+        self.generation = 0
+
+        # Reader connections currently running a request, by generation
+        self.running = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        was_idle = not self.pending
+        self.abandon(key)
+
+        self.generation += 1
+        generation = self.generation
+        future = self.executor.submit(self.run, generation, func, args)
+        self.pending[key] = (generation, future)
+        if was_idle and self.on_busy:
+            self.on_busy(True)
+
+        self.widget.after(QUERY_POLL_MS, self.poll, key, generation, future, on_done, on_error,
+                          time.perf_counter())
+        return future
+
+    def cancel(self, key):
+        """Cancel the latest request for key"""
+        if self.abandon(key) and not self.pending and self.on_busy:
+            self.on_busy(False)
+
+    def abandon(self, key):
+        """Forget the latest request for key, interrupting it if already running"""
+        generation, future = self.pending.pop(key, (None, None))
+        if future is None:
+            return False
+        if not future.cancel():
+            with self.lock:
+                worker = self.running.get(generation)
+                if worker is not None:
+                    worker.interrupt()
+        return True
+
+    def is_pending(self, key):
+        return key in self.pending
+
+    def run(self, generation, func, args):
+        worker = database.reader()
+        with self.lock:
+            self.running[generation] = worker
+        try:
+            with profiler.span("query", func.__name__):
+                return func(worker, *args)
+        finally:
+            with self.lock:
+                del self.running[generation]
+
+    def poll(self, key, generation, future, on_done, on_error, submitted):
+        if self.pending.get(key, (None,))[0] != generation:
+            return  # superseded or cancelled
+        if not future.done():
+            self.widget.after(QUERY_POLL_MS, self.poll, key, generation, future, on_done, on_error, submitted)
+            return
+
+        del self.pending[key]
+        if not self.pending and self.on_busy:
+            self.on_busy(False)
+
+        try:
+            result = future.result()
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            else:
+                messagebox.showerror("Database Error", f"Failed to load data: {str(e)}")
+            return
+        if not profiler.enabled:
+            on_done(result)
+            return
+        with profiler.span("ui", key) as span:
+            span.rows = len(result) if isinstance(result, (list, tuple)) else 0
+            on_done(result)
+        profiler.record("refresh", key, time.perf_counter() - submitted, span.rows)
+
+    def shutdown(self):
+        for key in list(self.pending):
+            self.cancel(key)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 
 class HoverInfo:
     def __init__(self, widget, text, background="#FFF9C4", borderwidth=1, relief="solid", font=("Arial", 10)):
@@ -47,6 +334,60 @@ class HoverInfo:
             self.tooltip.destroy()
             self.tooltip = None
 
+
+class DiagnosticsPanel(tk.Toplevel):
+    """Profiling figures per operation, refreshed while the panel is open"""
+
+    COLUMNS = [
+        ("kind", "Kind", 70), ("name", "Operation", 420), ("count", "Count", 60),
+        ("p50", "p50 ms", 70), ("p95", "p95 ms", 70), ("max", "Max ms", 70), ("rows", "Rows", 70),
+    ]
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("900x450")
+
+        tree_frame = tk.Frame(self)
+        tree_frame.pack(expand=True, fill="both", padx=10, pady=(10, 0))
+        self.tree = ttk.Treeview(tree_frame, columns=[column for column, _, _ in self.COLUMNS], show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="w" if column in ("kind", "name") else "e",
+                             stretch=column == "name")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", expand=True, fill="both")
+        scrollbar.pack(side="right", fill="y")
+
+        footer = tk.Frame(self)
+        footer.pack(fill="x", padx=10, pady=10)
+        tk.Label(footer, text=f"Slow operations are logged to {profiler.log_path}").pack(side="left")
+        tk.Button(footer, text="Reset", command=self.reset).pack(side="right")
+
+        self.refresh_id = None
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for stat in profiler.stats():
+            self.tree.insert("", "end", values=(
+                stat["kind"], stat["name"], stat["count"], f"{stat['p50_ms']:.1f}", f"{stat['p95_ms']:.1f}",
+                f"{stat['max_ms']:.1f}", f"{stat['rows']:.0f}"
+            ))
+        self.refresh_id = self.after(DIAGNOSTICS_REFRESH_MS, self.refresh)
+
+    def reset(self):
+        profiler.reset()
+        self.after_cancel(self.refresh_id)
+        self.refresh()
+
+    def destroy(self):
+        if self.refresh_id is not None:
+            self.after_cancel(self.refresh_id)
+        super().destroy()
+
+
 class Window(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -55,22 +396,189 @@ class Window(tk.Tk):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
-        self.frames = {
-            "Login": LoginFrame(self),
-            "SignUp": SignUpFrame(self),
-            "Welcome": WelcomeFrame(self),
-            "ExpenseInsights": ExpenseInsightsFrame(self),
-            "ViewSubscriptions": ViewSubscriptionsFrame(self),
-            "Alerts_Reminders": Alerts_RemindersFrame(self)
+        # Database reads run in the background; the bar shows while any are in flight
+        self.queries = QueryRunner(self, on_busy=self.set_busy)
+        self.busy_bar = ttk.Progressbar(self, mode="indeterminate", length=120)
+
+        # Writes are published here so every page can update itself
+        self.events = EventBus()
+
+        # Reminders fire from one timer aimed at the earliest pending alert
+        self.alert_scheduler = AlertScheduler(self.after, self.after_cancel, self.fire_alerts)
+        self.events.subscribe(self.on_alert_events, *ALERT_EVENTS)
+
+        # The logged-in account; every page shows only its subscriptions
+        self.userid = None
+
+        # Column arrays of the account's subscriptions for the chart and cost sorts,
+        # loaded the first time a page asks and then kept current from write events.
+        # columns_waiting holds the callbacks waiting while a load or refresh runs
+        self.columns = None
+        self.columns_waiting = None
+        self.columns_events = []
+        self.columns_refresh = None
+        self.events.subscribe(self.on_subscription_event, *SUBSCRIPTION_EVENTS)
+
+        # Profiling figures are only reachable from the keyboard
+        self.diagnostics = None
+        if profiler.enabled:
+            self.bind_all("<Control-Shift-D>", self.show_diagnostics)
+
+        self.frame_classes = {
+            "Login": LoginFrame,
+            "SignUp": SignUpFrame,
+            "Welcome": WelcomeFrame,
+            "ExpenseInsights": ExpenseInsightsFrame,
+            "ViewSubscriptions": ViewSubscriptionsFrame,
+            "Alerts_Reminders": Alerts_RemindersFrame
         }
-
-        for frame in self.frames.values():
-            frame.grid(row=0, column=0, sticky="nsew")
+        # Frames are built the first time they are shown, so startup only pays for the login page
+        self.frames = {}
 
         self.showFrame("Login")
 
     def showFrame(self, pageName):
+        if pageName not in self.frames:
+            frame = self.frame_classes[pageName](self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[pageName] = frame
         self.frames[pageName].tkraise()
+        self.busy_bar.lift()
+
+    def log_in(self, userid):
+        """Start the session for userid"""
+        self.userid = userid
+        self.drop_columns()
+
+        self.queries.submit(
+            "scheduler", fetch_subscription_rows,
+            "SELECT a.alertid, a.alert_date FROM Subscription s"
+            " INNER JOIN Alert a ON a.subscriptionid = s.subscriptionid"
+            " WHERE s.userid = ? AND a.fired = 0",
+            (userid,),
+            on_done=self.schedule_alerts
+        )
+
+    def with_columns(self, callback):
+        """Call callback(columns) with the account's columns snapshot, loading it first if need be"""
+        if self.columns_waiting is not None:
+            self.columns_waiting.append(callback)
+            return
+        if self.columns is not None:
+            callback(self.columns)
+            return
+
+        self.columns_waiting = [callback]
+        self.columns_events = []
+        self.queries.submit("columns", load_subscription_columns, self.userid,
+                            on_done=self.columns_loaded, on_error=self.columns_failed)
+
+    def drop_columns(self):
+        """Forget the snapshot and any load or refresh of it still running"""
+        self.queries.cancel("columns")
+        if self.columns_refresh is not None:
+            self.after_cancel(self.columns_refresh)
+        self.columns, self.columns_waiting, self.columns_events, self.columns_refresh = None, None, [], None
+
+    def columns_loaded(self, columns):
+        # Writes made while the snapshot was read may be missing from it; re-read those rows first
+        if self.columns_events:
+            self.refresh_columns(columns)
+            return
+        self.columns = columns
+        waiting, self.columns_waiting = self.columns_waiting, None
+        for callback in waiting:
+            callback(columns)
+
+    def columns_failed(self, error):
+        self.drop_columns()
+        messagebox.showerror("Database Error", f"Failed to load subscriptions: {str(error)}")
+
+    def refresh_columns(self, columns):
+        """Re-read the rows written since columns was read, on a worker"""
+        self.columns_refresh = None
+        changed_ids, deleted_ids = net_changes(self.columns_events, SubscriptionsDeleted)
+        self.columns_events = []
+        self.queries.submit("columns", refresh_subscription_columns, columns, changed_ids, deleted_ids,
+                            on_done=self.columns_loaded, on_error=self.columns_failed)
+
+    def on_subscription_event(self, event):
+        if self.columns is None and self.columns_waiting is None:
+            return  # nothing loaded yet
+        self.columns_events.append(event)
+        if self.columns_waiting is None:
+            # Pages asking from now on wait for the refresh; the events published
+            # before the next idle are re-read together
+            self.columns_waiting = []
+            self.columns_refresh = self.after_idle(self.refresh_columns, self.columns)
+
+    def schedule_alerts(self, alerts):
+        """Add (alertid, alert_date) rows to the reminder scheduler"""
+        self.alert_scheduler.add_many(
+            (alert_id, alert_due(alert_date)) for alert_id, alert_date in alerts if alert_date
+        )
+
+    def on_alert_events(self, event):
+        if isinstance(event, AlertsDeleted):
+            for alert_id in event.ids:
+                self.alert_scheduler.cancel(alert_id)
+            return
+
+        for chunk in id_chunks(event.ids):
+            cursor.execute(
+                f"SELECT alertid, alert_date FROM Alert WHERE fired = 0 AND alertid IN ({placeholders(chunk)})",
+                chunk
+            )
+            self.schedule_alerts(cursor.fetchall())
+
+    def fire_alerts(self, alert_ids):
+        """Scheduler callback: mark the alerts fired and show them"""
+        try:
+            due = []
+            for chunk in id_chunks(alert_ids):
+                # Alerts whose subscription has been deleted are marked but not shown
+                cursor.execute(
+                    "SELECT s.subscriptionName, a.alert_type, a.alert_message FROM Alert a"
+                    " JOIN Subscription s ON a.subscriptionid = s.subscriptionid"
+                    f" WHERE a.fired = 0 AND a.alertid IN ({placeholders(chunk)})"
+                    " ORDER BY a.alert_date, a.alertid",
+                    chunk
+                )
+                due.extend(cursor.fetchall())
+                cursor.execute(f"UPDATE Alert SET fired = 1 WHERE alertid IN ({placeholders(chunk)})", chunk)
+            connection.commit()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Failed to fire reminders: {str(e)}")
+            return
+
+        if not due:
+            return
+        lines = [f"{name} - {alert_type}: {message}" for name, alert_type, message in due[:REMINDERS_SHOWN]]
+        if len(due) > REMINDERS_SHOWN:
+            lines.append(f"...and {len(due) - REMINDERS_SHOWN} more")
+        self.bell()
+        messagebox.showinfo("Reminder" if len(due) == 1 else f"{len(due)} Reminders", "\n".join(lines))
+
+    def set_busy(self, busy):
+        if busy:
+            self.busy_bar.place(relx=1.0, rely=1.0, anchor="se", x=-10, y=-10)
+            self.busy_bar.lift()
+            self.busy_bar.start(15)
+            self.configure(cursor="watch")
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.place_forget()
+            self.configure(cursor="")
+
+    def show_diagnostics(self, event=None):
+        if self.diagnostics is not None and self.diagnostics.winfo_exists():
+            self.diagnostics.lift()
+        else:
+            self.diagnostics = DiagnosticsPanel(self)
+
+    def destroy(self):
+        self.queries.shutdown()
+        super().destroy()
 
 class LoginFrame(tk.Frame):
     def __init__(self, container):
@@ -91,8 +599,11 @@ class LoginFrame(tk.Frame):
         tk.Button(self, text="Create Account", command=lambda: container.showFrame("SignUp")).grid(row=5, column=2)
 
     def attempt_login(self):
-        if self.validate_fields() and self.check_credentials():
-            self.master.showFrame("Welcome")
+        if self.validate_fields():
+            userid = self.check_credentials()
+            if userid is not None:
+                self.master.log_in(userid)
+                self.master.showFrame("Welcome")
 
     def validate_fields(self):
         if not self.username_entry.get() or not self.password_entry.get():
@@ -101,12 +612,13 @@ class LoginFrame(tk.Frame):
         return True
 
     def check_credentials(self):
-        cursor.execute("SELECT password FROM User WHERE username=?", (self.username_entry.get(),))
+        """The account's userid, or None (after saying so) if the credentials are wrong"""
+        cursor.execute("SELECT userid, password FROM User WHERE username=?", (self.username_entry.get(),))
         result = cursor.fetchone()
-        if not result or result[0] != self.password_entry.get():
+        if not result or result[1] != self.password_entry.get():
             messagebox.showerror("Error", "Invalid credentials")
-            return False
-        return True
+            return None
+        return result[0]
 
 class SignUpFrame(tk.Frame):
     def __init__(self, container):
@@ -224,28 +736,33 @@ class WelcomeFrame(tk.Frame):
     summary_frame.grid(row=2, column=0, columnspan=3, pady=(30, 0), sticky="ew", padx=20)
     summary_frame.configure(bg="#F8F9FA")
 
-    # Get summary data from database
-    cursor.execute("""
-        SELECT
-            COUNT(*) as total_subs,
-            SUM(CASE
-                WHEN cost LIKE '£%' THEN CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS DECIMAL(10,2))
-                ELSE CAST(cost AS DECIMAL(10,2))
-            END) as total_cost
-        FROM Subscription
-    """)
-    total_subs, total_cost = cursor.fetchone()
-
-    # Display summary stats
-    stats_label = tk.Label(
+    # Display summary stats (filled in once the background query returns)
+    self.stats_label = tk.Label(
         summary_frame,
-        text=f"Quick Summary: {total_subs} Active Subscriptions | Total Monthly Cost: £{total_cost:.2f}",
+        text="Quick Summary: loading…",
         font=("Arial", 15),
         bg="#F8F9FA",
         fg="#2C3E50",
         pady=15
     )
-    stats_label.pack(expand=True)
+    self.stats_label.pack(expand=True)
+
+    self.queries = container.queries
+    self.userid = container.userid
+    self.load_summary()
+
+    # Any subscription write changes the totals; a burst of them reloads once
+    container.events.subscribe(Coalescer(self.after_idle, lambda events: self.load_summary()),
+                               *SUBSCRIPTION_EVENTS)
+
+  def load_summary(self):
+    self.queries.submit("summary", fetch_summary, self.userid, on_done=self.show_summary)
+
+  def show_summary(self, summary):
+    total_subs, total_cost = summary
+    self.stats_label.configure(
+        text=f"Quick Summary: {total_subs} Active Subscriptions | Total Monthly Cost: £{total_cost or 0:.2f}"
+    )
 
   def create_card(self, col, title, description, emoji, command):
     """Creates a styled card widget with hover effect"""
@@ -322,8 +839,162 @@ class WelcomeFrame(tk.Frame):
 
 
 
+class ExpenseChart:
+    """The insights bar chart, built once and updated in place.
+
+    The bars are a pool of Rectangle patches: each update moves and resizes
+    them and hides the spares.  The pool (and the single mplcursors cursor
+    over it) is only rebuilt when a period needs more bars than it holds.
+    """
+
+    BAR_WIDTH = 20  # days
+
+    def __init__(self, figure):
+        self.fig = figure
+        # Tight layout is applied as part of each draw rather than by an extra render per update
+        self.ax = figure.add_subplot(111)
+        self.bars = None
+        self.cursor = None
+        # Subplot margins by (all years view, cost label width)
+        self.layouts = {}
+
+        # Universal styling
+        self.ax.set_ylabel("Monthly Cost (£)", fontsize=12, labelpad=10)
+        self.ax.set_xlabel("Billing Period", fontsize=12, labelpad=15)
+        self.ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"£{x:,.2f}"))
+        self.ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    def ensure_capacity(self, count):
+        """Make sure the bar pool holds at least count bars"""
+        if self.bars is not None and len(self.bars) >= count:
+            return
+        if self.bars is not None:
+            self.cursor.remove()
+            self.bars.remove()
+
+        capacity = max(count, 12, 2 * len(self.bars or ()))
+        self.bars = self.ax.bar(
+            [0] * capacity, [0] * capacity, width=self.BAR_WIDTH, color='#3498DB', edgecolor='black'
+        )
+        self.cursor = mplcursors.cursor(self.bars, hover=True)
+        self.cursor.connect("add", self.on_hover)
+
+    def on_hover(self, sel):
+        # Get bar dimensions
+        bar = sel.artist.patches[sel.index]
+        if not bar.get_visible():
+            sel.annotation.set_visible(False)
+            return
+        x = bar.get_x()
+        width = bar.get_width()
+        height = bar.get_height()
+        
+        # Calculate fixed position (center top of bar)
+        mid_x = x + width/2
+        mid_y = height * 1.02  # Just above the bar
+        
+        # Format display text
+        bar_date = mdates.num2date(mid_x).strftime('%b %Y')
+        formatted_value = f"£{height:,.2f}"
+        
+        # Set annotation properties
+        sel.annotation.xy = (mid_x, mid_y)
+        sel.annotation.set(text=f"{formatted_value}\n{bar_date}")
+        sel.annotation.get_bbox_patch().set(
+            fc="white", 
+            alpha=0.9,
+            boxstyle="round,pad=0.3"
+        )
+        sel.annotation.arrow_patch.set_visible(False)  # Remove arrow
+
+    @profiled("chart", rows=lambda self, results, period: len(results))
+    def update(self, results, period):
+        """Show (YYYY-MM, total) results for period ("All Years" or a year)"""
+        ax = self.ax
+
+        # Process data
+        dates = []
+        amounts = []
+        for row in results:
+            if row[0]:
+                dates.append(mdates.date2num(datetime.strptime(row[0], "%Y-%m")))
+                amounts.append(float(row[1]))
+
+        self.ensure_capacity(len(dates))
+        for bar, (x, amount) in zip(self.bars.patches, zip(dates, amounts)):
+            bar.set_x(x - self.BAR_WIDTH / 2)
+            bar.set_width(self.BAR_WIDTH)
+            bar.set_height(amount)
+            bar.set_visible(True)
+        for bar in self.bars.patches[len(dates):]:
+            # Zero-sized as well as hidden so hover never picks them
+            bar.set_width(0)
+            bar.set_height(0)
+            bar.set_visible(False)
+
+        if dates:
+            ax.set_xlim(min(dates) - self.BAR_WIDTH, max(dates) + self.BAR_WIDTH)
+
+        if period == "All Years":
+            # Major ticks: Months
+            ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))  # Short month
+            setp(ax.xaxis.get_majorticklabels(), 
+                    rotation=0,
+                    ha='center',
+                    fontsize=10,
+                    va='bottom')
+            
+            # Minor ticks: Years
+            ax.xaxis.set_minor_locator(mdates.YearLocator())
+            ax.xaxis.set_minor_formatter(mdates.DateFormatter('%Y'))
+            setp(ax.xaxis.get_minorticklabels(),
+                    rotation=0,
+                    ha='center',
+                    fontsize=8,
+                    color='#666666',  # Gray color for years
+                    va='top')
+            
+            # Adjust spacing and padding
+            self.fig.subplots_adjust(bottom=0.25)
+            ax.tick_params(axis='x', which='major', pad=25)  # More space below months
+            ax.tick_params(axis='x', which='minor', pad=5)   # Less space below years
+
+        else:
+            # Single year formatting (undoing the All Years minor ticks and padding)
+            ax.xaxis.set_major_locator(mdates.MonthLocator())
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+            ax.xaxis.set_minor_locator(NullLocator())
+            ax.xaxis.set_minor_formatter(NullFormatter())
+            ax.tick_params(axis='x', which='major', pad=rcParams['xtick.major.pad'])
+            setp(ax.xaxis.get_majorticklabels(), 
+                    rotation=0,
+                    ha='center',
+                    va='top',
+                    fontsize=12)
+
+        top = max(amounts, default=0) * 1.1 or 1
+        ax.set_ylim(0, top)
+        ax.set_title(f"Subscription Expenses Analysis ({period})", fontsize=16)
+
+        # tight_layout costs a full layout pass, and the margins only change with
+        # the tick layout and the width of the widest cost label, so they are
+        # worked out once per combination and reused
+        layout_key = (period == "All Years", len(f"£{top:,.2f}"))
+        if layout_key not in self.layouts:
+            self.fig.tight_layout()
+            params = self.fig.subplotpars
+            self.layouts[layout_key] = dict(
+                left=params.left, right=params.right, bottom=params.bottom,
+                top=params.top, wspace=params.wspace, hspace=params.hspace
+            )
+        else:
+            self.fig.subplots_adjust(**self.layouts[layout_key])
+
+
 class ExpenseInsightsFrame(tk.Frame):
     def __init__(self, container):
+        load_chart_libraries()
         super().__init__(container)
         self.configure(bg="#FFFFFF")
         self.columnconfigure(0, weight=1)
@@ -374,168 +1045,307 @@ class ExpenseInsightsFrame(tk.Frame):
         )
         back_button.grid(row=2, column=0, pady=10)
 
-        # Initialize Plot
-        plt.switch_backend('TkAgg')
-        self.fig, self.ax = plt.subplots(figsize=(12, 7))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.viz_frame)
-        self.canvas.get_tk_widget().pack(expand=True, fill="both", padx=20, pady=20)
-
-        # Initial Load
-        self.available_years = self.get_available_years()
+        # One figure and canvas for the life of the page; updates redraw them in place
+        self.chart = ExpenseChart(Figure(figsize=(20, 9), dpi=100))
+        self.canvas = FigureCanvasTkAgg(self.chart.fig, master=self.viz_frame)
+        self.canvas.get_tk_widget().pack(expand=True, fill='both')
+        if profiler.enabled:
+            # draw_idle() renders later, so time matplotlib where it actually draws
+            self.canvas.draw = profiled("chart", "FigureCanvasTkAgg.draw")(self.canvas.draw)
+
+        # Initial Load (years first, then the chart for the selected year)
+        self.queries = container.queries
+        self.userid = container.userid
+        self.available_years = []
+        self.load_years()
+
+        # Subscription writes can move the year range and every total; reload once per burst
+        container.events.subscribe(Coalescer(self.after_idle, lambda events: self.load_years()),
+                                   *SUBSCRIPTION_EVENTS)
+
+    def load_years(self):
+        self.master.with_columns(self.show_available_years)
+
+    def show_available_years(self, columns):
+        self.available_years = self.get_available_years(*columns.billing_range())
         self.year_dropdown['values'] = ["All Years"] + sorted(self.available_years, reverse=True)
+        if self.year_var.get() != "All Years" and self.year_var.get() not in self.available_years:
+            self.year_var.set("All Years")
         self.update_visualization()
 
-    def get_available_years(self):
-        """Get distinct years from database"""
-        try:
-            cursor.execute("""
-                SELECT DISTINCT strftime('%Y', 
-                    substr(nextBillingDate, 7, 4) || '-' || 
-                    substr(nextBillingDate, 4, 2) || '-' || 
-                    substr(nextBillingDate, 1, 2)
-                ) as year
-                FROM Subscription
-                WHERE nextBillingDate IS NOT NULL
-                ORDER BY year DESC
-            """)
-            return [str(row[0]) for row in cursor.fetchall()]
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Failed to load years: {str(e)}")
+    def get_available_years(self, first_date, last_date):
+        """Get the years covered by the projected billing horizon"""
+        if not first_date:
             return []
 
+        # Recurring subscriptions keep charging after their next billing date,
+        # so every year up to the end of the projection horizon is available.
+        # Billing dates can only be so far ahead; older rows with a mistyped
+        # year must not stretch the horizon (or the year list) beyond that
+        self.first_billing_month = month_number(first_date)
+        this_month = month_number(date.today())
+        horizon_year = int(month_start(max(self.first_billing_month, this_month) + PROJECTION_HORIZON_MONTHS - 1)[:4])
+        last_year = min(max(int(last_date[:4]), horizon_year), date.today().year + MAX_BILLING_YEARS_AHEAD)
+        return [str(year) for year in range(last_year, int(first_date[:4]) - 1, -1)]
+
+    def projection_window(self):
+        """Return (first month, number of months) for the selected year"""
+        if self.year_var.get() == "All Years":
+            first_month = self.first_billing_month
+            last_month = month_number(f"{max(self.available_years)}-12")
+            return first_month, last_month - first_month + 1
+        return month_number(f"{self.year_var.get()}-01"), 12
+
     def update_visualization(self, event=None):
-        """Update the bar chart with stable tooltips"""
-        local_conn = None
-        try:
-            # Clear previous elements
-            for widget in self.viz_frame.winfo_children():
-                widget.destroy()
-
-            # Create new figure with expanded width
-            fig = plt.Figure(figsize=(20, 9), dpi=100)
-            ax = fig.add_subplot(111)
-
-            # Database connection and query
-            local_conn = sqlite3.connect("Desktop/NEA Test/DB_Login_Test.db")
-            local_cursor = local_conn.cursor()
-
-            sql = """
-                SELECT 
-                    strftime('%Y-%m', 
-                        substr(nextBillingDate, 7, 4) || '-' || 
-                        substr(nextBillingDate, 4, 2) || '-' || 
-                        substr(nextBillingDate, 1, 2)
-                    ) as month,
-                    SUM(CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS REAL)) as total
-                FROM Subscription
-                WHERE nextBillingDate IS NOT NULL 
-                AND cost IS NOT NULL 
-            """
-            params = []
-            if self.year_var.get() != "All Years":
-                sql += " AND strftime('%Y', substr(nextBillingDate, 7, 4) || '-' || substr(nextBillingDate, 4, 2) || '-' || substr(nextBillingDate, 1, 2)) = ?"
-                params.append(self.year_var.get())
-            
-            sql += " GROUP BY month ORDER BY month"
-            local_cursor.execute(sql, params)
-            results = local_cursor.fetchall()
-
-            # Process data
-            dates = []
-            amounts = []
-            for row in results:
-                if row[0]:
-                    dates.append(datetime.strptime(row[0], "%Y-%m"))
-                    amounts.append(float(row[1]))
-
-            if dates and amounts:
-                bars = ax.bar(dates, amounts, width=20, color='#3498DB', edgecolor='black')
-
-                cursor = mplcursors.cursor(bars, hover=True)
-                
-                @cursor.connect("add")
-                def _(sel):
-                    # Get bar dimensions
-                    bar = sel.artist.patches[sel.index]
-                    x = bar.get_x()
-                    width = bar.get_width()
-                    height = bar.get_height()
-                    
-                    # Calculate fixed position (center top of bar)
-                    mid_x = x + width/2
-                    mid_y = height * 1.02  # Just above the bar
-                    
-                    # Format display text
-                    bar_date = mdates.num2date(mid_x).strftime('%b %Y')
-                    formatted_value = f"£{height:,.2f}"
-                    
-                    # Set annotation properties
-                    sel.annotation.xy = (mid_x, mid_y)
-                    sel.annotation.set(text=f"{formatted_value}\n{bar_date}")
-                    sel.annotation.get_bbox_patch().set(
-                        fc="white", 
-                        alpha=0.9,
-                        boxstyle="round,pad=0.3"
-                    )
-                    sel.annotation.arrow_patch.set_visible(False)  # Remove arrow
-
-            if self.year_var.get() == "All Years":
-                # Major ticks: Months
-                ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-                ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))  # Short month
-                plt.setp(ax.xaxis.get_majorticklabels(), 
-                        rotation=0,
-                        ha='center',
-                        fontsize=10,
-                        va='bottom')
-                
-                # Minor ticks: Years
-                ax.xaxis.set_minor_locator(mdates.YearLocator())
-                ax.xaxis.set_minor_formatter(mdates.DateFormatter('%Y'))
-                plt.setp(ax.xaxis.get_minorticklabels(),
-                        rotation=0,
-                        ha='center',
-                        fontsize=8,
-                        color='#666666',  # Gray color for years
-                        va='top')
-                
-                # Adjust spacing and padding
-                fig.subplots_adjust(bottom=0.25)
-                ax.tick_params(axis='x', which='major', pad=25)  # More space below months
-                ax.tick_params(axis='x', which='minor', pad=5)   # Less space below years
+        """Project the selected period in the background, then redraw the chart"""
+        if not self.available_years:
+            self.draw_chart([])
+            return
 
-            else:
-                # Single year formatting
-                ax.xaxis.set_major_locator(mdates.MonthLocator())
-                ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
-                plt.setp(ax.xaxis.get_majorticklabels(), 
-                        rotation=0,
-                        ha='center',
-                        fontsize=12)
-
-            # Universal styling
-            ax.set_ylabel("Monthly Cost (£)", fontsize=12, labelpad=10)
-            ax.set_xlabel("Billing Period", fontsize=12, labelpad=15)
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"£{x:,.2f}"))
-            ax.set_ylim(0, max(amounts) * 1.1)
-            ax.grid(axis='y', linestyle='--', alpha=0.7)
-            ax.set_title(f"Subscription Expenses Analysis ({self.year_var.get()})", fontsize=16)
-            fig.tight_layout()
-
-            # Embed plot
-            canvas = FigureCanvasTkAgg(fig, master=self.viz_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(expand=True, fill='both')
+        first_month, months = self.projection_window()
+        # Replaces any projection still running for a previously selected year
+        self.master.with_columns(lambda columns: self.queries.submit(
+            "insights", project_chart_totals, columns, first_month, months, on_done=self.draw_chart,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to generate visualization: {str(e)}")
+        ))
 
+    def draw_chart(self, results):
+        """Update the bar chart in place and schedule a redraw"""
+        try:
+            self.chart.update(results, self.year_var.get())
+            self.canvas.draw_idle()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate visualization: {str(e)}")
-        finally:
-            if local_conn:
-                local_conn.close()
 
 
+class SortedSubscriptionIndex:
+    """Subscription rows kept in name order, maintained with bisect.
 
+    Sort keys are folded once per row (ASCII letters only, as SQLite's NOCASE
+    collation does, so the order matches the paged list) and stored alongside
+    the rows, so comparisons never re-normalise names.  Rows are
+    (subscriptionid, name, ...) tuples as returned by the subscription list query.
+    """
+
+    def __init__(self, rows=()):
+        self.rebuild(rows)
+
+    @profiled("sort", rows=lambda self, rows: len(rows))
+    def rebuild(self, rows):
+        """Sort all rows from scratch (used on a full refresh)"""
+        # Sorting on plain strings is much faster than on (name, id) tuples;
+        # the stable sort keeps equal names in id order
+        self.rows = sorted(rows, key=lambda row: row[0])
+        self.rows.sort(key=lambda row: row[1].translate(NOCASE_FOLD))
+        self.keys = [(row[1].translate(NOCASE_FOLD), row[0]) for row in self.rows]
+        self.keys_by_id = {key[1]: key for key in self.keys}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def add(self, row):
+        key = (row[1].translate(NOCASE_FOLD), row[0])
+        position = bisect.bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.rows.insert(position, row)
+        self.keys_by_id[row[0]] = key
+
+    def remove(self, subscription_id):
+        key = self.keys_by_id.pop(subscription_id, None)
+        if key is None:
+            return
+        position = bisect.bisect_left(self.keys, key)
+        del self.keys[position]
+        del self.rows[position]
+
+    def update(self, row):
+        self.remove(row[0])
+        self.add(row)
+
+    def find_prefix(self, prefix):
+        """Index of the first row whose name starts with prefix, or -1"""
+        prefix = prefix.translate(NOCASE_FOLD)
+        position = bisect.bisect_left(self.keys, (prefix,))
+        if position < len(self.keys) and self.keys[position][0].startswith(prefix):
+            return position
+        return -1
+
+    def prefix_matches(self, prefix):
+        """All rows whose name starts with prefix, in name order"""
+        prefix = prefix.translate(NOCASE_FOLD)
+        start = bisect.bisect_left(self.keys, (prefix,))
+        end = start
+        while end < len(self.keys) and self.keys[end][0].startswith(prefix):
+            end += 1
+        return self.rows[start:end]
+
+
+class VirtualSubscriptionList:
+    """Windowed view of the subscription list for very large catalogs.
+
+    Only the visible rows (plus a small buffer) are held in memory and in the
+    Treeview.  Rows are fetched with keyset pagination on
+    (subscriptionName, subscriptionid) as the user scrolls, so memory use and
+    startup stay flat however many subscriptions exist.
+    """
+
+    SELECT = SUBSCRIPTION_ROWS_SQL
+    ORDER = "s.subscriptionName COLLATE NOCASE{0}, s.subscriptionid{0}"
+    # Written out (rather than as a row value) so SQLite can seek the name index
+    AFTER = ("s.subscriptionName COLLATE NOCASE >= ?"
+             " AND (s.subscriptionName COLLATE NOCASE > ? OR s.subscriptionid > ?)")
+    BEFORE = ("s.subscriptionName COLLATE NOCASE <= ?"
+              " AND (s.subscriptionName COLLATE NOCASE < ? OR s.subscriptionid < ?)")
+
+    def __init__(self, view):
+        self.view = view
+        self.tree = view.tree
+        self.scrollbar = view.vscrollbar
+        self.active = False
+
+        self.conditions = []
+        self.params = []
+        self.total = 0
+        self.top = 0
+        self.visible_rows = 20
+
+        # Rows currently held in memory and the list offset of the first one
+        self.window = []
+        self.window_start = 0
+
+        self.tree.bind("<MouseWheel>", self.on_mousewheel, add="+")
+        self.tree.bind("<Button-4>", self.on_mousewheel, add="+")
+        self.tree.bind("<Button-5>", self.on_mousewheel, add="+")
+        self.tree.bind("<Configure>", self.on_resize, add="+")
+
+    def activate(self):
+        """Take over the Treeview's vertical scrolling"""
+        if not self.active:
+            self.active = True
+            self.scrollbar.configure(command=self.on_scrollbar)
+            self.tree.configure(yscrollcommand="")
+
+    def deactivate(self):
+        """Hand scrolling back to the Treeview"""
+        if self.active:
+            self.active = False
+            self.scrollbar.configure(command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    def show(self, conditions=(), params=()):
+        """Show the user's list, optionally narrowed by extra WHERE conditions"""
+        # Leading with the owner keeps every page on the (userid, name) index
+        self.conditions = ["s.userid = ?", *conditions]
+        self.params = [self.view.userid, *params]
+
+        # Counting the matches is the one full scan, so it runs in the background;
+        # the pages themselves are index seeks and stay on the main thread
+        self.view.queries.submit(
+            "subscriptions", fetch_subscription_rows,
+            "SELECT COUNT(*) FROM Subscription s"
+            " INNER JOIN Brand b ON s.brandid = b.brandid"
+            " INNER JOIN Folder f ON s.folderid = f.folderid" + self.where(),
+            self.params,
+            on_done=self.show_total
+        )
+
+    def show_total(self, rows):
+        self.activate()
+        self.total = rows[0][0]
+        self.window = []
+        self.window_start = 0
+        self.scroll_to(0)
+
+    def where(self, *extra):
+        conditions = self.conditions + list(extra)
+        return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def fetch_after(self, row, limit):
+        cursor.execute(
+            self.SELECT + self.where(self.AFTER) +
+            f" ORDER BY {self.ORDER.format('')} LIMIT ?",
+            self.params + [row[1], row[1], row[0], limit]
+        )
+        return cursor.fetchall()
+
+    def fetch_before(self, row, limit):
+        cursor.execute(
+            self.SELECT + self.where(self.BEFORE) +
+            f" ORDER BY {self.ORDER.format(' DESC')} LIMIT ?",
+            self.params + [row[1], row[1], row[0], limit]
+        )
+        return cursor.fetchall()[::-1]
+
+    def fetch_at(self, offset, limit):
+        # Only used for jumps (dragging the scrollbar); scrolling uses the keyset
+        cursor.execute(
+            self.SELECT + self.where() +
+            f" ORDER BY {self.ORDER.format('')} LIMIT ? OFFSET ?",
+            self.params + [limit, offset]
+        )
+        return cursor.fetchall()
+
+    def load_window(self, top):
+        """Load rows around top, reusing whatever overlaps the current window"""
+        start = max(0, top - VIRTUAL_LIST_BUFFER)
+        size = self.visible_rows + 2 * VIRTUAL_LIST_BUFFER
+        window_end = self.window_start + len(self.window)
+
+        if self.window and self.window_start < start <= window_end:
+            kept = self.window[start - self.window_start:]
+            rows = kept + self.fetch_after(self.window[-1], size - len(kept))
+        elif self.window and start < self.window_start < start + size:
+            kept = self.window[:start + size - self.window_start]
+            rows = self.fetch_before(self.window[0], self.window_start - start) + kept
+        else:
+            rows = self.fetch_at(start, size)
+
+        self.window = rows
+        self.window_start = start
+
+    def scroll_to(self, top):
+        top = max(0, min(top, self.total - self.visible_rows))
+        end = min(top + self.visible_rows, self.total)
+        window_end = self.window_start + len(self.window)
+        if top < self.window_start or end > window_end:
+            self.load_window(top)
+
+        self.top = top
+        self.view.render_rows(self.window[top - self.window_start:end - self.window_start])
+        if self.total:
+            self.scrollbar.set(top / self.total, end / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif unit == "pages":
+            self.scroll_to(self.top + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.top + int(amount))
 
+    def on_mousewheel(self, event):
+        if not self.active:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 3)
+        else:
+            self.scroll_to(self.top + 3)
+        return "break"
+
+    def on_resize(self, event):
+        if not self.active:
+            return
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # Leave room for the heading row
+        visible_rows = max(1, (event.height - row_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.top)
 
 
 class ViewSubscriptionsFrame(tk.Frame):
@@ -587,6 +1397,22 @@ class ViewSubscriptionsFrame(tk.Frame):
                                     command=self.refresh_treeview)
     self.Refresh_button.pack(side=tk.LEFT, padx=5)
 
+    # Import Button
+    self.Import_button = tk.Button(controls_frame, text="⇪ Import", 
+                                    command=self.import_file)
+    self.Import_button.pack(side=tk.LEFT, padx=5)
+
+    # Export Button
+    self.Export_button = tk.Button(controls_frame, text="⇩ Export", 
+                                    command=self.create_export_modal)
+    self.Export_button.pack(side=tk.LEFT, padx=5)
+
+    # Import/export progress, blank when neither is running
+    self.transfer_status = tk.Label(controls_frame, text="", fg="#7F8C8D")
+    self.transfer_status.pack(side=tk.LEFT, padx=5)
+    self.import_progress = None
+    self.export_progress = None
+
     # Search (right side)
     search_frame = tk.Frame(controls_frame)
     search_frame.pack(side=tk.RIGHT, padx=5)
@@ -607,9 +1433,9 @@ class ViewSubscriptionsFrame(tk.Frame):
     self.tree.grid(row=0, column=0, sticky="nsew")
 
     # Vertical Scrollbar
-    vscrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-    vscrollbar.grid(row=0, column=1, sticky="ns")
-    self.tree.configure(yscrollcommand=vscrollbar.set)
+    self.vscrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+    self.vscrollbar.grid(row=0, column=1, sticky="ns")
+    self.tree.configure(yscrollcommand=self.vscrollbar.set)
 
     # Horizontal Scrollbar
     hscrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
@@ -634,126 +1460,349 @@ class ViewSubscriptionsFrame(tk.Frame):
     self.tree.heading('billingCycle', text='Billing Cycle')
     self.tree.heading('nextBillingDate', text='Billing Date')
 
+    # Every query that fills the list shares the "subscriptions" key, so the
+    # latest refresh, filter or search replaces any still in flight
+    self.queries = container.queries
+    self.userid = container.userid
+
+    # Writes (from this page or anywhere else) arrive as events and are applied
+    # to the list in one batch once the UI is idle
+    self.events = container.events
+    self.events.subscribe(Coalescer(self.after_idle, self.on_subscription_events), *SUBSCRIPTION_EVENTS)
+
+    # What is currently on screen, keyed by subscriptionid (as the Treeview iid)
+    self.rendered_rows = {}
+    self.rendered_order = []
+
+    # Paged view used instead once the catalog is too big to load at once
+    self.virtual_list = VirtualSubscriptionList(self)
+    self.large_catalog = False
+
+    # Name-ordered rows, updated in place as subscriptions are saved/edited/deleted
+    self.sorted_index = SortedSubscriptionIndex()
+
     self.populate_tree()
 
     self.filter_modal = None
 
+    # Pending debounce timer for search-as-you-type
+    self.search_after_id = None
+
     self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
 
 
 
   def binary_search_prefix(self, prefix):
     """Find first occurrence of prefix using binary search"""
-    low = 0
-    high = len(self.sorted_subs) - 1
-    prefix = prefix.lower()
-    first_match = -1
-    
-    while low <= high:
-        mid = (low + high) // 2
-        current_name = self.sorted_subs[mid][1].lower()
-        
-        if current_name.startswith(prefix):
-            first_match = mid
-            high = mid - 1  # Look for earlier matches
-        elif current_name < prefix:
-            low = mid + 1
-        else:
-            high = mid - 1
-            
-    return first_match
+    return self.sorted_index.find_prefix(prefix)
 
 
-  def merge_sort(self, arr):
-    """Merge sort implementation for subscription names"""
-    if len(arr) <= 1:
-        return arr
-    
-    mid = len(arr) // 2
-    left = self.merge_sort(arr[:mid])
-    right = self.merge_sort(arr[mid:])
-    
-    return self.merge(left, right)
-
-  def merge(self, left, right):
-    result = []
-    i = j = 0
-
-    while i < len(left) and j < len(right):
-        if left[i][1].lower() < right[j][1].lower():  # Compare names
-            result.append(left[i])
-            i += 1
-        else:
-            result.append(right[j])
-            j += 1
-
-    result.extend(left[i:])
-    result.extend(right[j:])
-    return result  
-  
-  
-  
   def populate_tree(self):
     self.refresh_treeview()
 
 
 
+  def longest_increasing_run(self, positions):
+    """Indices of a longest increasing subsequence of positions (patience sorting)"""
+    tails = []
+    tail_indices = []
+    previous = [-1] * len(positions)
+
+    for i, position in enumerate(positions):
+        slot = bisect.bisect_left(tails, position)
+        if slot == len(tails):
+            tails.append(position)
+            tail_indices.append(i)
+        else:
+            tails[slot] = position
+            tail_indices[slot] = i
+        previous[i] = tail_indices[slot - 1] if slot > 0 else -1
+
+    run = set()
+    i = tail_indices[-1] if tail_indices else -1
+    while i != -1:
+        run.add(i)
+        i = previous[i]
+    return run
+
+  @profiled("treeview", rows=lambda self, rows: len(rows))
+  def render_rows(self, rows):
+    """Reconcile the Treeview with rows, only issuing Tk calls for what changed"""
+    new_order = [str(row[0]) for row in rows]
+    new_rows = {str(row[0]): tuple(row[1:]) for row in rows}
+
+    # Removed rows go in a single delete call
+    removed = [iid for iid in self.rendered_order if iid not in new_rows]
+    if removed:
+        self.tree.delete(*removed)
+        for iid in removed:
+            del self.rendered_rows[iid]
+
+    # Changed rows are updated in place
+    for iid, values in new_rows.items():
+        current = self.rendered_rows.get(iid)
+        if current is not None and current != values:
+            self.tree.item(iid, values=values)
+            self.rendered_rows[iid] = values
+
+    # Rows already in the right relative order stay put; everything else is
+    # inserted or moved directly after its predecessor in the new order
+    remaining = [iid for iid in self.rendered_order if iid in new_rows]
+    new_positions = {iid: index for index, iid in enumerate(new_order)}
+    if remaining == [iid for iid in new_order if iid in self.rendered_rows]:
+        stable = set(remaining)
+    else:
+        run = self.longest_increasing_run([new_positions[iid] for iid in remaining])
+        stable = {remaining[i] for i in run}
+
+    previous = None
+    for iid in new_order:
+        if iid not in stable:
+            if iid in self.rendered_rows:
+                # Detach first so the target index is unambiguous
+                self.tree.detach(iid)
+            index = self.tree.index(previous) + 1 if previous is not None else 0
+            if iid in self.rendered_rows:
+                self.tree.move(iid, '', index)
+            else:
+                self.tree.insert('', index, iid=iid, text=iid, values=new_rows[iid])
+                self.rendered_rows[iid] = new_rows[iid]
+        previous = iid
+
+    self.rendered_order = new_order
+
   def refresh_treeview(self):
-    # Clear existing items
-    for item in self.tree.get_children():
-        self.tree.delete(item)
+    self.queries.submit("subscriptions", fetch_catalog, self.userid, on_done=self.show_catalog)
 
-    # Fetch raw data
-    cursor.execute("""
-        SELECT s.subscriptionid, s.subscriptionName, s.cost, 
-               b.brandName, f.folderName, s.billingCycle, s.nextBillingDate
-        FROM Subscription s
-        INNER JOIN Brand b ON s.brandid = b.brandid
-        INNER JOIN Folder f ON s.folderid = f.folderid
-    """)
-    raw_data = cursor.fetchall()
-    
-    # Sort using merge sort
-    self.sorted_subs = self.merge_sort(raw_data)
+  def import_file(self):
+    path = filedialog.askopenfilename(
+        title="Import Subscriptions",
+        filetypes=[("Subscription files", "*.csv *.json *.jsonl *.ndjson"), ("All files", "*.*")]
+    )
+    if not path:
+        return
+
+    # The import writes, so it is never superseded; one runs at a time
+    self.Import_button['state'] = tk.DISABLED
+    self.import_progress = None
+    self.queries.submit("import", run_import, self.userid, path, self.record_import_progress,
+                        on_done=self.show_import_result, on_error=self.show_import_error)
+    self.show_transfer_progress("import", self.describe_import)
+
+  def record_import_progress(self, result):
+    # Called on the worker thread: just keep the latest counts for the UI to show
+    self.import_progress = (result.rows, len(result.imported), len(result.errors))
+
+  def describe_import(self):
+    if not self.import_progress:
+        return "Importing..."
+    rows, imported, rejected = self.import_progress
+    return f"Importing... {rows:,} rows read, {imported:,} added, {rejected:,} rejected"
+
+  def show_transfer_progress(self, key, describe):
+    """Keep the status line up to date while the import or export under key runs"""
+    if not self.queries.is_pending(key):
+        return
+    self.transfer_status.config(text=describe())
+    self.after(TRANSFER_PROGRESS_MS, self.show_transfer_progress, key, describe)
+
+  def show_import_result(self, result):
+    self.Import_button['state'] = tk.NORMAL
+    self.transfer_status.config(text="")
+    self.events.publish(SubscriptionsAdded(tuple(result.imported)))
+
+    summary = f"{len(result.imported):,} of {result.rows:,} subscriptions imported."
+    if result.errors:
+        summary += f"\n\n{len(result.errors):,} rows were rejected:\n"
+        summary += "\n".join(f"Row {row}: {message}" for row, message in result.errors[:IMPORT_ERRORS_SHOWN])
+        if len(result.errors) > IMPORT_ERRORS_SHOWN:
+            summary += "\n..."
+    if result.failure:
+        messagebox.showerror("Import Stopped", f"{summary}\n\nThe import stopped early: {result.failure}")
+    elif result.errors:
+        messagebox.showwarning("Import Finished", summary)
+    else:
+        messagebox.showinfo("Import Finished", summary)
+
+  def show_import_error(self, error):
+    self.Import_button['state'] = tk.NORMAL
+    self.transfer_status.config(text="")
+    messagebox.showerror("Import Error", f"Failed to import subscriptions: {str(error)}")
+
+  @profiled("modal")
+  def create_export_modal(self):
+    modal = tk.Toplevel(self)
+    modal.title("Export")
+    modal.geometry("420x300+400+200")
+    modal.resizable(False, False)
+    modal.columnconfigure(1, weight=1)
+
+    datasets = {"Subscriptions": "subscriptions", "Alerts": "alerts", "Projected Spend": "spend"}
+    formats = dict(zip(["CSV", "JSON Lines", "SQLite Snapshot"], EXPORT_FORMATS))
+
+    tk.Label(modal, text="Export:").grid(row=0, column=0, padx=10, pady=(15, 5), sticky="w")
+    dataset_combobox = ttk.Combobox(modal, values=list(datasets), state="readonly", width=25)
+    dataset_combobox.set("Subscriptions")
+    dataset_combobox.grid(row=0, column=1, padx=10, pady=(15, 5), sticky="w")
+
+    tk.Label(modal, text="Format:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+    format_combobox = ttk.Combobox(modal, values=list(formats), state="readonly", width=25)
+    format_combobox.set("CSV")
+    format_combobox.grid(row=1, column=1, padx=10, pady=5, sticky="w")
+
+    # Same filters as the Filter dialog
+    tk.Label(modal, text="Brand:").grid(row=2, column=0, padx=10, pady=5, sticky="w")
+    brand_combobox = ttk.Combobox(modal, width=25)
+    brand_combobox.grid(row=2, column=1, padx=10, pady=5, sticky="w")
+
+    tk.Label(modal, text="Folder Type:").grid(row=3, column=0, padx=10, pady=5, sticky="w")
+    folder_combobox = ttk.Combobox(modal, width=25)
+    folder_combobox.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+
+    tk.Label(modal, text="Billing Cycle:").grid(row=4, column=0, padx=10, pady=5, sticky="w")
+    cycle_combobox = ttk.Combobox(modal, width=25)
+    cycle_combobox.grid(row=4, column=1, padx=10, pady=5, sticky="w")
+
+    self.populate_filter_choices(brand_combobox, folder_combobox, cycle_combobox)
+
+    tk.Label(modal, text="A SQLite snapshot holds the subscriptions with their alerts.",
+             fg="#7F8C8D", font=("Arial", 8)).grid(row=5, column=0, columnspan=2, padx=10, sticky="w")
+
+    export_button = tk.Button(
+        modal, text="Export...", bg="#4CAF50", fg="black", width=20, height=2,
+        command=lambda: self.start_export(
+            modal, datasets[dataset_combobox.get()], formats[format_combobox.get()],
+            *self.selected_filters(brand_combobox, folder_combobox, cycle_combobox)
+        )
+    )
+    export_button.grid(row=6, column=0, columnspan=2, pady=15)
+
+    modal.transient(self.master)
+    modal.grab_set()
+
+  def start_export(self, modal, dataset, file_format, brand, folder, billing_cycle):
+    extensions = {"csv": ".csv", "jsonl": ".jsonl", "sqlite": ".db"}
+    path = filedialog.asksaveasfilename(
+        parent=modal,
+        title="Export To",
+        defaultextension=extensions[file_format],
+        initialfile=("subscriptions" if file_format == "sqlite" else dataset) + extensions[file_format],
+        filetypes=[("Export files", "*" + extensions[file_format]), ("All files", "*.*")]
+    )
+    if not path:
+        return
+    modal.destroy()
+
+    # Reads on a worker's connection; one export runs at a time
+    self.Export_button['state'] = tk.DISABLED
+    self.export_progress = 0
+    self.queries.submit("export", export_data, path, dataset, file_format, brand, folder, billing_cycle,
+                        self.record_export_progress, self.userid,
+                        on_done=lambda written: self.show_export_result(path, written),
+                        on_error=self.show_export_error)
+    self.show_transfer_progress("export", lambda: f"Exporting... {self.export_progress:,} rows written")
+
+  def record_export_progress(self, written):
+    # Called on the worker thread
+    self.export_progress = written
+
+  def show_export_result(self, path, written):
+    self.Export_button['state'] = tk.NORMAL
+    self.transfer_status.config(text="")
+    messagebox.showinfo("Export Finished", f"{written:,} rows exported to {path}")
+
+  def show_export_error(self, error):
+    self.Export_button['state'] = tk.NORMAL
+    self.transfer_status.config(text="")
+    messagebox.showerror("Export Error", f"Failed to export: {str(error)}")
+
+  def show_catalog(self, raw_data):
+    # Large catalogs are paged in from the database instead of loaded whole
+    self.large_catalog = raw_data is None
+    if self.large_catalog:
+        self.sorted_index.rebuild([])
+        self.virtual_list.show()
+        return
+    self.virtual_list.deactivate()
     
-    # Store for binary search
-    self.all_subscriptions = self.sorted_subs
+    # Sort once; later writes update the index in place
+    self.sorted_index.rebuild(raw_data)
     
-    # Insert into treeview
-    for row in self.sorted_subs:
-        self.tree.insert('', 'end', text=row[0], values=row[1:])
+    # Apply only the differences to the treeview
+    self.render_rows(self.sorted_index.rows)
+
+  def on_subscription_events(self, events):
+    changed_ids, deleted_ids = net_changes(events, SubscriptionsDeleted)
+    self.apply_subscription_changes(changed_ids, deleted_ids)
+
+  def apply_subscription_changes(self, changed_ids=(), deleted_ids=()):
+    """Bring the sorted index and the treeview up to date after rows were written"""
+    # A list still loading may have been read before this write, so reload it
+    if self.large_catalog or self.queries.is_pending("subscriptions"):
+        self.refresh_treeview()
+        return
+
+    for subscription_id in deleted_ids:
+        self.sorted_index.remove(subscription_id)
+
+    for subscription_id in changed_ids:
+        cursor.execute(SUBSCRIPTION_ROWS_SQL + " WHERE s.subscriptionid = ?", (subscription_id,))
+        row = cursor.fetchone()
+        if row:
+            self.sorted_index.update(row)
+        else:
+            self.sorted_index.remove(subscription_id)
+
+    self.render_rows(self.sorted_index.rows)
 
   def handle_search(self, event):
+    # Restart the quiet period on every keystroke; only the last one searches
+    if self.search_after_id is not None:
+        self.after_cancel(self.search_after_id)
+    self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.start_search)
+
+  def start_search(self):
+    self.search_after_id = None
     search_term = self.search_var.get().strip().lower()
     
-    # Clear current items
-    for item in self.tree.get_children():
-        self.tree.delete(item)
-    
     if not search_term:
         self.refresh_treeview()
         return
+
+    # Ranked substring / typo-tolerant matching runs off the Tk main loop
+    self.queries.submit(
+        "subscriptions", run_search, self.userid, search_term,
+        on_done=lambda ranked_rows: self.show_search(search_term, ranked_rows),
+        on_error=lambda e: messagebox.showerror("Database Error", f"Search failed: {str(e)}")
+    )
+
+  def show_search(self, search_term, ranked_rows):
+    if ranked_rows is not None:
+        self.show_search_results(ranked_rows)
+    else:
+        self.show_prefix_matches(search_term)
+
+  def show_prefix_matches(self, search_term):
+    """Fallback for terms too short for the trigram index"""
+    if self.large_catalog:
+        # Prefix range on the name index
+        self.virtual_list.show(
+            ["s.subscriptionName COLLATE NOCASE >= ?", "s.subscriptionName COLLATE NOCASE < ?"],
+            [search_term, search_term + "\U0010ffff"]
+        )
+        return
     
-    # Binary search for prefix
-    first_index = self.binary_search_prefix(search_term)
-    
-    if first_index == -1:
-        return  # No matches
-    
-    # Collect all matches
-    matches = []
-    current_index = first_index
-    while current_index < len(self.sorted_subs):
-        sub_name = self.sorted_subs[current_index][1].lower()
-        if sub_name.startswith(search_term):
-            matches.append(self.sorted_subs[current_index])
-            current_index += 1
-        else:
-            break
+    # Binary search for the prefix range in the sorted index
+    matches = self.sorted_index.prefix_matches(search_term)
     
     # Display matches
-    for sub in matches:
-        self.tree.insert('', 'end', text=sub[0], values=sub[1:])
+    self.render_rows(matches)
+
+  def show_search_results(self, rows):
+    """Show search results in ranked order"""
+    # Results are capped, so a large catalog can show them without paging
+    self.virtual_list.deactivate()
+    self.render_rows(rows)
 
 
   def on_tree_select(self, event):
@@ -772,19 +1821,23 @@ class ViewSubscriptionsFrame(tk.Frame):
         return
 
     if messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete the selected subscription(s)?"):
-        for item in selected_items:
-            subscription_id = self.tree.item(item)['text']
-            sql = "DELETE FROM Subscription WHERE subscriptionid = ?"
-            cursor.execute(sql, (subscription_id,))
+        deleted_ids = [int(self.tree.item(item)['text']) for item in selected_items]
+        try:
+            # Their alerts go in the same transaction
+            alert_ids = delete_subscriptions(connection, deleted_ids)
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            messagebox.showerror("Database Error", f"Failed to delete the subscription(s): {str(e)}")
+            return
 
-        connection.commit()
-        self.refresh_treeview()
+        self.events.publish(SubscriptionsDeleted(tuple(deleted_ids)))
+        if alert_ids:
+            self.events.publish(AlertsDeleted(tuple(alert_ids)))
         messagebox.showinfo("Success", "Subscription(s) deleted successfully.")
-    
-    connection.commit()
-    self.refresh_treeview()  # Triggers merge sort
 
 
+  @profiled("modal")
   def create_edit_modal(self):
     selected_items = self.tree.selection()
 
@@ -793,9 +1846,10 @@ class ViewSubscriptionsFrame(tk.Frame):
         messagebox.showerror("Error", "Please select a subscription to edit.")
         return
 
-    # Handle multiple selections: Only edit the first selected item
+    # Several selected: edit the fields they share in one go
     if len(selected_items) > 1:
-        messagebox.showwarning("Warning", "Multiple items selected. Editing only the first selected subscription.")
+        self.create_bulk_edit_modal([int(self.tree.item(item, 'text')) for item in selected_items])
+        return
 
     item = selected_items[0]
     values = self.tree.item(item, 'values')
@@ -857,10 +1911,91 @@ class ViewSubscriptionsFrame(tk.Frame):
 
     edit_modal.transient(self.master)
     edit_modal.grab_set()
-    self.wait_window(edit_modal)
 
 
 
+  @profiled("modal")
+  def create_bulk_edit_modal(self, subscription_ids):
+    edit_modal = tk.Toplevel(self)
+    edit_modal.title("Edit Subscriptions")
+    edit_modal.geometry("500x420+400+200")
+    edit_modal.resizable(False, False)
+
+    label = tk.Label(edit_modal, text=f"Editing {len(subscription_ids):,} subscriptions."
+                     " Fields left blank are not changed.")
+    label.grid(row=0, column=0, padx=10, pady=(15, 5), sticky="w")
+
+    # Cost
+    label = tk.Label(edit_modal, text="Set Subscription Cost:")
+    label.grid(row=1, column=0, padx=10, pady=5, sticky="w")
+    self.edit_subscription_cost_box = tk.Entry(edit_modal)
+    self.edit_subscription_cost_box.grid(row=2, column=0, padx=10, pady=5, sticky="ew")
+
+    # Brand
+    label = tk.Label(edit_modal, text="Set Subscription Brand:")
+    label.grid(row=3, column=0, padx=10, pady=5, sticky="w")
+    self.edit_brand_box = tk.Entry(edit_modal)
+    self.edit_brand_box.grid(row=4, column=0, padx=10, pady=5, sticky="ew")
+
+    # Folder Type
+    label = tk.Label(edit_modal, text="Set Folder Type:")
+    label.grid(row=5, column=0, padx=10, pady=5, sticky="w")
+    self.edit_folder_type_box = tk.Entry(edit_modal)
+    self.edit_folder_type_box.grid(row=6, column=0, padx=10, pady=5, sticky="ew")
+
+    # Billing Cycle (blank keeps each subscription's own)
+    label = tk.Label(edit_modal, text="Set Billing Cycle:")
+    label.grid(row=7, column=0, padx=10, pady=5, sticky="w")
+    self.edit_billing_cycle_combobox = ttk.Combobox(edit_modal, width=27, state="readonly")
+    self.edit_billing_cycle_combobox.grid(row=8, column=0, padx=10, pady=5, sticky="ew")
+    self.edit_billing_cycle_combobox['values'] = ('', 'Daily', 'Weekly', 'Monthly', 'Yearly', 'Custom')
+    self.edit_billing_cycle_combobox.bind("<<ComboboxSelected>>", self.on_edit_billing_cycle_select)
+
+    update_button = tk.Button(edit_modal, text="Update All",
+                            command=lambda: self.bulk_edit_data(subscription_ids, edit_modal))
+    update_button.grid(row=9, column=0, padx=10, pady=20)
+
+    edit_modal.transient(self.master)
+    edit_modal.grab_set()
+
+  def bulk_edit_data(self, subscription_ids, edit_modal):
+    """Apply the filled-in fields to every selected subscription in one transaction"""
+    cost = self.edit_subscription_cost_box.get().strip()
+    brand = self.edit_brand_box.get().strip()
+    folder_type = self.edit_folder_type_box.get().strip()
+    billing_cycle = self.edit_billing_cycle_combobox.get().strip()
+
+    if not any([cost, brand, folder_type, billing_cycle]):
+        messagebox.showerror("Error", "Fill in at least one field to change")
+        return
+
+    changes = {}
+    try:
+        if cost:
+            changes["cost"] = normalise_cost(cost)
+        if billing_cycle:
+            changes["billingCycle"] = normalise_billing_cycle(billing_cycle)
+    except ValidationError as e:
+        messagebox.showerror("Error", str(e))
+        return
+
+    try:
+        if brand:
+            changes["brandid"] = self.insert_or_get_brand(brand)
+        if folder_type:
+            changes["folderid"] = self.insert_or_get_folder(folder_type)
+        update_subscriptions(connection, subscription_ids, changes)
+        connection.commit()
+    except sqlite3.Error as e:
+        connection.rollback()
+        database.forget_names()
+        messagebox.showerror("Database Error", f"An error occurred while updating the subscriptions: {str(e)}")
+        return
+
+    self.events.publish(SubscriptionsUpdated(tuple(subscription_ids)))
+    messagebox.showinfo("Success", f"{len(subscription_ids):,} subscriptions updated successfully!")
+    edit_modal.destroy()
+
   def edit_data(self, subscription_id, edit_modal):
     try:
         subscription = self.edit_subscription_name_box.get().strip()
@@ -875,26 +2010,12 @@ class ViewSubscriptionsFrame(tk.Frame):
             messagebox.showerror("Error", "All fields must be filled")
             return
 
-        # Validate cost format
-        if subscription_cost.startswith('£'):
-            subscription_cost = subscription_cost[1:]
+        # Same cost and date rules as adding a subscription
         try:
-            cost_float = float(subscription_cost)
-            if cost_float <= 0:
-                raise ValueError
-            subscription_cost = f"£{cost_float:.2f}"
-        except ValueError:
-            messagebox.showerror("Error", "Invalid cost format")
-            return
-
-        # Validate date format
-        try:
-            billing_date_obj = datetime.strptime(billing_date, "%d/%m/%Y").date()
-            if billing_date_obj <= date.today():
-                messagebox.showerror("Error", "Billing date must be in the future")
-                return
-        except ValueError:
-            messagebox.showerror("Error", "Invalid date format. Use DD/MM/YYYY")
+            subscription_cost = normalise_cost(subscription_cost)
+            billing_date = parse_billing_date(billing_date).strftime("%d/%m/%Y")
+        except ValidationError as e:
+            messagebox.showerror("Error", str(e))
             return
 
         # Get or create folder and brand IDs
@@ -908,21 +2029,21 @@ class ViewSubscriptionsFrame(tk.Frame):
         WHERE subscriptionid = ?
         """
         cursor.execute(sql, (subscription, subscription_cost, brandid, folderid,
-                           billing_cycle, billing_date, subscription_id))
+                           billing_cycle, to_storage_date(billing_date), subscription_id))
         connection.commit()
 
-        self.refresh_treeview()
+        self.events.publish(SubscriptionsUpdated((int(subscription_id),)))
         messagebox.showinfo("Success", "Subscription updated successfully!")
         edit_modal.destroy()
 
     except sqlite3.Error as e:
+        connection.rollback()
+        database.forget_names()
         messagebox.showerror("Database Error", f"An error occurred while updating the subscription: {str(e)}")
     except Exception as e:
         messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
-    
-    connection.commit()
-    self.refresh_treeview()  # Triggers merge sort
 
+  @profiled("modal")
   def create_subscription_modal(self):
     modal = tk.Toplevel(self)
 
@@ -1023,8 +2144,6 @@ class ViewSubscriptionsFrame(tk.Frame):
 
     modal.grab_set()
 
-    self.wait_window(modal)
-
 
 
    # self.label = tk.Label(self, text = "Subscription 1   £xxxx.xx   Today", borderwidth =2, relief = "solid")
@@ -1032,6 +2151,7 @@ class ViewSubscriptionsFrame(tk.Frame):
     #self.label.grid(column = 0, row = 3, sticky = 'nsew', columnspan = 2)
 
 
+  @profiled("modal")
   def handle_custom_billing_cycle_modal(self, is_edit_mode=False):
     """
     Create a modal for setting a custom billing cycle
@@ -1148,6 +2268,10 @@ class ViewSubscriptionsFrame(tk.Frame):
 
   def save_data(self):
 
+    # Validation normalises the cost and date boxes, so read them afterwards
+    if not self.validate_input():
+        return
+
     subscription = self.subscription_name_box.get()
 
     subscription_cost = self.subscription_cost_box.get()
@@ -1160,11 +2284,6 @@ class ViewSubscriptionsFrame(tk.Frame):
 
     billing_date = self.billing_date_box.get()
 
-
-
-    if not self.validate_input():
-        return
-
     # Print values (for testing)
 
     print("Subscription Name:", subscription)
@@ -1185,15 +2304,12 @@ class ViewSubscriptionsFrame(tk.Frame):
 
     brandid = self.insert_or_get_brand(brand)
 
-    self.insert_subscription(subscription, subscription_cost, brandid, folderid, billing_cycle, billing_date)
+    subscription_id = self.insert_subscription(subscription, subscription_cost, brandid, folderid, billing_cycle, billing_date)
 
-    self.refresh_treeview()
+    self.events.publish(SubscriptionsAdded((subscription_id,)))
 
     messagebox.showinfo("Success", "Subscription saved successfully!")
 
-    connection.commit()
-    self.refresh_treeview()  # Triggers merge sort
-
   def validate_input(self):
     if self.Empty():
         return False
@@ -1206,77 +2322,50 @@ class ViewSubscriptionsFrame(tk.Frame):
     return True
 
 
+  # New names are inserted in the save's transaction, committed with the subscription
   def insert_or_get_folder(self, folder_name):
-    cursor.execute("SELECT folderid FROM Folder WHERE folderName = ?", (folder_name,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
-    else:
-        cursor.execute("INSERT INTO Folder (folderName) VALUES (?)", (folder_name,))
-        connection.commit()
-        return cursor.lastrowid
+    return database.folders.get(connection, folder_name)
 
 
   def insert_or_get_brand(self, brand_name):
-    cursor.execute("SELECT brandid FROM Brand WHERE brandName = ?", (brand_name,))
-    result = cursor.fetchone()
-    if result:
-        return result[0]
-    else:
-        cursor.execute("INSERT INTO Brand (brandName) VALUES (?)", (brand_name,))
-        connection.commit()
-        return cursor.lastrowid
+    return database.brands.get(connection, brand_name)
 
   def insert_subscription(self, name, cost, brand_id, folder_id, billing_cycle, billing_date):
 
     sql = """
-    INSERT INTO Subscription (subscriptionName,cost,brandid,folderid,billingCycle,nextBillingDate) VALUES (?,?,?,?,?,?)
+    INSERT INTO Subscription (subscriptionName,cost,brandid,folderid,billingCycle,nextBillingDate,userid) VALUES (?,?,?,?,?,?,?)
     """
-    cursor.execute(sql, (name, cost, brand_id, folder_id, billing_cycle, billing_date))
+    cursor.execute(sql, (name, cost, brand_id, folder_id, billing_cycle, to_storage_date(billing_date), self.userid))
     connection.commit()
+    return cursor.lastrowid
 
 
 
 
   def validate_subscription_cost(self):
-    cost = self.subscription_cost_box.get().strip()
-
-    if cost.startswith('£'):
-        cost = cost[1:]
-
-
     try:
-        cost_float = float(cost)
-
-        if cost_float <= 0:
-            raise ValueError("Cost must be positive.")
-
-        cost_float = round(cost_float,2)
-
-        formatted_cost = f"£{cost_float:.2f}"
-        self.subscription_cost_box.delete(0,tk.END)
-        self.subscription_cost_box.insert(0,formatted_cost)
-
-        return True
-    except ValueError:
-        tk.messagebox.showerror("Invalid Input", "Please enter a valid number for the subscription cost")
+        formatted_cost = normalise_cost(self.subscription_cost_box.get())
+    except ValidationError as e:
+        tk.messagebox.showerror("Invalid Input", str(e))
         return False
 
+    self.subscription_cost_box.delete(0,tk.END)
+    self.subscription_cost_box.insert(0,formatted_cost)
+    return True
+
 
   def billing_date_validated(self):
     billing_date = self.billing_date_box.get().strip()
 
     try:
-        billing_date = datetime.strptime(billing_date, "%d/%m/%Y").date()
-
-        # Check if billing date is in the past
-        if billing_date <= date.today():
-            return False, "Billing date must be in the future."
-
-        return True, "Valid billing date"
+        billing_date = parse_billing_date(billing_date)
+    except ValidationError as e:
+        return False, str(e)
 
-    except ValueError:
-        return False, "Invalid date format, please use DD/MM/YYYY"
+    # Stored via to_storage_date, so keep the form showing DD/MM/YYYY
+    self.billing_date_box.delete(0, tk.END)
+    self.billing_date_box.insert(0, billing_date.strftime("%d/%m/%Y"))
+    return True, "Valid billing date"
 
 
 
@@ -1295,6 +2384,7 @@ class ViewSubscriptionsFrame(tk.Frame):
 
 
 
+  @profiled("modal")
   def create_filter_modal(self):
     self.filter_modal = tk.Toplevel(self)
     self.filter_modal.title("Filter Subscriptions")
@@ -1332,16 +2422,8 @@ class ViewSubscriptionsFrame(tk.Frame):
     self.filter_cost_sort_combobox.grid(row=1, column=3, sticky="w", padx=5)
     
     # Populate combobox values
-    cursor.execute("SELECT DISTINCT brandName FROM Brand")
-    self.filter_brand_combobox['values'] = ["All Brands"] + [b[0] for b in cursor.fetchall()]
-    self.filter_brand_combobox.set("All Brands")
-    
-    cursor.execute("SELECT DISTINCT folderName FROM Folder")
-    self.filter_folder_type_combobox['values'] = ["All Folders"] + [f[0] for f in cursor.fetchall()]
-    self.filter_folder_type_combobox.set("All Folders")
-    
-    self.filter_billing_cycle_combobox['values'] = ["All Cycles", "Daily", "Weekly", "Monthly", "Yearly"]
-    self.filter_billing_cycle_combobox.set("All Cycles")
+    self.populate_filter_choices(self.filter_brand_combobox, self.filter_folder_type_combobox,
+                                 self.filter_billing_cycle_combobox)
     
     self.filter_cost_sort_combobox.set("None")
 
@@ -1360,51 +2442,77 @@ class ViewSubscriptionsFrame(tk.Frame):
     self.filter_modal.grab_set()
     self.filter_modal.protocol("WM_DELETE_WINDOW", self.filter_modal.destroy)
 
+  def populate_filter_choices(self, brand_combobox, folder_combobox, cycle_combobox):
+    # Brands and folders are shared, so offer only those the user's subscriptions use
+    cursor.execute("""
+        SELECT DISTINCT b.brandName FROM Subscription s INNER JOIN Brand b ON s.brandid = b.brandid
+        WHERE s.userid = ? ORDER BY b.brandName
+    """, (self.userid,))
+    brand_combobox['values'] = ["All Brands"] + [b[0] for b in cursor.fetchall()]
+    brand_combobox.set("All Brands")
+
+    cursor.execute("""
+        SELECT DISTINCT f.folderName FROM Subscription s INNER JOIN Folder f ON s.folderid = f.folderid
+        WHERE s.userid = ? ORDER BY f.folderName
+    """, (self.userid,))
+    folder_combobox['values'] = ["All Folders"] + [f[0] for f in cursor.fetchall()]
+    folder_combobox.set("All Folders")
+
+    cycle_combobox['values'] = ["All Cycles", "Daily", "Weekly", "Monthly", "Yearly"]
+    cycle_combobox.set("All Cycles")
+
+  def selected_filters(self, brand_combobox, folder_combobox, cycle_combobox):
+    """(brand, folder, billing cycle) chosen in filter comboboxes, None where All is chosen"""
+    brand = brand_combobox.get()
+    folder = folder_combobox.get()
+    billing_cycle = cycle_combobox.get()
+    return (None if brand == "All Brands" else brand,
+            None if folder == "All Folders" else folder,
+            None if billing_cycle == "All Cycles" else billing_cycle)
+
   def filter_data(self):
     # Get filter values
-    brand = self.filter_brand_combobox.get()
-    folder = self.filter_folder_type_combobox.get()
-    billing_cycle = self.filter_billing_cycle_combobox.get()
     cost_sort = self.filter_cost_sort_combobox.get()
 
     # Build query
     query = """SELECT s.subscriptionid, s.subscriptionName, s.cost, 
-                b.brandName, f.folderName, s.billingCycle, s.nextBillingDate
+                b.brandName, f.folderName, s.billingCycle, strftime('%d/%m/%Y', s.nextBillingDate)
                 FROM Subscription s
                 INNER JOIN Brand b ON s.brandid = b.brandid
                 INNER JOIN Folder f ON s.folderid = f.folderid
-                WHERE 1=1"""
-    params = []
+                WHERE s.userid = ?"""
 
-    # Apply filters
-    if brand != "All Brands":
-        query += " AND b.brandName = ?"
-        params.append(brand)
-    
-    if folder != "All Folders":
-        query += " AND f.folderName = ?"
-        params.append(folder)
-    
-    if billing_cycle != "All Cycles":
-        query += " AND s.billingCycle = ?"
-        params.append(billing_cycle)
+    # Apply filters (the export dialog offers the same ones)
+    conditions, params = filter_conditions(*self.selected_filters(
+        self.filter_brand_combobox, self.filter_folder_type_combobox, self.filter_billing_cycle_combobox
+    ))
 
-    # Apply cost sorting
-    if cost_sort != "None":
-        cost_order = "DESC" if "Highest" in cost_sort else "ASC"
-        query += f" ORDER BY CAST(REPLACE(REPLACE(s.cost, '£', ''), ',', '') AS DECIMAL) {cost_order}"
+    # Close modal; the results arrive in the background
+    self.filter_modal.destroy()
 
-    # Execute query
-    cursor.execute(query, params)
-    filtered_data = cursor.fetchall()
+    # Large catalogs stay paged unless a cost sort needs the whole result
+    if self.large_catalog and cost_sort == "None":
+        self.virtual_list.show(conditions, params)
+        return
 
-    # Update Treeview
-    self.tree.delete(*self.tree.get_children())
-    for row in filtered_data:
-        self.tree.insert('', 'end', text=row[0], values=row[1:])
+    for condition in conditions:
+        query += " AND " + condition
+    params = [self.userid] + params
 
-    # Close modal
-    self.filter_modal.destroy()
+    if cost_sort == "None":
+        self.queries.submit("subscriptions", fetch_subscription_rows, query, params, on_done=self.show_filtered)
+        return
+
+    # Costs are sorted on the parsed cost column rather than re-parsing the text in SQL
+    descending = "Highest" in cost_sort
+    self.master.with_columns(lambda columns: self.queries.submit(
+        "subscriptions", fetch_cost_sorted_rows, columns, query, params, descending, on_done=self.show_filtered
+    ))
+
+  def show_filtered(self, filtered_data):
+    # Update Treeview
+    self.virtual_list.deactivate()
+    self.render_rows(filtered_data)
 
 
 
@@ -1471,6 +2579,18 @@ class Alerts_RemindersFrame(tk.Frame):
         )
         self.delete_alert_button.pack(side=tk.LEFT)
         
+        # Generate Renewal Alerts Button
+        self.generate_alerts_button = tk.Button(
+            button_frame,
+            text="⟳ Generate Renewal Alerts",
+            command=self.generate_alerts_modal,
+            bg="#3498DB",
+            fg="black",
+            relief="solid",
+            borderwidth=1
+        )
+        self.generate_alerts_button.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Create a frame to hold TreeView and Scrollbars
         tree_frame = tk.Frame(self)
         tree_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)
@@ -1521,10 +2641,24 @@ class Alerts_RemindersFrame(tk.Frame):
         # Store user email for reminders
         self.user_email = ""
         
+        # Alerts on screen by alertid (also the Treeview iid) and their
+        # (alert_date, alertid) keys in display order
+        self.alert_rows = {}
+        self.alert_order = []
+
         # Initialize by loading alerts
+        self.queries = container.queries
+        self.userid = container.userid
+        self.events = container.events
+        self.events.subscribe(Coalescer(self.after_idle, self.on_events),
+                              SubscriptionsUpdated, SubscriptionsDeleted, *ALERT_EVENTS)
         self.create_alert_table_if_not_exists()
         self.load_alerts()
 
+        # Urgency depends on today's date, so recolour the rows when it changes
+        self.tags_date = date.today()
+        self.schedule_day_change()
+
         # Configure Treeview colors
         self.alerts_tree.tag_configure('urgent', background='#ffcccc')  # Red
         self.alerts_tree.tag_configure('warning', background='#ffe6cc')  # Amber
@@ -1559,43 +2693,112 @@ class Alerts_RemindersFrame(tk.Frame):
             messagebox.showerror("Database Error", f"Error creating tables: {str(e)}")
     
     def load_alerts(self):
-        """Load alerts from database into treeview"""
+        """Load alerts from database (in the background) into treeview"""
+        self.queries.submit(
+            "alerts", fetch_subscription_rows, ALERT_ROWS_SQL + " WHERE s.userid = ? ORDER BY a.alert_date, a.alertid",
+            (self.userid,),
+            on_done=self.show_alerts,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading alerts: {str(e)}")
+        )
+
+    def show_alerts(self, alerts):
+        """Fill the treeview with loaded alerts"""
         try:
             # Clear existing items FIRST
             self.alerts_tree.delete(*self.alerts_tree.get_children())  # Clear all items
-            
-            # Execute query to get alerts with subscription names
-            cursor.execute("""
-                SELECT a.alertid, s.subscriptionName, a.alert_date, a.alert_type, a.alert_message
-                FROM Alert a
-                JOIN Subscription s ON a.subscriptionid = s.subscriptionid
-                ORDER BY a.alert_date ASC
-            """)
-            
-            alerts = cursor.fetchall()
-            
-            # Show/hide empty state message
-            self.empty_label.place(relx=0.5, rely=0.5, anchor="center") if not alerts else self.empty_label.place_forget()
-            
-            # Insert alerts with color coding
-            today = date.today()
-            for alert in alerts:
-                alert_date = datetime.strptime(alert[2], "%d/%m/%Y").date()
-                days_remaining = (alert_date - today).days
-            
-                # Determine urgency tag
-                if days_remaining <= 3:
-                    tag = 'urgent'
-                elif 4 <= days_remaining <= 7:
-                    tag = 'warning'
-                else:
-                    tag = 'safe'
-                
-                # Insert with tag
-                self.alerts_tree.insert('', 'end', text=alert[0], values=alert[1:], tags=(tag,))
-                
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error loading alerts: {str(e)}")
+            self.alert_rows = {}
+            self.alert_order = []
+            self.merge_alerts(alerts)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Error loading alerts: {str(e)}")
+
+    def urgency_tag(self, alert_date):
+        days_remaining = (date.fromisoformat(alert_date) - date.today()).days
+        if days_remaining <= 3:
+            return 'urgent'
+        elif 4 <= days_remaining <= 7:
+            return 'warning'
+        return 'safe'
+
+    def merge_alerts(self, alerts):
+        """Insert new alert rows in date order and refresh ones already shown"""
+        for alert in alerts:
+            alert_id = alert[0]
+            values = (alert[1], to_display_date(alert[2]), alert[3], alert[4])
+            tag = self.urgency_tag(alert[2])
+
+            if alert_id in self.alert_rows:
+                self.alerts_tree.item(str(alert_id), values=values, tags=(tag,))
+            else:
+                position = bisect.bisect(self.alert_order, (alert[2], alert_id))
+                self.alert_order.insert(position, (alert[2], alert_id))
+                self.alerts_tree.insert('', position, iid=str(alert_id), text=alert_id, values=values, tags=(tag,))
+            self.alert_rows[alert_id] = alert
+
+        self.update_empty_state()
+
+    def remove_alerts(self, alert_ids):
+        alert_ids = [alert_id for alert_id in alert_ids if alert_id in self.alert_rows]
+        if not alert_ids:
+            return
+        self.alerts_tree.delete(*[str(alert_id) for alert_id in alert_ids])
+        for alert_id in alert_ids:
+            alert = self.alert_rows.pop(alert_id)
+            del self.alert_order[bisect.bisect_left(self.alert_order, (alert[2], alert_id))]
+        self.update_empty_state()
+
+    def schedule_day_change(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        delay = (midnight - now).total_seconds() * 1000 + 1000
+        self.after(int(min(delay, MAX_TIMER_MS)), self.on_day_change)
+
+    def on_day_change(self):
+        if date.today() != self.tags_date:
+            self.tags_date = date.today()
+            for alert_id, alert in self.alert_rows.items():
+                self.alerts_tree.item(str(alert_id), tags=(self.urgency_tag(alert[2]),))
+        self.schedule_day_change()
+
+    def update_empty_state(self):
+        # Show/hide empty state message
+        if self.alert_rows:
+            self.empty_label.place_forget()
+        else:
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+
+    def on_events(self, events):
+        """Apply a batch of subscription and alert changes to the list"""
+        # A full load still in flight may have read before these writes
+        if self.queries.is_pending("alerts"):
+            self.load_alerts()
+            return
+
+        renamed, deleted_subscriptions = net_changes(
+            [event for event in events if isinstance(event, SUBSCRIPTION_EVENTS)], SubscriptionsDeleted
+        )
+        created, deleted = net_changes(
+            [event for event in events if isinstance(event, ALERT_EVENTS)], AlertsDeleted
+        )
+
+        # Alerts of deleted subscriptions go along with them
+        deleted |= {alert_id for alert_id, alert in self.alert_rows.items() if alert[5] in deleted_subscriptions}
+        self.remove_alerts(deleted)
+
+        if len(created) + len(renamed) > ID_CHUNK_SIZE:
+            # Bulk changes: one full reload beats a huge IN (...) list
+            self.load_alerts()
+        elif created or renamed:
+            created, renamed = sorted(created), sorted(renamed)
+            self.queries.submit(
+                "alerts", fetch_subscription_rows,
+                ALERT_ROWS_SQL + " WHERE a.alertid IN ({}) OR a.subscriptionid IN ({})".format(
+                    placeholders(created) or "NULL", placeholders(renamed) or "NULL"
+                ),
+                created + renamed,
+                on_done=self.merge_alerts,
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error loading alerts: {str(e)}")
+            )
     
     def on_alert_select(self, event):
         """Handle tree selection event"""
@@ -1613,17 +2816,20 @@ class Alerts_RemindersFrame(tk.Frame):
             
         if messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete the selected alert(s)?"):
             try:
+                deleted_ids = []
                 for item in selected_items:
-                    alert_id = self.alerts_tree.item(item)['text']
+                    alert_id = int(self.alerts_tree.item(item)['text'])
                     cursor.execute("DELETE FROM Alert WHERE alertid = ?", (alert_id,))
+                    deleted_ids.append(alert_id)
                 
                 connection.commit()
-                self.load_alerts()  # Refresh display
+                self.events.publish(AlertsDeleted(tuple(deleted_ids)))
                 messagebox.showinfo("Success", "Alert(s) deleted successfully")
                 
             except sqlite3.Error as e:
                 messagebox.showerror("Database Error", f"Failed to delete alert: {str(e)}")
     
+    @profiled("modal")
     def create_alert_modal(self):
         """Create modal dialog for adding a new alert"""
         # Create the top level window
@@ -1659,7 +2865,10 @@ class Alerts_RemindersFrame(tk.Frame):
         self.subscription_combobox.grid(row=0, column=1, pady=5, sticky="ew")
         
         # Populate subscription options
-        cursor.execute("SELECT subscriptionid, subscriptionName FROM Subscription ORDER BY subscriptionName")
+        cursor.execute(
+            "SELECT subscriptionid, subscriptionName FROM Subscription WHERE userid = ? ORDER BY subscriptionName",
+            (self.userid,)
+        )
         subscriptions = cursor.fetchall()
         self.subscription_combobox['values'] = [sub[1] for sub in subscriptions]
         self.subscription_ids = [sub[0] for sub in subscriptions]
@@ -1676,7 +2885,7 @@ class Alerts_RemindersFrame(tk.Frame):
         
         self.alert_type_combobox = ttk.Combobox(form_frame, state="readonly", width=30)
         self.alert_type_combobox.grid(row=1, column=1, pady=5, sticky="ew")
-        self.alert_type_combobox['values'] = ["Subscription Renewal", "Price Increase", "Custom"]
+        self.alert_type_combobox['values'] = ["Subscription Renewal", "Trial Ending", "Price Increase", "Custom"]
         self.alert_type_combobox.current(0)
         self.alert_type_combobox.bind("<<ComboboxSelected>>", self.on_alert_type_change)
         
@@ -1732,8 +2941,6 @@ class Alerts_RemindersFrame(tk.Frame):
             height=2
         )
         cancel_button.pack(side=tk.LEFT, padx=10)
-        
-        modal.wait_window()
     
     def on_subscription_change(self, event=None):
         """Update default message when subscription changes"""
@@ -1750,6 +2957,7 @@ class Alerts_RemindersFrame(tk.Frame):
         
         default_messages = {
             "Subscription Renewal": f"Your {subscription} subscription will renew soon.",
+            "Trial Ending": f"Your {subscription} trial will end soon.",
             "Price Increase": f"The price for your {subscription} subscription will increase soon.",
             "Custom": ""
         }
@@ -1794,23 +3002,136 @@ class Alerts_RemindersFrame(tk.Frame):
             # Insert alert into database
             cursor.execute(
                 "INSERT INTO Alert (subscriptionid, alert_date, alert_type, alert_message) VALUES (?, ?, ?, ?)",
-                (subscription_id, alert_date, alert_type, alert_message)
+                (subscription_id, to_storage_date(alert_date), alert_type, alert_message)
             )
             connection.commit()
             
             # Refresh display and close modal
-            self.load_alerts()
+            self.events.publish(AlertsCreated((cursor.lastrowid,)))
             modal.destroy()
             messagebox.showinfo("Success", "Alert created successfully!")
             
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"There is already a {alert_type} alert for this subscription on {alert_date}")
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Failed to save alert: {str(e)}")
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
 
+    @profiled("modal")
+    def generate_alerts_modal(self):
+        """Modal dialog for creating renewal alerts for every subscription at once"""
+        modal = tk.Toplevel(self)
+        modal.title("Generate Renewal Alerts")
+        modal.geometry("460x300+400+200")
+        modal.resizable(False, False)
+        modal.transient(self.master)
+        modal.grab_set()
+        modal.columnconfigure(0, weight=1)
+        
+        heading = tk.Label(
+            modal,
+            text="Generate Renewal Alerts",
+            font=("Arial", 16, "bold"),
+            fg="#2C3E50"
+        )
+        heading.grid(row=0, column=0, pady=(15, 10), sticky="ew")
+        
+        form_frame = tk.Frame(modal)
+        form_frame.grid(row=1, column=0, padx=20, pady=5, sticky="ew")
+        form_frame.columnconfigure(1, weight=1)
+        
+        tk.Label(form_frame, text="Days before billing:", anchor="w").grid(row=0, column=0, pady=5, sticky="w")
+        days_before = tk.Spinbox(form_frame, from_=0, to=60, width=5)
+        days_before.delete(0, tk.END)
+        days_before.insert(0, "3")
+        days_before.grid(row=0, column=1, pady=5, sticky="w")
+        
+        tk.Label(form_frame, text="Billing dates in the next (days):", anchor="w").grid(row=1, column=0, pady=5, sticky="w")
+        horizon = tk.Spinbox(form_frame, from_=1, to=366, width=5)
+        horizon.delete(0, tk.END)
+        horizon.insert(0, "31")
+        horizon.grid(row=1, column=1, pady=5, sticky="w")
+        
+        include_trials = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            form_frame,
+            text="Trial Ending alerts for subscriptions in 'Trial' folders",
+            variable=include_trials
+        ).grid(row=2, column=0, columnspan=2, pady=5, sticky="w")
+        
+        note = tk.Label(
+            form_frame,
+            text="Alerts that already exist are not duplicated.",
+            fg="#7F8C8D",
+            font=("Arial", 8)
+        )
+        note.grid(row=3, column=0, columnspan=2, sticky="w")
+        
+        button_frame = tk.Frame(modal)
+        button_frame.grid(row=2, column=0, pady=20)
+        
+        generate_button = tk.Button(
+            button_frame,
+            text="Generate",
+            command=lambda: self.generate_alerts(modal, days_before.get(), horizon.get(), include_trials.get()),
+            bg="#2ECC71",
+            fg="black",
+            width=15,
+            height=2
+        )
+        generate_button.pack(side=tk.LEFT, padx=10)
+        
+        cancel_button = tk.Button(
+            button_frame,
+            text="Cancel",
+            command=modal.destroy,
+            width=15,
+            height=2
+        )
+        cancel_button.pack(side=tk.LEFT, padx=10)
+
+    def generate_alerts(self, modal, days_before, horizon_days, include_trials):
+        """Create the alerts in the background and publish them when done"""
+        try:
+            days_before, horizon_days = int(days_before), int(horizon_days)
+        except ValueError:
+            messagebox.showerror("Error", "Days must be whole numbers")
+            return
+        if days_before < 0 or horizon_days < 1:
+            messagebox.showerror("Error", "Days before must be 0 or more and the range at least 1 day")
+            return
+
+        modal.destroy()
+        # The job writes, so it must not be superseded once started
+        self.generate_alerts_button['state'] = tk.DISABLED
+        self.queries.submit(
+            "generate-alerts", generate_alerts, self.userid, days_before, horizon_days, include_trials,
+            on_done=self.show_generated_alerts,
+            on_error=self.show_generate_error
+        )
+
+    def show_generated_alerts(self, alert_ids):
+        self.generate_alerts_button['state'] = tk.NORMAL
+        self.events.publish(AlertsCreated(tuple(alert_ids)))
+        if alert_ids:
+            messagebox.showinfo("Success", f"{len(alert_ids):,} alert(s) created")
+        else:
+            messagebox.showinfo("Up to Date", "Every upcoming billing date already has its alert")
 
+    def show_generate_error(self, error):
+        self.generate_alerts_button['state'] = tk.NORMAL
+        messagebox.showerror("Database Error", f"Failed to generate alerts: {str(error)}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Subscription Manager")
+    parser.add_argument("--db", help="path to the SQLite database (overrides SUBMANAGER_DB and submanager.ini)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time queries and page refreshes, logging slow ones beside the database "
+                             "(also SUBMANAGER_PROFILE=1); Ctrl+Shift+D shows the figures")
+    args = parser.parse_args()
+
+    open_database(args.db, profile=profile_requested(args.profile))
     app = Window()
     app.mainloop()
\ No newline at end of file
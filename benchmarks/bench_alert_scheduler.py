@@ -0,0 +1,99 @@
+"""AlertScheduler with a large number of pending alerts.
+
+Times loading the pending alerts, single adds and cancels, and firing, using
+a simulated clock and timer so the run takes no wall-clock waiting.  Also
+checks that alerts fire in due order, that cancelled alerts never fire and
+that only one timer, never longer than MAX_TIMER_MS, is ever armed.
+
+    python benchmarks/bench_alert_scheduler.py --alerts 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_scheduler import MAX_TIMER_MS, AlertScheduler  # noqa: E402
+
+
+class SimulatedTimer:
+    """Stands in for Tk's after()/after_cancel() and the clock"""
+
+    def __init__(self, start):
+        self.now = start
+        self.pending = {}
+        self.handles = 0
+
+    def clock(self):
+        return self.now
+
+    def schedule(self, ms, callback):
+        assert not self.pending, "more than one timer armed"
+        assert 0 <= ms <= MAX_TIMER_MS, f"timer out of range: {ms} ms"
+        self.handles += 1
+        self.pending[self.handles] = (self.now + timedelta(milliseconds=ms), callback)
+        return self.handles
+
+    def cancel(self, handle):
+        self.pending.pop(handle, None)
+
+    def run_next(self):
+        """Advance the clock to the armed timer and run it"""
+        handle, (when, callback) = self.pending.popitem()
+        self.now = max(self.now, when)
+        callback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--operations", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    start = datetime(2030, 1, 1)
+    timer = SimulatedTimer(start)
+    fired = []
+    scheduler = AlertScheduler(timer.schedule, timer.cancel, fired.extend, clock=timer.clock)
+
+    alerts = [(alert_id, start + timedelta(minutes=rng.randrange(60 * 24 * 365)))
+              for alert_id in range(args.alerts)]
+
+    started = time.perf_counter()
+    scheduler.add_many(alerts)
+    print(f"{'load ' + format(args.alerts, ',') + ' alerts':<28} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    next_id = args.alerts
+    started = time.perf_counter()
+    for _ in range(args.operations):
+        scheduler.add(next_id, start + timedelta(minutes=rng.randrange(60 * 24 * 365)))
+        next_id += 1
+    print(f"{'add':<28} {(time.perf_counter() - started) / args.operations * 1e6:8.2f} us each")
+
+    cancelled = set(rng.sample(range(next_id), args.operations))
+    started = time.perf_counter()
+    for alert_id in cancelled:
+        scheduler.cancel(alert_id)
+    print(f"{'cancel':<28} {(time.perf_counter() - started) / args.operations * 1e6:8.2f} us each")
+
+    due_at = dict(alerts)
+    pending = len(scheduler)
+    started = time.perf_counter()
+    timers = 0
+    while timer.pending:
+        timer.run_next()
+        timers += 1
+    elapsed = time.perf_counter() - started
+    print(f"{'fire all':<28} {elapsed * 1000:8.1f} ms ({timers:,} timer callbacks)")
+
+    assert len(fired) == pending and not cancelled & set(fired), "wrong alerts fired"
+    original = [due_at[alert_id] for alert_id in fired if alert_id in due_at]
+    assert original == sorted(original), "alerts fired out of order"
+    print(f"{'fired':<28} {len(fired):8,} in due order, none cancelled")
+
+
+if __name__ == "__main__":
+    main()
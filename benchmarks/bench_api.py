@@ -0,0 +1,144 @@
+"""Concurrent reads through the JSON API while another connection keeps writing.
+
+Builds a database of random subscriptions owned by one account, starts the
+API server in its own process on a free port and runs many keep-alive
+clients at once, each
+sending a mix of list pages, searches, alert and insights requests.  Meanwhile
+a separate connection inserts and commits subscriptions one at a time, as the
+desktop app does.  Prints request throughput and latency percentiles, and how
+long the writer's commits took.
+
+    python benchmarks/bench_api.py --rows 200000 --clients 200 --requests 50
+"""
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from bench_export import BENCH_USER, build  # noqa: E402
+from submanager_db import find_user  # noqa: E402
+
+PATHS = [
+    "/subscriptions?limit=50&after={after}",
+    "/subscriptions?limit=50&brand=Brand%20{brand}",
+    "/subscriptions?search=sub%20{after}",
+    "/alerts?pending=1",
+    "/insights",
+]
+
+
+def percentile(samples, share):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * share))]
+
+
+def start_server(path, workers):
+    """Start submanager_api.py on a free port; returns (process, port)"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "submanager_api.py"), "--db", path, "--port", "0",
+         "--workers", str(workers)],
+        stderr=subprocess.PIPE, text=True
+    )
+    # "Serving on http://127.0.0.1:<port>"
+    return process, int(process.stderr.readline().rsplit(":", 1)[1])
+
+
+def keep_writing(database, userid, stop, commit_times):
+    """Insert and commit one subscription at a time until stop is set"""
+    connection = database.open_writer()
+    rng = random.Random(22)
+    while not stop.is_set():
+        started = time.perf_counter()
+        connection.execute(
+            "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate,"
+            " userid) VALUES (?, ?, ?, ?, 'Monthly', ?, ?)",
+            (f"Written {len(commit_times)}", f"£{rng.uniform(1, 100):.2f}", rng.randint(1, 500), rng.randint(1, 20),
+             (date.today() + timedelta(days=rng.randrange(1, 365))).isoformat(), userid)
+        )
+        connection.commit()
+        commit_times.append(time.perf_counter() - started)
+        time.sleep(0.005)
+    connection.close()
+
+
+async def client(port, requests, rows, seed, latencies, failures):
+    rng = random.Random(seed)
+    token = base64.b64encode(b"bench:bench").decode()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(requests):
+            path = rng.choice(PATHS).format(after=rng.randrange(rows), brand=rng.randint(1, 500))
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\nAuthorization: Basic {token}\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(next(line.split(b":")[1] for line in head.split(b"\r\n")
+                              if line.lower().startswith(b"content-length")))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 200"):
+                failures.append(head.split(b"\r\n")[0].decode())
+    finally:
+        writer.close()
+
+
+async def run_clients(port, clients, requests, rows, latencies, failures):
+    await asyncio.gather(*(client(port, requests, rows, seed, latencies, failures) for seed in range(clients)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--workers", type=int, default=8, help="API reader threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        database = build(path, args.rows)
+        connection = database.writer
+        userid = find_user(connection, BENCH_USER)
+
+        server, port = start_server(path, args.workers)
+        stop_writing = threading.Event()
+        commit_times = []
+        writer = threading.Thread(target=keep_writing, args=(database, userid, stop_writing, commit_times))
+        writer.start()
+
+        latencies, failures = [], []
+        started = time.perf_counter()
+        asyncio.run(run_clients(port, args.clients, args.requests, args.rows, latencies, failures))
+        elapsed = time.perf_counter() - started
+
+        stop_writing.set()
+        writer.join()
+        server.terminate()
+        server.wait()
+        database.close()
+
+    print(f"{len(latencies):,} requests from {args.clients} clients in {elapsed:.1f} s "
+          f"({len(latencies) / elapsed:,.0f} requests/s, {len(failures)} failed)")
+    print(f"latency p50 / p95 / p99 {percentile(latencies, 0.5) * 1000:8.1f} / "
+          f"{percentile(latencies, 0.95) * 1000:.1f} / {percentile(latencies, 0.99) * 1000:.1f} ms")
+    print(f"{len(commit_times):,} writer commits meanwhile: median {statistics.median(commit_times) * 1000:.1f} ms, "
+          f"slowest {max(commit_times) * 1000:.1f} ms")
+    for failure in sorted(set(failures))[:5]:
+        print(f"    {failure}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
@@ -0,0 +1,144 @@
+"""Before/after timings for the DD/MM/YYYY -> indexed ISO date migration.
+
+Builds a throwaway database with legacy DD/MM/YYYY billing dates, times the
+old insights queries, runs the migration and times the new ones.
+
+    python benchmarks/bench_billing_dates.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_db import migrate  # noqa: E402
+
+LEGACY_YEARS_SQL = """
+    SELECT DISTINCT strftime('%Y',
+        substr(nextBillingDate, 7, 4) || '-' ||
+        substr(nextBillingDate, 4, 2) || '-' ||
+        substr(nextBillingDate, 1, 2)
+    ) as year
+    FROM Subscription
+    WHERE nextBillingDate IS NOT NULL
+    ORDER BY year DESC
+"""
+
+LEGACY_MONTHS_SQL = """
+    SELECT
+        strftime('%Y-%m',
+            substr(nextBillingDate, 7, 4) || '-' ||
+            substr(nextBillingDate, 4, 2) || '-' ||
+            substr(nextBillingDate, 1, 2)
+        ) as month,
+        SUM(CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS REAL)) as total
+    FROM Subscription
+    WHERE nextBillingDate IS NOT NULL
+    AND cost IS NOT NULL
+    AND strftime('%Y', substr(nextBillingDate, 7, 4) || '-' || substr(nextBillingDate, 4, 2) || '-' || substr(nextBillingDate, 1, 2)) = ?
+    GROUP BY month ORDER BY month
+"""
+
+ISO_MONTHS_SQL = """
+    SELECT
+        substr(nextBillingDate, 1, 7) as month,
+        SUM(CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS REAL)) as total
+    FROM Subscription
+    WHERE userid = ?
+    AND nextBillingDate IS NOT NULL
+    AND cost IS NOT NULL
+    AND nextBillingDate >= ? AND nextBillingDate < ?
+    GROUP BY month ORDER BY month
+"""
+
+
+def iso_years(connection, userid):
+    years = []
+    first_date = connection.execute(
+        "SELECT MIN(nextBillingDate) FROM Subscription WHERE userid = ? AND nextBillingDate IS NOT NULL",
+        (userid,)
+    ).fetchone()[0]
+    while first_date:
+        year = first_date[:4]
+        years.append(year)
+        first_date = connection.execute(
+            "SELECT MIN(nextBillingDate) FROM Subscription WHERE userid = ? AND nextBillingDate >= ?",
+            (userid, f"{int(year) + 1}-01-01")
+        ).fetchone()[0]
+    return years
+
+
+def build_legacy_database(path, rows, seed=42):
+    rng = random.Random(seed)
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE User (
+            userid INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE, password TEXT, firstname TEXT, surname TEXT
+        );
+        INSERT INTO User (username, password) VALUES ('bench', '');
+        CREATE TABLE Brand (brandid INTEGER PRIMARY KEY AUTOINCREMENT, brandName TEXT);
+        CREATE TABLE Folder (folderid INTEGER PRIMARY KEY AUTOINCREMENT, folderName TEXT);
+        CREATE TABLE Subscription (
+            subscriptionid INTEGER PRIMARY KEY AUTOINCREMENT,
+            subscriptionName TEXT, cost TEXT, brandid INTEGER, folderid INTEGER,
+            billingCycle TEXT, nextBillingDate TEXT
+        );
+    """)
+    start = date(2020, 1, 1)
+    connection.executemany(
+        "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate) "
+        "VALUES (?, ?, 1, 1, 'Monthly', ?)",
+        ((f"Sub {i}", f"£{rng.uniform(1, 100):.2f}",
+          (start + timedelta(days=rng.randrange(3650))).strftime("%d/%m/%Y"))
+         for i in range(rows))
+    )
+    connection.commit()
+    return connection
+
+
+def timed(label, func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<40} {best * 1000:10.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--year", type=int, default=2024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection = build_legacy_database(os.path.join(tmp, "bench.db"), args.rows)
+        print(f"{args.rows:,} subscriptions")
+
+        timed("before: available years", lambda: connection.execute(LEGACY_YEARS_SQL).fetchall())
+        timed(f"before: months of {args.year}",
+              lambda: connection.execute(LEGACY_MONTHS_SQL, (str(args.year),)).fetchall())
+
+        started = time.perf_counter()
+        migrate(connection)
+        print(f"{'migration':<40} {(time.perf_counter() - started) * 1000:10.1f} ms")
+
+        # The migration gives the legacy subscriptions to the database's first account
+        userid = connection.execute("SELECT userid FROM User WHERE username = 'bench'").fetchone()[0]
+
+        timed("after: available years", lambda: iso_years(connection, userid))
+        timed(f"after: months of {args.year}",
+              lambda: connection.execute(
+                  ISO_MONTHS_SQL, (userid, f"{args.year}-01-01", f"{args.year + 1}-01-01")).fetchall())
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Set-based delete and bulk edit vs one statement per selected subscription.
+
+Builds a database of random subscriptions with renewal alerts, then deletes
+(and separately edits) a random selection of them: one DELETE or UPDATE per
+row as the subscription list used to (leaving the alerts behind), against
+``delete_subscriptions`` and ``update_subscriptions``.  Every variant runs in
+a single transaction.
+
+    python benchmarks/bench_bulk_delete.py --rows 200000 --selected 20000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_export import build  # noqa: E402
+from submanager_aggregates import check_spend_aggregates  # noqa: E402
+from submanager_alerts import generate_renewal_alerts  # noqa: E402
+from submanager_db import Database, delete_subscriptions, update_subscriptions  # noqa: E402
+
+
+def row_by_row_delete(connection, ids):
+    # As before: the alerts were left behind
+    for subscription_id in ids:
+        connection.execute("DELETE FROM Subscription WHERE subscriptionid = ?", (subscription_id,))
+
+
+def row_by_row_update(connection, ids, changes):
+    for subscription_id in ids:
+        connection.execute("UPDATE Subscription SET cost = ?, folderid = ? WHERE subscriptionid = ?",
+                           (changes["cost"], changes["folderid"], subscription_id))
+
+
+def timed(label, path, operation):
+    database = Database(path)
+    connection = database.writer
+    started = time.perf_counter()
+    operation(connection)
+    connection.commit()
+    elapsed = time.perf_counter() - started
+    assert not check_spend_aggregates(connection), "spend aggregates out of step"
+    orphans = connection.execute(
+        "SELECT COUNT(*) FROM Alert WHERE subscriptionid NOT IN (SELECT subscriptionid FROM Subscription)"
+    ).fetchone()[0]
+    database.close()
+    print(f"{label:<44} {elapsed * 1000:10.1f} ms ({orphans} orphaned alerts)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--selected", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "base.db")
+        database = build(base, args.rows)
+        generate_renewal_alerts(database.writer, 3, 365, include_trials=False)
+        database.writer.commit()
+        database.close()
+
+        ids = random.Random(19).sample(range(1, args.rows + 1), args.selected)
+        changes = {"cost": "£4.99", "folderid": 3}
+        variants = [
+            (f"delete {len(ids):,}: one row at a time", lambda connection: row_by_row_delete(connection, ids)),
+            (f"delete {len(ids):,}: delete_subscriptions", lambda connection: delete_subscriptions(connection, ids)),
+            (f"edit {len(ids):,}: one row at a time", lambda connection: row_by_row_update(connection, ids, changes)),
+            (f"edit {len(ids):,}: update_subscriptions",
+             lambda connection: update_subscriptions(connection, ids, changes)),
+        ]
+        for number, (label, operation) in enumerate(variants):
+            path = os.path.join(tmp, f"copy{number}.db")
+            shutil.copy(base, path)
+            timed(label, path, operation)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
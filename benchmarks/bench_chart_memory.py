@@ -0,0 +1,97 @@
+"""Memory and artist counts of the insights chart across many year switches.
+
+Drives ExpenseChart (the persistent figure behind ExpenseInsightsFrame) on an
+Agg canvas, so no display is needed, alternating between "All Years" and
+single years.  Rendering dominates the run time and creates no artists of its
+own, so only every --render-every'th switch is drawn (1 draws them all).
+
+Rendering replaces objects in matplotlib's glyph and transform caches, which
+tracemalloc only sees once tracing has started, so the first half of the run
+is traced but only settles the caches.  Python heap growth over the second
+half and the number of patches on the axes must stay flat.
+
+    python benchmarks/bench_chart_memory.py --switches 1000 --max-growth-kb 256
+
+Exits non-zero if the heap grew by more than --max-growth-kb over the
+second half or the axes gained artists.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import SubManager_Combined as app  # noqa: E402
+
+
+def make_periods(seed=3):
+    """(period, results) pairs like project_chart_totals returns"""
+    rng = random.Random(seed)
+    periods = [("All Years", [(f"{year}-{month:02d}", rng.uniform(10, 500))
+                              for year in range(2024, 2027) for month in range(1, 13)])]
+    for year in range(2024, 2027):
+        # Leave some months empty so the bar count changes between switches
+        periods.append((str(year), [(f"{year}-{month:02d}", rng.uniform(10, 500))
+                                    for month in range(1, 13) if rng.random() > 0.2]))
+    return periods
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=1000)
+    parser.add_argument("--timed", type=int, default=50, help="untraced switches used for the timing")
+    parser.add_argument("--render-every", type=int, default=7, help="keep coprime with the 4 periods")
+    parser.add_argument("--dpi", type=int, default=30, help="render resolution (the app uses 100)")
+    parser.add_argument("--max-growth-kb", type=float, default=256)
+    args = parser.parse_args()
+
+    app.load_chart_libraries()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    chart = app.ExpenseChart(app.Figure(figsize=(20, 9), dpi=args.dpi))
+    canvas = FigureCanvasAgg(chart.fig)
+    periods = make_periods()
+
+    def switch(i):
+        period, results = periods[i % len(periods)]
+        chart.update(results, period)
+        if i % args.render_every == 0:
+            canvas.draw()
+
+    started = time.perf_counter()
+    for i in range(args.timed):
+        switch(i)
+    elapsed = time.perf_counter() - started
+    patches_before = len(chart.ax.patches)
+
+    tracemalloc.start()
+    half = args.switches // 2
+    for i in range(half):
+        switch(i)
+    gc.collect()
+    baseline = tracemalloc.take_snapshot()
+    for i in range(half, args.switches):
+        switch(i)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    growth = sum(stat.size_diff for stat in after.compare_to(baseline, "filename"))
+    patches_after = len(chart.ax.patches)
+
+    print(f"{'switches':<24} {args.switches:>10}")
+    print(f"{'per switch (untraced)':<24} {elapsed / args.timed * 1000:>8.1f} ms")
+    print(f"{'heap growth (2nd half)':<24} {growth / 1024:>8.1f} KB")
+    print(f"{'patches on axes':<24} {patches_before:>5} -> {patches_after}")
+
+    if growth > args.max_growth_kb * 1024 or patches_after > patches_before:
+        print("chart memory is growing across switches")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
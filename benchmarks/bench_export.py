@@ -0,0 +1,101 @@
+"""Streaming export vs fetching everything first.
+
+Builds a database of random subscriptions, then times each export format and
+measures the peak Python memory of a streamed CSV export against writing the
+same CSV from a single ``fetchall``.
+
+    python benchmarks/bench_export.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_db import Database, bulk_insert_subscriptions, find_user  # noqa: E402
+from submanager_io import EXPORT_QUERIES, export_data  # noqa: E402
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Daily", "Every 3 months", "Every 2 weeks"]
+
+# The account build() gives every subscription to
+BENCH_USER = "bench"
+
+
+def build(path, count, seed=17):
+    database = Database(path)
+    connection = database.writer
+    connection.executemany("INSERT INTO Brand (brandName) VALUES (?)", [(f"Brand {i}",) for i in range(500)])
+    connection.executemany("INSERT INTO Folder (folderName) VALUES (?)", [(f"Folder {i}",) for i in range(20)])
+    userid = connection.execute("INSERT INTO User (username, password) VALUES (?, ?)",
+                                (BENCH_USER, BENCH_USER)).lastrowid
+    rng = random.Random(seed)
+    today = date.today()
+    for start in range(0, count, 50_000):
+        bulk_insert_subscriptions(connection, [
+            (f"Sub {i}", f"£{rng.uniform(1, 100):.2f}", rng.randint(1, 500), rng.randint(1, 20),
+             rng.choice(CYCLES), (today + timedelta(days=rng.randrange(1, 730))).isoformat())
+            for i in range(start, min(start + 50_000, count))
+        ], userid)
+        connection.commit()
+    return database
+
+
+def fetchall_csv(connection, path):
+    columns, query = EXPORT_QUERIES["subscriptions"]
+    rows = connection.execute(query.format(where="")).fetchall()
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    return len(rows)
+
+
+def traced_peak(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        database = build(os.path.join(tmp, "bench.db"), args.rows)
+        print(f"{args.rows:,} subscriptions inserted in {time.perf_counter() - started:.1f} s")
+        reader = database.reader()
+        userid = find_user(reader, BENCH_USER)
+
+        for name, kwargs in [("subscriptions.csv", {}), ("subscriptions.jsonl", {}),
+                             ("snapshot.db", {}), ("spend.csv", {"dataset": "spend"}),
+                             ("one brand.csv", {"brand": "Brand 7"})]:
+            path = os.path.join(tmp, name)
+            started = time.perf_counter()
+            written = export_data(reader, path, userid=userid, **kwargs)
+            elapsed = time.perf_counter() - started
+            print(f"{f'export {name}: {written:,} rows':<44} {elapsed * 1000:10.1f} ms "
+                  f"({os.path.getsize(path) / 1024 / 1024:.1f} MiB)")
+
+        streamed = traced_peak(lambda: export_data(reader, os.path.join(tmp, "streamed.csv"), userid=userid))
+        loaded = traced_peak(lambda: fetchall_csv(reader, os.path.join(tmp, "loaded.csv")))
+        print(f"{'peak Python memory: streamed / fetchall':<44} {streamed:10.1f} MiB / {loaded:.1f} MiB")
+
+        database.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
@@ -0,0 +1,119 @@
+"""Streaming chunked import vs adding subscriptions one at a time.
+
+Writes a CSV of random subscriptions (with a sprinkling of invalid rows),
+imports it with ``import_subscriptions`` and, into a second database, adds
+the same rows the way the add subscription form does: a brand and folder
+lookup (inserting if missing) and an INSERT with a commit for every row.
+
+    python benchmarks/bench_import.py --rows 100000
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_core import ValidationError, validate_subscription  # noqa: E402
+from submanager_db import Database  # noqa: E402
+from submanager_io import import_subscriptions, read_records  # noqa: E402
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Daily", "Every 3 months", "Every 2 weeks"]
+
+
+def write_csv(path, count, invalid_every=97, seed=16):
+    rng = random.Random(seed)
+    today = date.today()
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Subscription Name", "Cost", "Brand", "Folder", "Billing Cycle", "Next Billing Date"])
+        for i in range(count):
+            cost = "free" if i % invalid_every == 0 else f"£{rng.uniform(1, 100):.2f}"
+            billing_date = today + timedelta(days=rng.randrange(1, 730))
+            writer.writerow([f"Sub {i}", cost, f"Brand {rng.randrange(500)}", f"Folder {rng.randrange(20)}",
+                             rng.choice(CYCLES), billing_date.strftime("%d/%m/%Y")])
+
+
+def open_database(path):
+    """A new database with one account to import into, and its userid"""
+    database = Database(path)
+    userid = database.writer.execute("INSERT INTO User (username, password) VALUES ('bench', 'bench')").lastrowid
+    database.writer.commit()
+    return database, userid
+
+
+def get_or_insert(connection, table, key_column, name_column, name):
+    row = connection.execute(f"SELECT {key_column} FROM {table} WHERE {name_column} = ?", (name,)).fetchone()
+    if row:
+        return row[0]
+    cursor = connection.execute(f"INSERT INTO {table} ({name_column}) VALUES (?)", (name,))
+    connection.commit()
+    return cursor.lastrowid
+
+
+def one_at_a_time(connection, path, userid):
+    imported = 0
+    for _, record in read_records(path):
+        try:
+            name, cost, brand, folder, cycle, billing_date = validate_subscription(*record.values())
+        except ValidationError:
+            continue
+        folderid = get_or_insert(connection, "Folder", "folderid", "folderName", folder)
+        brandid = get_or_insert(connection, "Brand", "brandid", "brandName", brand)
+        connection.execute(
+            "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate,"
+            " userid) VALUES (?, ?, ?, ?, ?, ?, ?)", (name, cost, brandid, folderid, cycle, billing_date, userid)
+        )
+        connection.commit()
+        imported += 1
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "subscriptions.csv")
+        write_csv(path, args.rows)
+
+        database, userid = open_database(os.path.join(tmp, "chunked.db"))
+        started = time.perf_counter()
+        result = import_subscriptions(database.writer, read_records(path), chunk_size=args.chunk_size,
+                                      userid=userid)
+        elapsed = time.perf_counter() - started
+        database.close()
+        print(f"{f'chunked import: {len(result.imported):,} rows':<44} {elapsed * 1000:10.1f} ms "
+              f"({len(result.errors):,} rejected)")
+
+        # Again into a fresh database with allocations traced (tracing slows it down)
+        database, userid = open_database(os.path.join(tmp, "traced.db"))
+        tracemalloc.start()
+        import_subscriptions(database.writer, read_records(path), chunk_size=args.chunk_size, userid=userid)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        database.close()
+        print(f"{'chunked import: peak Python memory':<44} {peak / 1024 / 1024:10.1f} MiB")
+
+        database, userid = open_database(os.path.join(tmp, "single.db"))
+        started = time.perf_counter()
+        imported = one_at_a_time(database.writer, path, userid)
+        elapsed = time.perf_counter() - started
+        database.close()
+        print(f"{f'one at a time: {imported:,} rows':<44} {elapsed * 1000:10.1f} ms")
+        assert imported == len(result.imported)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
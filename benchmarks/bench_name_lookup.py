@@ -0,0 +1,69 @@
+"""Brand/folder name resolution: SELECT then INSERT vs get_or_insert_name vs cache.
+
+Resolves a stream of brand names drawn (skewed towards a few popular
+brands) from a larger set, the way repeated subscription saves do: the old
+SELECT, INSERT and commit per new name, a bare ``get_or_insert_name`` and
+the writer's ``NameCache``.
+
+    python benchmarks/bench_name_lookup.py --lookups 200000 --names 5000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_db import Database, get_or_insert_name  # noqa: E402
+
+
+def select_then_insert(connection, name):
+    row = connection.execute("SELECT brandid FROM Brand WHERE brandName = ?", (name,)).fetchone()
+    if row:
+        return row[0]
+    cursor = connection.execute("INSERT INTO Brand (brandName) VALUES (?)", (name,))
+    connection.commit()
+    return cursor.lastrowid
+
+
+def run(label, path, names, resolve):
+    database = Database(path)
+    connection = database.writer
+    started = time.perf_counter()
+    ids = [resolve(database, connection, name) for name in names]
+    connection.commit()
+    elapsed = time.perf_counter() - started
+    database.close()
+    print(f"{f'{label}: {len(names):,} lookups':<44} {elapsed * 1000:10.1f} ms "
+          f"({elapsed / len(names) * 1e6:.2f} us/lookup)")
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--names", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(18)
+    weights = [1 / (rank + 1) for rank in range(args.names)]
+    names = [f"Brand {i}" for i in rng.choices(range(args.names), weights, k=args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        expected = run("SELECT then INSERT", os.path.join(tmp, "select.db"), names,
+                       lambda database, connection, name: select_then_insert(connection, name))
+        uncached = run("get_or_insert_name", os.path.join(tmp, "uncached.db"), names,
+                     lambda database, connection, name: get_or_insert_name(connection, "Brand", name))
+        cached = run("NameCache", os.path.join(tmp, "cached.db"), names,
+                     lambda database, connection, name: database.brands.get(connection, name))
+        assert expected == uncached == cached
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
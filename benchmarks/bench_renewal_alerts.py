@@ -0,0 +1,95 @@
+"""Bulk renewal alert generation vs creating the alerts one at a time.
+
+Builds a database of random subscriptions (every tenth in a trial folder),
+generates their renewal and trial ending alerts in one transaction, runs the
+generation again to time the no-op path, and compares with inserting the
+same alerts one statement and commit at a time, as the create alert dialog does.
+
+    python benchmarks/bench_renewal_alerts.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_alerts import generate_renewal_alerts  # noqa: E402
+from submanager_db import Database  # noqa: E402
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Daily", "Every 3 months", "Every 2 weeks"]
+
+
+def make_rows(count, seed=15):
+    rng = random.Random(seed)
+    today = date.today()
+    for i in range(count):
+        yield (f"Sub {i}", f"£{rng.uniform(1, 100):,.2f}", 1 if i % 10 == 0 else 2,
+               rng.choice(CYCLES), (today + timedelta(days=rng.randrange(-400, 60))).isoformat())
+
+
+def build(path, rows):
+    database = Database(path)
+    connection = database.writer
+    connection.executemany("INSERT INTO Folder (folderName) VALUES (?)", [("Free Trials",), ("Streaming",)])
+    connection.executemany(
+        "INSERT INTO Subscription (subscriptionName, cost, folderid, billingCycle, nextBillingDate)"
+        " VALUES (?, ?, ?, ?, ?)", make_rows(rows)
+    )
+    connection.commit()
+    return database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days-before", type=int, default=3)
+    parser.add_argument("--horizon", type=int, default=31)
+    parser.add_argument("--single-inserts", type=int, default=5_000,
+                        help="alerts to insert one at a time for the comparison")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = build(os.path.join(tmp, "bench.db"), args.rows)
+        connection = database.writer
+
+        started = time.perf_counter()
+        created = generate_renewal_alerts(connection, args.days_before, args.horizon, include_trials=True)
+        elapsed = time.perf_counter() - started
+        print(f"{f'generate: {len(created):,} alerts':<44} {elapsed * 1000:10.1f} ms "
+              f"({elapsed / max(len(created), 1) * 1e6:.1f} us/alert)")
+
+        started = time.perf_counter()
+        again = generate_renewal_alerts(connection, args.days_before, args.horizon, include_trials=True)
+        print(f"{'generate again (nothing new)':<44} {(time.perf_counter() - started) * 1000:10.1f} ms")
+        assert not again, f"second run created {len(again)} alerts"
+
+        # The same alerts, one INSERT and commit each
+        rows = connection.execute(
+            "SELECT subscriptionid, alert_date, alert_type, alert_message FROM Alert LIMIT ?",
+            (args.single_inserts,)
+        ).fetchall()
+        connection.execute("DELETE FROM Alert")
+        connection.commit()
+        started = time.perf_counter()
+        for row in rows:
+            connection.execute(
+                "INSERT INTO Alert (subscriptionid, alert_date, alert_type, alert_message) VALUES (?, ?, ?, ?)", row
+            )
+            connection.commit()
+        elapsed = time.perf_counter() - started
+        print(f"{f'one at a time: {len(rows):,} alerts':<44} {elapsed * 1000:10.1f} ms "
+              f"({elapsed / max(len(rows), 1) * 1e6:.1f} us/alert)")
+
+        database.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
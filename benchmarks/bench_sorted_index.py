@@ -0,0 +1,90 @@
+"""Recursive merge sort vs the maintained SortedSubscriptionIndex.
+
+For each size this times what a refresh cost before (a full merge sort, as the
+list's since-removed merge_sort did) and
+what it costs now (one build, then a bisect insert/remove per write), plus a
+prefix lookup.
+
+    python benchmarks/bench_sorted_index.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from SubManager_Combined import NOCASE_FOLD, SortedSubscriptionIndex  # noqa: E402
+
+
+def make_rows(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for subscription_id in range(1, count + 1):
+        name = rng.choice(string.ascii_letters) + "".join(rng.choices(string.ascii_lowercase, k=9))
+        rows.append((subscription_id, name, "£9.99", "Brand", "Folder", "Monthly", "01/01/2030"))
+    return rows
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def legacy_merge_sort(rows):
+    """The subscription list's old recursive merge sort on lowercased names"""
+    if len(rows) <= 1:
+        return rows
+    mid = len(rows) // 2
+    left = legacy_merge_sort(rows[:mid])
+    right = legacy_merge_sort(rows[mid:])
+
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i][1].lower() < right[j][1].lower():
+            result.append(left[i])
+            i += 1
+        else:
+            result.append(right[j])
+            j += 1
+    result.extend(left[i:])
+    result.extend(right[j:])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--writes", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'merge_sort':>12} {'index build':>12} {'per write':>12} {'prefix':>10}")
+    for size in args.sizes:
+        rows = make_rows(size)
+
+        merge_time, merged = timed(lambda: legacy_merge_sort(rows))
+        build_time, index = timed(lambda: SortedSubscriptionIndex(rows))
+        assert ([row[1].translate(NOCASE_FOLD) for row in merged]
+                == [row[1].translate(NOCASE_FOLD) for row in index.rows])
+
+        # Each save/edit/delete is one bisect insert or removal
+        extra = make_rows(args.writes, seed=size)
+        started = time.perf_counter()
+        for offset, row in enumerate(extra):
+            index.add((size + offset + 1,) + row[1:])
+            index.remove(size + offset + 1)
+        write_time = (time.perf_counter() - started) / (2 * args.writes)
+
+        prefix_time, _ = timed(lambda: index.prefix_matches("ab"))
+
+        print(f"{size:>10,} {merge_time * 1000:>10.1f}ms {build_time * 1000:>10.1f}ms "
+              f"{write_time * 1e6:>10.1f}us {prefix_time * 1e6:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Per-row aggregation vs the trigger-maintained spend tables.
+
+Builds a database of random subscriptions, then times the welcome summary and
+the insights projection read both ways (checking they agree), the cost the
+triggers add to writes, and the consistency checker.
+
+    python benchmarks/bench_spend_aggregates.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_aggregates import check_spend_aggregates  # noqa: E402
+from submanager_db import Database  # noqa: E402
+from submanager_projection import month_number, month_start, project_monthly_totals  # noqa: E402
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Daily", "Every 3 months", "Every 2 weeks"]
+
+LEGACY_SUMMARY_SQL = """
+    SELECT
+        COUNT(*) as total_subs,
+        SUM(CASE
+            WHEN cost LIKE '£%' THEN CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS DECIMAL(10,2))
+            ELSE CAST(cost AS DECIMAL(10,2))
+        END) as total_cost
+    FROM Subscription
+"""
+
+AGGREGATE_SUMMARY_SQL = """
+    SELECT COALESCE(SUM(subscriptions), 0), COALESCE(SUM(total_pence), 0) / 100.0
+    FROM FolderSpend
+"""
+
+LEGACY_CHART_SQL = """
+    SELECT nextBillingDate, billingCycle,
+           CAST(REPLACE(REPLACE(cost, '£', ''), ',', '') AS REAL)
+    FROM Subscription
+    WHERE nextBillingDate IS NOT NULL
+    AND cost IS NOT NULL
+    AND nextBillingDate < ?
+"""
+
+AGGREGATE_CHART_SQL = """
+    SELECT nextBillingDate, billingCycle, total_pence / 100.0
+    FROM CycleSpend
+    WHERE nextBillingDate < ?
+"""
+
+
+def make_rows(count, seed=11):
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    for i in range(count):
+        yield (f"Sub {i}", f"£{rng.uniform(1, 100):,.2f}", rng.randint(1, 20), rng.randint(1, 8),
+               rng.choice(CYCLES), (start + timedelta(days=rng.randrange(730))).isoformat())
+
+
+def insert_rows(connection, rows):
+    connection.executemany(
+        "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate)"
+        " VALUES (?, ?, ?, ?, ?, ?)", rows
+    )
+    connection.commit()
+
+
+def project(connection, query, first_month, months):
+    rows = connection.execute(query, (month_start(first_month + months),)).fetchall()
+    billing_dates, cycles, costs = zip(*rows) if rows else ((), (), ())
+    return len(rows), project_monthly_totals(billing_dates, cycles, costs, first_month, months)
+
+
+def timed(label, func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<44} {best * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--writes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "bench.db"))
+        connection = database.writer
+
+        started = time.perf_counter()
+        insert_rows(connection, make_rows(args.rows))
+        print(f"{args.rows:,} subscriptions inserted in {time.perf_counter() - started:.1f} s")
+
+        legacy = timed("summary: scan Subscription", lambda: connection.execute(LEGACY_SUMMARY_SQL).fetchone())
+        current = timed("summary: FolderSpend", lambda: connection.execute(AGGREGATE_SUMMARY_SQL).fetchone())
+        assert legacy[0] == current[0] and abs(legacy[1] - current[1]) < 0.01, (legacy, current)
+
+        first_month, months = month_number("2025-01"), 36
+        legacy_rows, legacy_totals = timed(
+            "projection: Subscription rows", lambda: project(connection, LEGACY_CHART_SQL, first_month, months))
+        current_rows, current_totals = timed(
+            "projection: CycleSpend rows", lambda: project(connection, AGGREGATE_CHART_SQL, first_month, months))
+        assert np.allclose(legacy_totals, current_totals), "projections differ"
+        print(f"{'rows read by the projection':<44} {legacy_rows:,} -> {current_rows:,}")
+
+        # Write cost: the same inserts with and without the spend triggers
+        extra = list(make_rows(args.writes, seed=12))
+        started = time.perf_counter()
+        insert_rows(connection, extra)
+        with_triggers = time.perf_counter() - started
+
+        triggers = connection.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'subscription_spend_%'"
+        ).fetchall()
+        for name, _ in triggers:
+            connection.execute(f"DROP TRIGGER {name}")
+        started = time.perf_counter()
+        insert_rows(connection, extra)
+        without_triggers = time.perf_counter() - started
+        print(f"{f'{args.writes:,} inserts without / with spend triggers':<44} "
+              f"{without_triggers * 1000:10.1f} ms / {with_triggers * 1000:.1f} ms")
+
+        # The second batch bypassed the triggers, so the checker must notice
+        started = time.perf_counter()
+        differences = check_spend_aggregates(connection)
+        print(f"{'consistency check':<44} {(time.perf_counter() - started) * 1000:10.1f} ms "
+              f"({len(differences)} tables out of date, as expected)")
+        for _, sql in triggers:
+            connection.execute(sql)
+
+        database.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
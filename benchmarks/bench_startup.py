@@ -0,0 +1,98 @@
+"""Cold-start time of the app: import, database open and the first login paint.
+
+Each run is a fresh interpreter, so nothing is cached between runs.  The
+import is timed on its own as well because it needs no display; the paint
+is skipped (and reported as such) when Tk cannot open one.  The whole run of
+a headless ``submanager_cli summary`` (interpreter start to exit) is timed
+for comparison.
+
+    python benchmarks/bench_startup.py --runs 10 --max-ms 400
+
+With --max-ms the script exits non-zero when the median first paint (or the
+median import, without a display) is slower, so it can guard CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs inside the child interpreter; prints the timings as JSON
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import SubManager_Combined as app
+imported = time.perf_counter()
+app.open_database(sys.argv[1])
+opened = time.perf_counter()
+result = {"import": imported - started, "open": opened - imported}
+try:
+    window = app.Window()
+    window.update_idletasks()
+    result["paint"] = time.perf_counter() - started
+    window.destroy()
+except app.tk.TclError:
+    result["paint"] = None
+print(json.dumps(result))
+"""
+
+
+def run_once(database_path):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, database_path],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_cli(database_path):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "submanager_cli", "--db", database_path, "summary"],
+        cwd=ROOT, capture_output=True, check=True
+    )
+    return time.perf_counter() - started
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail if the median startup is slower than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, "startup.db")
+        run_once(database_path)  # creates and migrates the database, so runs only time opening it
+        results = [run_once(database_path) for _ in range(args.runs)]
+        cli_runs = [time_cli(database_path) for _ in range(args.runs)]
+
+    import_ms = median_ms([result["import"] for result in results])
+    open_ms = median_ms([result["open"] for result in results])
+    print(f"{'import':<20} {import_ms:8.1f} ms")
+    print(f"{'open database':<20} {open_ms:8.1f} ms")
+
+    paints = [result["paint"] for result in results if result["paint"] is not None]
+    if paints:
+        measured = median_ms(paints)
+        print(f"{'first login paint':<20} {measured:8.1f} ms")
+    else:
+        measured = import_ms
+        print(f"{'first login paint':<20} {'skipped (no display)':>20}")
+    print(f"{'cli summary (whole)':<20} {median_ms(cli_runs):8.1f} ms")
+
+    if args.max_ms is not None and measured > args.max_ms:
+        print(f"startup regression: {measured:.1f} ms > {args.max_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
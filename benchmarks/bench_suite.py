@@ -0,0 +1,245 @@
+"""Benchmark suite for the app's hot paths, with machine-readable results.
+
+Generates (or reuses, with --keep) seeded databases with generate_data.py
+and times, for the account with the most subscriptions, what each page does:
+
+* the old recursive merge sort of the list and ``SortedSubscriptionIndex`` build
+* ``binary_search_prefix`` on the sorted index
+* ``handle_search`` (``run_search``: ranked, typo-tolerant and short terms)
+* ``refresh_treeview`` (``fetch_catalog``, or the paged list's count and first
+  page for large catalogs)
+* ``filter_data`` (brand and billing cycle filters, and a cost sort)
+* ``load_alerts``
+* ``get_available_years`` (billing range plus the year list)
+* ``update_visualization`` data preparation (``project_chart_totals`` for all
+  years and for one year)
+* the ``SubscriptionColumns`` snapshot the last three use: loading it,
+  refreshing 100 ids, and totals by month, folder and brand over every
+  account's subscriptions
+
+Each case runs --repeat times; the JSON written with --output records the
+median and minimum per case with the commit, Python and SQLite versions.
+--compare reads an earlier file and prints the ratio per case; with
+--max-slowdown the script exits non-zero when any case got slower than that.
+
+    python benchmarks/bench_suite.py --sizes small medium --output results.json
+    python benchmarks/bench_suite.py --sizes medium --keep /tmp/bench-dbs --compare results.json --max-slowdown 1.5
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import SubManager_Combined as app  # noqa: E402
+from bench_sorted_index import legacy_merge_sort  # noqa: E402
+from generate_data import DEFAULT_SEED, SIZES, generate  # noqa: E402
+from submanager_columns import SubscriptionColumns  # noqa: E402
+from submanager_db import Database  # noqa: E402
+from submanager_io import filter_conditions  # noqa: E402
+
+# merge_sort is recursive Python; above this many rows it would dominate the run
+MERGE_SORT_LIMIT = 200_000
+
+SEARCH_TERMS = ["netflix", "spotfy premium", "cloud", "ap"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def database_for(size, seed, keep):
+    """Path of a generated database for size, reusing one kept from an earlier run"""
+    directory = keep or tempfile.mkdtemp()
+    path = os.path.join(directory, f"{size}-{seed}.db")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        generate(path, SIZES[size], seed=seed).close()
+        print(f"generated {size} ({SIZES[size]:,} subscriptions) in {time.perf_counter() - started:.1f} s",
+              file=sys.stderr)
+    return path
+
+
+def time_case(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def refresh_treeview(reader, userid):
+    """What a refresh reads: the whole catalog, or the paged list's count and first page"""
+    rows = app.fetch_catalog(reader, userid)
+    if rows is not None:
+        return rows
+    virtual = app.VirtualSubscriptionList
+    reader.execute(
+        "SELECT COUNT(*) FROM Subscription s INNER JOIN Brand b ON s.brandid = b.brandid"
+        " INNER JOIN Folder f ON s.folderid = f.folderid WHERE s.userid = ?", (userid,)
+    ).fetchone()
+    return reader.execute(
+        virtual.SELECT + " WHERE s.userid = ? ORDER BY " + virtual.ORDER.format("") + " LIMIT ?",
+        (userid, 2 * app.VIRTUAL_LIST_BUFFER)
+    ).fetchall()
+
+
+def filter_data(reader, userid, brand, billing_cycle):
+    conditions, params = filter_conditions(brand=brand, billing_cycle=billing_cycle, userid=userid)
+    return reader.execute(app.SUBSCRIPTION_ROWS_SQL + " WHERE " + " AND ".join(conditions), params).fetchall()
+
+
+def cases(reader, userid, everyone):
+    """(name, function) for every timed case, given the session's user and every account's columns"""
+    catalog = reader.execute(app.SUBSCRIPTION_ROWS_SQL + " WHERE s.userid = ?", (userid,)).fetchall()
+    index = app.SortedSubscriptionIndex(catalog)
+    rng = random.Random(DEFAULT_SEED)
+    prefixes = [row[1][:rng.randint(1, 4)] for row in rng.sample(catalog, min(len(catalog), 1000))]
+    brand, cycle = reader.execute("""
+        SELECT b.brandName, s.billingCycle FROM Subscription s INNER JOIN Brand b ON s.brandid = b.brandid
+        WHERE s.userid = ? GROUP BY 1, 2 ORDER BY COUNT(*) DESC LIMIT 1
+    """, (userid,)).fetchone()
+
+    columns = SubscriptionColumns.load(reader, userid)
+    refreshed_ids = [int(subscription_id) for subscription_id in rng.sample(list(columns.ids), min(len(columns), 100))]
+    filter_query = app.SUBSCRIPTION_ROWS_SQL + " WHERE s.userid = ? AND s.billingCycle = ?"
+
+    insights = SimpleNamespace()
+    first_date, last_date = columns.billing_range()
+    years = app.ExpenseInsightsFrame.get_available_years(insights, first_date, last_date)
+    all_years = (insights.first_billing_month,
+                 app.month_number(f"{max(years)}-12") - insights.first_billing_month + 1)
+
+    selected = [
+        ("sorted_index_build", lambda: app.SortedSubscriptionIndex(catalog)),
+        ("binary_search_prefix x1000", lambda: [index.find_prefix(prefix) for prefix in prefixes]),
+        ("prefix_matches x1000", lambda: [index.prefix_matches(prefix) for prefix in prefixes]),
+    ]
+    if len(catalog) <= MERGE_SORT_LIMIT:
+        selected.insert(0, ("merge_sort", lambda: legacy_merge_sort(catalog)))
+    selected += [(f"handle_search '{term}'", lambda term=term: app.run_search(reader, userid, term))
+                 for term in SEARCH_TERMS]
+    selected += [
+        ("refresh_treeview", lambda: refresh_treeview(reader, userid)),
+        ("filter_data brand+cycle", lambda: filter_data(reader, userid, brand, cycle)),
+        ("load_alerts", lambda: reader.execute(
+            app.ALERT_ROWS_SQL + " WHERE s.userid = ? ORDER BY a.alert_date, a.alertid", (userid,)).fetchall()),
+        ("filter_data cost sort", lambda: app.fetch_cost_sorted_rows(
+            reader, columns, filter_query, (userid, cycle), True)),
+        ("get_available_years", lambda: app.ExpenseInsightsFrame.get_available_years(
+            SimpleNamespace(), *columns.billing_range())),
+        ("update_visualization all years", lambda: app.project_chart_totals(reader, columns, *all_years)),
+        ("update_visualization one year", lambda: app.project_chart_totals(
+            reader, columns, app.month_number(f"{years[-1]}-01"), 12)),
+        ("columns load", lambda: SubscriptionColumns.load(reader, userid)),
+        ("columns refresh 100 ids", lambda: columns.refreshed(reader, refreshed_ids)),
+        ("columns by month (all users)", everyone.month_totals),
+        ("columns by folder (all users)", everyone.folder_totals),
+        ("columns by brand (all users)", everyone.brand_totals),
+    ]
+    return len(catalog), selected
+
+
+def run_size(size, seed, keep, repeat):
+    database = Database(database_for(size, seed, keep))
+    try:
+        reader = database.reader()
+        userid, subscriptions = reader.execute(
+            "SELECT userid, COUNT(*) FROM Subscription GROUP BY userid ORDER BY 2 DESC LIMIT 1"
+        ).fetchone()
+        user_rows, selected = cases(reader, userid, SubscriptionColumns.load(reader))
+
+        results = []
+        for name, func in selected:
+            func()  # warm the page cache and statement cache
+            samples = time_case(func, repeat)
+            results.append({
+                "size": size, "rows": SIZES[size], "user_rows": user_rows, "case": name,
+                "median_ms": round(statistics.median(samples) * 1000, 3),
+                "min_ms": round(min(samples) * 1000, 3),
+                "runs": repeat,
+            })
+            print(f"{size:<7} {name:<34} {results[-1]['median_ms']:10.2f} ms", file=sys.stderr)
+        return results
+    finally:
+        database.close()
+
+
+def compare(results, baseline_path):
+    """Print new/old median ratios; returns the largest"""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    previous = {(result["size"], result["case"]): result["median_ms"] for result in baseline["results"]}
+
+    print(f"compared with {baseline.get('commit') or baseline_path}")
+    worst = 0.0
+    for result in results:
+        old = previous.get((result["size"], result["case"]))
+        if not old:
+            continue
+        ratio = result["median_ms"] / old
+        worst = max(worst, ratio)
+        print(f"{result['size']:<7} {result['case']:<34} {old:10.2f} -> {result['median_ms']:10.2f} ms"
+              f"  x{ratio:.2f}")
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", metavar="DIR", help="keep generated databases here and reuse them")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="JSON", help="results file from an earlier run")
+    parser.add_argument("--max-slowdown", type=float, help="fail if a case is this many times slower than --compare")
+    args = parser.parse_args()
+
+    # The insights cases need the projection helpers the chart page loads
+    app.load_chart_libraries()
+
+    results = []
+    for size in args.sizes:
+        results += run_size(size, args.seed, args.keep, args.repeat)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        worst = compare(results, args.compare)
+        if args.max_slowdown is not None and worst > args.max_slowdown:
+            print(f"slowdown x{worst:.2f} is over x{args.max_slowdown:.2f}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Seeded generator of realistic subscription databases for benchmarking.
+
+Fills User, Brand, Folder, Subscription and Alert through the app's own
+schema and bulk-load path, so the spend aggregates and search index are
+built as they would be in use.  The same seed always gives the same data.
+
+* users own skewed numbers of subscriptions (a few heavy accounts, a long
+  tail of light ones)
+* brands are well-known services plus a long tail, picked with Zipf-like
+  popularity; each subscription is a plan of its brand ("Netflix Premium")
+* every billing cycle appears: Daily, Weekly, Monthly, Yearly and custom
+  "Every N days/weeks/months/years" values
+* costs are log-normal around a typical monthly price, scaled to the cycle
+* next billing dates fall within one cycle from today
+* a "Free Trials" folder gets trial ending alerts; everything else gets
+  renewal alerts for the next month
+
+Sizes are named for their subscription counts (small 1k, medium 100k,
+large 1M) or given with --rows:
+
+    python benchmarks/generate_data.py --size large --db /tmp/large.db
+    python benchmarks/generate_data.py --rows 250000 --users 2000 --seed 7 --db /tmp/custom.db
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_alerts import generate_renewal_alerts  # noqa: E402
+from submanager_core import DAY, MONTH, parse_billing_cycle  # noqa: E402
+from submanager_db import Database, bulk_insert_subscriptions  # noqa: E402
+
+SIZES = {"small": 1_000, "medium": 100_000, "large": 1_000_000}
+
+DEFAULT_SEED = 23
+
+KNOWN_BRANDS = [
+    "Netflix", "Spotify", "Amazon Prime", "Disney+", "YouTube Premium", "Apple Music", "iCloud", "Google One",
+    "Microsoft 365", "Adobe Creative Cloud", "Dropbox", "Xbox Game Pass", "PlayStation Plus", "Nintendo Online",
+    "Audible", "Kindle Unlimited", "NOW", "Paramount+", "Crunchyroll", "Deezer", "Tidal", "The Times",
+    "The Economist", "Financial Times", "Headspace", "Calm", "Strava", "Peloton", "Duolingo", "LinkedIn Premium",
+    "GitHub", "1Password", "NordVPN", "Canva", "Notion", "Patreon", "HelloFresh", "Gousto", "PureGym", "Deliveroo Plus",
+]
+
+PLANS = ["", " Basic", " Standard", " Premium", " Family", " Student", " Duo", " Pro", " Plus"]
+
+# Folder -> share of subscriptions
+FOLDERS = {
+    "Entertainment": 0.26, "Music": 0.14, "Software": 0.12, "Cloud Storage": 0.07, "News": 0.06,
+    "Gaming": 0.08, "Fitness": 0.06, "Education": 0.05, "Food": 0.05, "Utilities": 0.04,
+    "Shopping": 0.03, "Free Trials": 0.04,
+}
+
+# Billing cycle -> share of subscriptions
+CYCLES = {
+    "Monthly": 0.52, "Yearly": 0.18, "Weekly": 0.07, "Daily": 0.02,
+    "Every 3 months": 0.06, "Every 6 months": 0.04, "Every 2 weeks": 0.03, "Every 4 weeks": 0.02,
+    "Every 2 months": 0.02, "Every 14 days": 0.01, "Every 10 days": 0.01, "Every 2 years": 0.01,
+    "Every 1 month": 0.005, "Every 18 months": 0.005,
+}
+
+# Subscriptions written per transaction
+COMMIT_EVERY = 50_000
+
+
+def zipf_weights(count, exponent=1.0):
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def cycle_days(cycle):
+    """Approximate days per charge, for scaling costs and spreading billing dates"""
+    unit, step = parse_billing_cycle(cycle)
+    if unit == DAY:
+        return step
+    if unit == MONTH:
+        return step * 30.4
+    return 30.4
+
+
+def subscription_rows(rng, count, brands, folders, today):
+    """(name, cost, brandid, folderid, cycle, ISO next billing date) rows"""
+    brand_ids = list(brands)
+    brand_weights = zipf_weights(len(brand_ids))
+    folder_ids = [folders[name] for name in FOLDERS]
+    cycles = list(CYCLES)
+
+    picked_brands = rng.choices(brand_ids, brand_weights, k=count)
+    picked_folders = rng.choices(folder_ids, list(FOLDERS.values()), k=count)
+    picked_cycles = rng.choices(cycles, list(CYCLES.values()), k=count)
+    for brandid, folderid, cycle in zip(picked_brands, picked_folders, picked_cycles):
+        days = cycle_days(cycle)
+        # About £10 a month, spread log-normally, charged per cycle
+        cost = max(0.5, math.exp(rng.gauss(math.log(10), 0.6)) * days / 30.4)
+        next_billing = today + timedelta(days=rng.randint(1, max(1, round(days))))
+        yield (brands[brandid] + rng.choice(PLANS), f"£{cost:.2f}", brandid, folderid, cycle,
+               next_billing.isoformat())
+
+
+def generate(path, rows, users=None, seed=DEFAULT_SEED, alerts=True, today=None):
+    """Create a database at path with rows subscriptions; returns the open Database"""
+    rng = random.Random(seed)
+    today = today or date.today()
+    users = users or max(1, rows // 100)
+
+    database = Database(path)
+    connection = database.writer
+    connection.executemany(
+        "INSERT INTO User (username, password, firstname, surname) VALUES (?, ?, ?, ?)",
+        [(f"user{number}", "password", f"First{number}", f"Last{number}") for number in range(1, users + 1)]
+    )
+    user_ids = [row[0] for row in connection.execute("SELECT userid FROM User ORDER BY userid")]
+
+    brand_names = KNOWN_BRANDS + [f"Brand {number}" for number in range(max(0, rows // 200 - len(KNOWN_BRANDS)))]
+    connection.executemany("INSERT INTO Brand (brandName) VALUES (?)", [(name,) for name in brand_names])
+    brands = dict(connection.execute("SELECT brandid, brandName FROM Brand"))
+    connection.executemany("INSERT INTO Folder (folderName) VALUES (?)", [(name,) for name in FOLDERS])
+    folders = {name: folderid for folderid, name in connection.execute("SELECT folderid, folderName FROM Folder")}
+
+    # Skewed subscriptions per user, every user with at least one
+    owners = rng.choices(user_ids, zipf_weights(len(user_ids), 0.8), k=max(0, rows - len(user_ids)))
+    per_user = {userid: 1 for userid in user_ids[:rows]}
+    for userid in owners:
+        per_user[userid] += 1
+
+    pending = 0
+    for userid, count in per_user.items():
+        bulk_insert_subscriptions(connection, list(subscription_rows(rng, count, brands, folders, today)), userid)
+        pending += count
+        if pending >= COMMIT_EVERY:
+            connection.commit()
+            pending = 0
+    connection.commit()
+
+    if alerts:
+        generate_renewal_alerts(connection, include_trials=True, today=today)
+    return database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="path of the database to create")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--size", choices=list(SIZES), default="small")
+    size.add_argument("--rows", type=int, help="number of subscriptions")
+    parser.add_argument("--users", type=int, help="number of accounts (default rows / 100)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--no-alerts", action="store_true")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        sys.exit(f"{args.db} already exists")
+    rows = args.rows if args.rows is not None else SIZES[args.size]
+
+    started = time.perf_counter()
+    database = generate(args.db, rows, args.users, args.seed, alerts=not args.no_alerts)
+    counts = {
+        table: database.writer.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("User", "Brand", "Folder", "Subscription", "Alert")
+    }
+    database.close()
+    print(f"Generated in {time.perf_counter() - started:.1f} s: "
+          + ", ".join(f"{count:,} {table}" for table, count in counts.items()))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except sqlite3.Error as e:
+        sys.exit(f"Database error: {e}")
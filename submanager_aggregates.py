@@ -0,0 +1,258 @@
+"""Spend aggregates kept up to date by triggers on ``Subscription``.
+
+Each table holds, per owner (``userid``, 0 for unowned rows) and key, the
+number of subscriptions and their total cost in pence (integers, so repeated
+trigger updates never drift):
+
+* ``CycleSpend``: by next billing date and billing cycle, which is all the
+  billing projection needs, so the insights chart reads one row per distinct
+  date/cycle instead of one per subscription
+* ``FolderSpend`` and ``BrandSpend``: by folder and brand (the welcome
+  summary sums ``FolderSpend``)
+
+Costs are stored as text such as ``£1,234.50``; they are parsed once per row
+write in the triggers rather than on every read.
+
+Bulk loads skip the per-row insert trigger (see ``BULK_LOAD_GUARD``) and fold
+their new rows in afterwards with ``add_spend_since``, one grouped statement
+per table.
+
+``check_spend_aggregates`` recomputes every table from the live data and
+reports the differences; run this module to check (and ``--repair``) a
+database:
+
+    python submanager_aggregates.py --db path/to/subscriptions.db
+"""
+import argparse
+import sqlite3
+
+# Cost text to integer pence; unparseable or missing costs count as zero
+COST_PENCE = "COALESCE(CAST(ROUND(CAST(REPLACE(REPLACE({row}.cost, '£', ''), ',', '') AS REAL) * 100) AS INTEGER), 0)"
+
+# Every table is keyed by owner first, so a user's totals are one range of the primary key
+USER_KEY = ("userid INTEGER", "COALESCE({row}.userid, 0)")
+
+# Table -> (key column definitions, key expressions over a Subscription row, row condition)
+SPEND_AGGREGATES = {
+    "CycleSpend": (
+        [USER_KEY[0], "nextBillingDate TEXT", "billingCycle TEXT"],
+        [USER_KEY[1], "{row}.nextBillingDate", "COALESCE({row}.billingCycle, '')"],
+        "{row}.nextBillingDate IS NOT NULL",
+    ),
+    "FolderSpend": (
+        [USER_KEY[0], "folderid INTEGER"],
+        [USER_KEY[1], "COALESCE({row}.folderid, 0)"],
+        "1",
+    ),
+    "BrandSpend": (
+        [USER_KEY[0], "brandid INTEGER"],
+        [USER_KEY[1], "COALESCE({row}.brandid, 0)"],
+        "1",
+    ),
+}
+
+# Columns whose changes can move a subscription between aggregate rows
+TRACKED_COLUMNS = "cost, billingCycle, nextBillingDate, folderid, brandid, userid"
+
+# Insert triggers stay idle while a bulk load has a row in BulkLoad.  The row
+# only ever exists inside the loading transaction, so no other connection sees it
+BULK_LOAD_GUARD = "WHEN NOT EXISTS (SELECT 1 FROM BulkLoad)"
+
+
+def run_script(connection, script):
+    """Run each statement of script with execute, inside the caller's transaction.
+
+    ``executescript`` would commit that transaction first, so a migration that
+    failed part way could no longer be rolled back.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            connection.execute(statement)
+            statement = ""
+    if statement.strip():
+        connection.execute(statement)
+
+
+def _key_names(table):
+    return [definition.split()[0] for definition in SPEND_AGGREGATES[table][0]]
+
+
+def _add_statement(table, row):
+    keys, expressions, condition = SPEND_AGGREGATES[table]
+    names = ", ".join(_key_names(table))
+    values = ", ".join(expression.format(row=row) for expression in expressions)
+    return f"""
+            INSERT INTO {table} ({names}, subscriptions, total_pence)
+            SELECT {values}, 1, {COST_PENCE.format(row=row)}
+            WHERE {condition.format(row=row)}
+            ON CONFLICT ({names}) DO UPDATE SET
+                subscriptions = subscriptions + 1,
+                total_pence = total_pence + excluded.total_pence;"""
+
+
+def _remove_statements(table, row):
+    keys, expressions, condition = SPEND_AGGREGATES[table]
+    match = " AND ".join(
+        f"{name} = {expression.format(row=row)}"
+        for name, expression in zip(_key_names(table), expressions)
+    )
+    return f"""
+            UPDATE {table} SET
+                subscriptions = subscriptions - 1,
+                total_pence = total_pence - {COST_PENCE.format(row=row)}
+            WHERE {match};
+            DELETE FROM {table} WHERE {match} AND subscriptions <= 0;"""
+
+
+def _live_query(table, condition=""):
+    """The aggregate computed straight from Subscription (optionally only some rows)"""
+    keys, expressions, row_condition = SPEND_AGGREGATES[table]
+    values = ", ".join(expression.format(row="s") for expression in expressions)
+    return f"""
+        SELECT {values}, COUNT(*), SUM({COST_PENCE.format(row="s")})
+        FROM Subscription s
+        WHERE {row_condition.format(row="s")}{condition}
+        GROUP BY {values}"""
+
+
+def spend_insert_trigger():
+    """CREATE TRIGGER statement adding each new subscription to the aggregates"""
+    adds_new = "".join(_add_statement(table, "new") for table in SPEND_AGGREGATES)
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS subscription_spend_insert
+        AFTER INSERT ON Subscription {BULK_LOAD_GUARD} BEGIN{adds_new}
+        END;"""
+
+
+def create_spend_triggers(connection):
+    """(Re)create the triggers keeping every aggregate table current"""
+    adds_new = "".join(_add_statement(table, "new") for table in SPEND_AGGREGATES)
+    removes_old = "".join(_remove_statements(table, "old") for table in SPEND_AGGREGATES)
+    for trigger in ("insert", "update", "delete"):
+        connection.execute(f"DROP TRIGGER IF EXISTS subscription_spend_{trigger}")
+    run_script(connection, f"""
+        {spend_insert_trigger()}
+
+        CREATE TRIGGER subscription_spend_update
+        AFTER UPDATE OF {TRACKED_COLUMNS} ON Subscription BEGIN{removes_old}{adds_new}
+        END;
+
+        CREATE TRIGGER subscription_spend_delete
+        AFTER DELETE ON Subscription BEGIN{removes_old}
+        END;""")
+
+
+def drop_spend_aggregates(connection):
+    """Remove the aggregate tables and their triggers (before recreating them in a new shape)"""
+    for trigger in ("insert", "update", "delete"):
+        connection.execute(f"DROP TRIGGER IF EXISTS subscription_spend_{trigger}")
+    for table in SPEND_AGGREGATES:
+        connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def create_spend_aggregates(connection):
+    """Create the aggregate tables and triggers and fill them from the live data"""
+    statements = ["CREATE TABLE IF NOT EXISTS BulkLoad (active INTEGER);"]
+    for table, (keys, _, _) in SPEND_AGGREGATES.items():
+        statements.append(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {", ".join(keys)},
+                subscriptions INTEGER NOT NULL,
+                total_pence INTEGER NOT NULL,
+                PRIMARY KEY ({", ".join(_key_names(table))})
+            ) WITHOUT ROWID;""")
+    for statement in statements:
+        connection.execute(statement)
+    create_spend_triggers(connection)
+    rebuild_spend_aggregates(connection)
+
+
+def rebuild_spend_aggregates(connection, tables=None):
+    """Recompute aggregate tables from Subscription (all of them by default)"""
+    for table in tables or SPEND_AGGREGATES:
+        connection.execute(f"DELETE FROM {table}")
+        connection.execute(
+            f"INSERT INTO {table} ({', '.join(_key_names(table))}, subscriptions, total_pence)"
+            + _live_query(table)
+        )
+
+
+def add_spend_since(connection, last_id):
+    """Add subscriptions with ids above last_id to every aggregate (for bulk loads)"""
+    for table in SPEND_AGGREGATES:
+        names = ", ".join(_key_names(table))
+        # "WHERE true" lets SQLite parse the ON CONFLICT of an INSERT ... SELECT
+        connection.execute(f"""
+            INSERT INTO {table} ({names}, subscriptions, total_pence)
+            SELECT * FROM ({_live_query(table, " AND s.subscriptionid > ?")}) WHERE true
+            ON CONFLICT ({names}) DO UPDATE SET
+                subscriptions = subscriptions + excluded.subscriptions,
+                total_pence = total_pence + excluded.total_pence
+        """, (last_id,))
+
+
+def check_spend_aggregates(connection):
+    """Compare every aggregate table with the live data.
+
+    Returns {table: [(key, stored (subscriptions, pence), live (subscriptions, pence))]}
+    for the tables that differ; an empty dict means everything matches.
+    """
+    differences = {}
+    for table in SPEND_AGGREGATES:
+        width = len(_key_names(table))
+        stored = {
+            row[:width]: row[width:]
+            for row in connection.execute(
+                f"SELECT {', '.join(_key_names(table))}, subscriptions, total_pence FROM {table}"
+            )
+        }
+        live = {row[:width]: row[width:] for row in connection.execute(_live_query(table))}
+
+        mismatched = [
+            (key, stored.get(key), live.get(key))
+            for key in stored.keys() | live.keys()
+            if stored.get(key) != live.get(key)
+        ]
+        if mismatched:
+            differences[table] = sorted(mismatched, key=lambda item: [str(part) for part in item[0]])
+    return differences
+
+
+def main():
+    from submanager_db import Database, resolve_database_path
+
+    parser = argparse.ArgumentParser(description="Check the spend aggregate tables against the live data")
+    parser.add_argument("--db", help="path to the SQLite database")
+    parser.add_argument("--repair", action="store_true", help="rebuild any table that differs")
+    args = parser.parse_args()
+
+    database = Database(resolve_database_path(args.db))
+    connection = database.writer
+    try:
+        differences = check_spend_aggregates(connection)
+        if not differences:
+            print("All spend aggregates match the live data")
+            return 0
+
+        for table, mismatched in differences.items():
+            print(f"{table}: {len(mismatched)} differing rows")
+            for key, stored, live in mismatched[:10]:
+                print(f"    {key}: stored {stored}, live {live}")
+
+        if args.repair:
+            rebuild_spend_aggregates(connection, list(differences))
+            connection.commit()
+            print("Rebuilt " + ", ".join(differences))
+            return 0
+        return 1
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        return 1
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+"""Bulk generation of renewal (and trial ending) alerts from billing cycles.
+
+For every subscription, the billing dates falling in the next
+``horizon_days`` (after the lead time) are worked out from its next billing
+date and billing cycle, and an alert is created ``days_before`` each one.
+Subscriptions in a folder whose name contains "trial" also get a
+"Trial Ending" alert before their next billing date, which is when the trial
+turns into a paid subscription.
+
+All alerts are written in one ``executemany`` transaction with
+``INSERT OR IGNORE``.  A unique index on (subscription, type, date) for these
+alert types makes generating again a no-op for alerts that already exist, so
+it is safe to re-run (or run on a schedule).
+"""
+import calendar
+from datetime import date, timedelta
+
+from submanager_core import DAY, MONTH, ONCE, parse_billing_cycle
+from submanager_db import begin_write
+
+RENEWAL_ALERT = "Subscription Renewal"
+TRIAL_ALERT = "Trial Ending"
+
+DEFAULT_DAYS_BEFORE = 3
+DEFAULT_HORIZON_DAYS = 31
+
+# Folders whose name matches this (SQL LIKE, case-insensitive) hold free trials
+TRIAL_FOLDER_PATTERN = "%trial%"
+
+# Rows handed to each executemany call
+INSERT_BATCH_SIZE = 50_000
+
+
+def add_months(day, months):
+    """day moved by whole months, clamped to the end of shorter months"""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def billing_dates_between(next_billing, cycle, first, last):
+    """Billing dates of a subscription from first to last (inclusive)"""
+    unit, step = parse_billing_cycle(cycle)
+    if unit == ONCE:
+        return [next_billing] if first <= next_billing <= last else []
+
+    if unit == DAY:
+        # Jump straight to the first occurrence on or after first
+        skip = max(0, -((next_billing - first).days // step))
+        current = next_billing + timedelta(days=skip * step)
+        dates = []
+        while current <= last:
+            dates.append(current)
+            current += timedelta(days=step)
+        return dates
+
+    # Month cycles are counted from next_billing itself so clamped days don't drift
+    months_behind = (first.year - next_billing.year) * 12 + first.month - next_billing.month
+    count = max(0, months_behind // step - 1)
+    dates = []
+    while True:
+        current = add_months(next_billing, count * step)
+        if current > last:
+            return dates
+        if current >= first:
+            dates.append(current)
+        count += 1
+
+
+def cycle_length_days(cycle):
+    """Shortest time between two charges, or None for a one-off charge"""
+    unit, step = parse_billing_cycle(cycle)
+    if unit == DAY:
+        return step
+    if unit == MONTH:
+        return 28 * step
+    return None
+
+
+def renewal_alert_rows(subscriptions, days_before, horizon_days, include_trials, today):
+    """(subscriptionid, alert_date, alert_type, alert_message) for each alert to create.
+
+    subscriptions yields (subscriptionid, name, billing cycle, ISO next billing
+    date, is_trial).  Alerts always fall after today; cycles no longer than the
+    lead time are skipped, since their alerts would land before the previous charge.
+    """
+    lead = timedelta(days=days_before)
+    first = today + timedelta(days=1) + lead
+    last = today + timedelta(days=horizon_days) + lead
+
+    def alert_for(billing_date):
+        return billing_date, (billing_date - lead).isoformat(), billing_date.strftime("%d/%m/%Y")
+
+    def schedule(next_billing, cycle):
+        """(renewal alerts, trial ending alert or None) as (billing date, alert date, date shown)"""
+        next_billing = date.fromisoformat(next_billing)
+        length = cycle_length_days(cycle)
+        if length is not None and length <= days_before:
+            renewals = []
+        else:
+            renewals = [alert_for(day) for day in billing_dates_between(next_billing, cycle, first, last)]
+        trial = alert_for(next_billing) if first <= next_billing <= last else None
+        return renewals, trial
+
+    # Subscriptions sharing a next billing date and cycle share a schedule
+    schedules = {}
+    for subscription_id, name, cycle, next_billing, is_trial in subscriptions:
+        if not next_billing:
+            continue
+        key = (next_billing, cycle)
+        if key not in schedules:
+            schedules[key] = schedule(next_billing, cycle)
+        renewals, trial = schedules[key]
+
+        if include_trials and is_trial and trial:
+            yield subscription_id, trial[1], TRIAL_ALERT, f"Your {name} trial ends on {trial[2]}."
+            # The trial ending alert covers the first charge
+            renewals = [renewal for renewal in renewals if renewal[0] != trial[0]]
+
+        for _, alert_date, shown in renewals:
+            yield subscription_id, alert_date, RENEWAL_ALERT, f"Your {name} subscription renews on {shown}."
+
+
+def generate_renewal_alerts(connection, days_before=DEFAULT_DAYS_BEFORE, horizon_days=DEFAULT_HORIZON_DAYS,
+                            include_trials=False, today=None, userid=None):
+    """Create any missing renewal/trial alerts and return the new alert ids.
+
+    Covers userid's subscriptions, or everyone's if userid is None.
+    """
+    today = today or date.today()
+    owner, params = ("", ()) if userid is None else (" AND s.userid = ?", (userid,))
+    subscriptions = connection.execute(f"""
+        SELECT s.subscriptionid, s.subscriptionName, s.billingCycle, s.nextBillingDate,
+               COALESCE(f.folderName LIKE ?, 0)
+        FROM Subscription s
+        LEFT JOIN Folder f ON s.folderid = f.folderid
+        WHERE s.nextBillingDate IS NOT NULL{owner}
+    """, (TRIAL_FOLDER_PATTERN, *params)).fetchall()
+    rows = list(renewal_alert_rows(subscriptions, days_before, horizon_days, include_trials, today))
+
+    try:
+        # Inside the write transaction, so no other writer's alerts land above last_id
+        begin_write(connection)
+        last_id = connection.execute("SELECT COALESCE(MAX(alertid), 0) FROM Alert").fetchone()[0]
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            connection.executemany(
+                "INSERT OR IGNORE INTO Alert (subscriptionid, alert_date, alert_type, alert_message)"
+                " VALUES (?, ?, ?, ?)",
+                rows[start:start + INSERT_BATCH_SIZE]
+            )
+        # AUTOINCREMENT ids only grow, so everything above the old maximum is new
+        created = [row[0] for row in connection.execute(
+            "SELECT alertid FROM Alert WHERE alertid > ? ORDER BY alertid", (last_id,)
+        )]
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return created
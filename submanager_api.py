@@ -0,0 +1,479 @@
+"""Local JSON API over the subscription database.
+
+An asyncio HTTP/1.1 server (standard library only) so scripts and dashboards
+can read and edit the subscriptions the desktop app keeps, while it runs.
+The event loop only parses requests and writes responses; SQLite work runs on
+a bounded pool of reader threads, each with its own query-only connection
+(``Database.reader()``), and on a single writer thread, since SQLite takes one
+writer at a time anyway.  WAL lets the readers run alongside the app's
+writes, and busy_timeout queues the server's writes behind them.
+
+Requests authenticate with HTTP Basic auth as one of the app's accounts and
+only ever see that account's subscriptions:
+
+* ``GET /subscriptions``: the subscription list, optionally filtered with
+  ``brand``, ``folder``, ``cycle``, ``search`` and ``within`` (days until the
+  next billing date), in id order (best match first with ``search``); page
+  with ``limit`` and ``after`` (the last subscriptionid seen)
+* ``GET /subscriptions/<id>``
+* ``POST /subscriptions`` and ``PUT /subscriptions/<id>``: add or replace a
+  subscription from a JSON object, checked with the add subscription form's
+  rules (field names are matched as the importer matches them)
+* ``GET /alerts``: the alerts page, or only alerts not yet fired with
+  ``pending=1``
+* ``GET /insights``: subscription count and total, and projected spend per
+  month for ``year``, or for ``months`` months from this one
+
+A running app is not told about writes made through the API: its subscription
+list, charts and reminder schedule are read once per session and then kept
+current from its own edits, so it shows them the next time it is started.
+
+    python submanager_api.py --db path/to/subscriptions.db --port 8765
+    curl -u alice:password 'http://127.0.0.1:8765/subscriptions?cycle=Monthly&limit=20'
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import hmac
+import json
+import re
+import sqlite3
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from submanager_core import ValidationError, normalise_billing_cycle, validate_subscription
+from submanager_db import Database, get_or_insert_name, placeholders, resolve_database_path
+from submanager_io import EXPORT_QUERIES, SPEND_MONTHS, filter_conditions, json_query, record_fields, spend_batches
+from submanager_search import search_subscription_ids
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Threads running read queries, each with its own connection
+API_READ_WORKERS = 8
+
+# Subscriptions returned per page by default, and at most
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Largest request line plus headers, and request body, accepted
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+
+
+class ApiError(Exception):
+    """A request that cannot be served; becomes a JSON error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_array(rows):
+    """JSON array text from rows of one SQLite-encoded object each"""
+    return "[" + ",".join(row[0] for row in rows) + "]"
+
+
+def _int_param(query, name, default=None, minimum=0, maximum=None):
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[-1])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be a whole number") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} is out of range")
+    return value
+
+
+def _text_param(query, name):
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def authenticate(connection, credentials):
+    """userid for (username, password), as the login page checks them"""
+    username, password = credentials
+    row = connection.execute("SELECT userid, password FROM User WHERE username = ?", (username,)).fetchone()
+    # Compared in constant time (even for unknown users) so response times give nothing away
+    stored = row[1] if row and row[1] is not None else ""
+    if not hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8")) or not row:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "Invalid credentials")
+    return row[0]
+
+
+def subscription_filters(connection, userid, query):
+    """WHERE conditions and parameters for the list's query string filters.
+
+    The third value is the search's ranked subscription ids, or None when
+    there is no search or it fell back to a name prefix.
+    """
+    cycle = _text_param(query, "cycle")
+    conditions, params = filter_conditions(
+        _text_param(query, "brand"), _text_param(query, "folder"),
+        normalise_billing_cycle(cycle) if cycle is not None else None, userid
+    )
+
+    within = _int_param(query, "within")
+    if within is not None:
+        today = date.today()
+        conditions.append("s.nextBillingDate BETWEEN ? AND ?")
+        params += [today.isoformat(), (today + timedelta(days=within)).isoformat()]
+
+    ranked = None
+    search = _text_param(query, "search")
+    if search:
+        term = search.strip().lower()
+        subscription_ids = search_subscription_ids(connection, term, userid=userid)
+        if subscription_ids is None:
+            # Too short for the trigram index: name prefix, as the subscription list does
+            conditions += ["s.subscriptionName COLLATE NOCASE >= ?", "s.subscriptionName COLLATE NOCASE < ?"]
+            params += [term, term + "\U0010ffff"]
+        else:
+            conditions.append(f"s.subscriptionid IN ({placeholders(subscription_ids)})")
+            params += subscription_ids
+            ranked = subscription_ids
+    return conditions, params, ranked
+
+
+def _subscription_rows(connection, conditions, params, limit=None):
+    columns, query = EXPORT_QUERIES["subscriptions"]
+    query = query.format(where="WHERE " + " AND ".join(conditions))
+    if limit is not None:
+        query += " LIMIT ?"
+        params = params + [limit]
+    return connection.execute(json_query(columns, query), params).fetchall()
+
+
+def _ranked_page(connection, conditions, params, ranked, after, limit):
+    """One page of search results in the order search_subscription_ids ranked them.
+
+    after is still the last subscriptionid seen; the page starts at the id
+    ranked below it.  The search returns at most SEARCH_RESULT_LIMIT ids, so
+    every match is read and the page cut here.
+    """
+    rows = {json.loads(row[0])["subscriptionid"]: row for row in _subscription_rows(connection, conditions, params)}
+    if after is not None:
+        ranked = ranked[ranked.index(after) + 1:] if after in ranked else []
+    return [rows[subscription_id] for subscription_id in ranked if subscription_id in rows][:limit]
+
+
+def list_subscriptions(connection, userid, query):
+    """refresh_treeview and filter_data: one page of the user's subscriptions"""
+    conditions, params, ranked = subscription_filters(connection, userid, query)
+    after = _int_param(query, "after")
+    limit = _int_param(query, "limit", PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    if ranked is not None:
+        return HTTPStatus.OK, _json_array(_ranked_page(connection, conditions, params, ranked, after, limit))
+    if after is not None:
+        conditions.append("s.subscriptionid > ?")
+        params.append(after)
+    return HTTPStatus.OK, _json_array(_subscription_rows(connection, conditions, params, limit))
+
+
+def get_subscription(connection, userid, subscription_id, query=None):
+    rows = _subscription_rows(connection, ["s.userid = ?", "s.subscriptionid = ?"], [userid, subscription_id])
+    if not rows:
+        raise ApiError(HTTPStatus.NOT_FOUND, "No such subscription")
+    return HTTPStatus.OK, rows[0][0]
+
+
+def _subscription_values(connection, body):
+    """Stored column values for a request body, checked with the form's rules"""
+    name, cost, brand, folder, billing_cycle, billing_date = validate_subscription(*record_fields(body))
+    brandid = get_or_insert_name(connection, "Brand", brand)
+    folderid = get_or_insert_name(connection, "Folder", folder)
+    return name, cost, brandid, folderid, billing_cycle, billing_date
+
+
+def create_subscription(connection, userid, body):
+    """save_data: add a subscription for the user"""
+    values = _subscription_values(connection, body)
+    subscription_id = connection.execute(
+        "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate, userid)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (*values, userid)
+    ).lastrowid
+    return HTTPStatus.CREATED, get_subscription(connection, userid, subscription_id)[1]
+
+
+def update_subscription(connection, userid, subscription_id, body):
+    """edit_data: replace every field of one of the user's subscriptions"""
+    values = _subscription_values(connection, body)
+    updated = connection.execute("""
+        UPDATE Subscription
+        SET subscriptionName = ?, cost = ?, brandid = ?, folderid = ?, billingCycle = ?, nextBillingDate = ?
+        WHERE subscriptionid = ? AND userid = ?
+    """, (*values, subscription_id, userid)).rowcount
+    if not updated:
+        raise ApiError(HTTPStatus.NOT_FOUND, "No such subscription")
+    return get_subscription(connection, userid, subscription_id)
+
+
+def list_alerts(connection, userid, query):
+    """load_alerts: the user's alerts by date"""
+    conditions, params = ["s.userid = ?"], [userid]
+    if _int_param(query, "pending", 0, maximum=1):
+        conditions.append("a.fired = 0")
+    columns, alerts_query = EXPORT_QUERIES["alerts"]
+    alerts_query = alerts_query.format(where="WHERE " + " AND ".join(conditions))
+    return HTTPStatus.OK, _json_array(connection.execute(json_query(columns, alerts_query), params))
+
+
+def insights(connection, userid, query):
+    """The welcome summary and the insights chart's projected spend per month"""
+    # NumPy is only loaded once insights are asked for
+    from submanager_projection import month_number
+
+    year = _int_param(query, "year", minimum=1970, maximum=9999)
+    if year is not None:
+        first_month, months = month_number(f"{year}-01"), 12
+    else:
+        first_month, months = None, _int_param(query, "months", SPEND_MONTHS, minimum=1, maximum=1200)
+
+    count, total = connection.execute("""
+        SELECT COALESCE(SUM(subscriptions), 0), COALESCE(SUM(total_pence), 0) / 100.0
+        FROM FolderSpend
+        WHERE userid = ?
+    """, (userid,)).fetchone()
+    spend = next(spend_batches(connection, [], [], userid, months, first_month))
+    return HTTPStatus.OK, json.dumps({
+        "subscriptions": count,
+        "total": total,
+        "months": [{"month": month, "total": month_total} for month, month_total in spend],
+    }, separators=(",", ":"))
+
+
+# (method, path pattern, handler, writes); handlers take (connection, userid, *path groups[, query or body])
+ROUTES = [
+    ("GET", re.compile(r"/subscriptions"), list_subscriptions, False),
+    ("GET", re.compile(r"/subscriptions/(\d+)"), get_subscription, False),
+    ("POST", re.compile(r"/subscriptions"), create_subscription, True),
+    ("PUT", re.compile(r"/subscriptions/(\d+)"), update_subscription, True),
+    ("GET", re.compile(r"/alerts"), list_alerts, False),
+    ("GET", re.compile(r"/insights"), insights, False),
+]
+
+
+class Request:
+    def __init__(self, method, target, version, headers, body):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        url = urlsplit(target)
+        self.path = url.path.rstrip("/") or "/"
+        self.query = parse_qs(url.query)
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def credentials(self):
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "basic":
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Log in with HTTP Basic auth")
+        try:
+            username, separator, password = base64.b64decode(token, validate=True).decode("utf-8").partition(":")
+        except (binascii.Error, UnicodeDecodeError):
+            separator = ""
+        if not separator:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Malformed credentials")
+        return username, password
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"null")
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON") from None
+
+
+async def read_request(stream):
+    """The next Request on a connection, or None once the client has closed it"""
+    try:
+        head = await stream.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Incomplete request") from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise ApiError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large") from None
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        name, separator, value = line.partition(":")
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Bad Content-Length") from None
+    if length < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Bad Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await stream.readexactly(length) if length else b""
+    return Request(method, target, version, headers, body)
+
+
+def response_bytes(status, body, keep_alive=True):
+    payload = body.encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(payload)}",
+        "Connection: " + ("keep-alive" if keep_alive else "close"),
+    ]
+    if status == HTTPStatus.UNAUTHORIZED:
+        head.append('WWW-Authenticate: Basic realm="submanager"')
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def error_body(message):
+    return json.dumps({"error": message})
+
+
+class ApiServer:
+    """Serves ROUTES from a Database; reads on a thread pool, writes on one thread"""
+
+    def __init__(self, database, workers=API_READ_WORKERS):
+        self.database = database
+        self.readers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-read")
+        # One thread, so its connection is only ever used there
+        self.writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-write")
+        self.writer = None
+
+    def read(self, credentials, handler, args):
+        connection = self.database.reader()
+        return handler(connection, authenticate(connection, credentials), *args)
+
+    def write(self, credentials, handler, args):
+        if self.writer is None:
+            self.writer = self.database.open_writer()
+        connection = self.writer
+        try:
+            result = handler(connection, authenticate(connection, credentials), *args)
+            connection.commit()
+            return result
+        except Exception:
+            connection.rollback()
+            raise
+
+    async def dispatch(self, request):
+        """(status, JSON body) for a request"""
+        allowed = []
+        for method, pattern, handler, writes in ROUTES:
+            match = pattern.fullmatch(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+
+            args = [int(group) for group in match.groups()]
+            args.append(request.json() if writes else request.query)
+            executor, job = (self.writes, self.write) if writes else (self.readers, self.read)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, job, request.credentials(), handler, args)
+
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Use " + " or ".join(allowed))
+        raise ApiError(HTTPStatus.NOT_FOUND, "No such resource")
+
+    async def respond(self, request):
+        try:
+            status, body = await self.dispatch(request)
+        except ApiError as e:
+            status, body = e.status, error_body(str(e))
+        except ValidationError as e:
+            status, body = HTTPStatus.BAD_REQUEST, error_body(str(e))
+        except sqlite3.OperationalError as e:
+            # Usually the database staying locked past busy_timeout
+            status, body = HTTPStatus.SERVICE_UNAVAILABLE, error_body(f"Database busy: {e}")
+        except sqlite3.Error as e:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, error_body(f"Database error: {e}")
+        except Exception:
+            # Keep serving; the traceback goes to the server's log
+            traceback.print_exc()
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, error_body("Internal error")
+        return response_bytes(status, body, request.keep_alive)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except ApiError as e:
+                    writer.write(response_bytes(e.status, error_body(str(e)), keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                writer.write(await self.respond(request))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            # Idle, or the client went away (possibly part way through a request body)
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+    def close(self):
+        self.readers.shutdown()
+        if self.writer is not None:
+            self.writes.submit(self.writer.close).result()
+        self.writes.shutdown()
+
+
+async def serve(server, host, port):
+    listener = await server.start(host, port)
+    print(f"Serving on http://{host}:{listener.sockets[0].getsockname()[1]}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the subscription database as a local JSON API")
+    parser.add_argument("--db", help="path to the SQLite database")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=API_READ_WORKERS, help="threads running read queries")
+    args = parser.parse_args()
+
+    database = Database(resolve_database_path(args.db))
+    server = ApiServer(database, args.workers)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        database.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
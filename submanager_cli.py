@@ -0,0 +1,255 @@
+"""Headless reports over the subscription database, for scripts and cron.
+
+Runs the app's own queries (``submanager_io``'s subscription and alert
+exports, the spend aggregates and the billing projection) without importing
+Tk or matplotlib, so it starts in a fraction of the GUI's time and needs no
+display.  NumPy is only loaded for ``projected-spend``.
+
+* ``list``: every subscription
+* ``filter``: subscriptions narrowed by brand, folder, billing cycle, a
+  search term (the GUI's ranked search) or renewal within some days
+* ``summary``: subscription count and total cost per folder, brand or cycle
+* ``due-alerts``: alerts not yet fired that are due (or due within some days)
+* ``projected-spend``: charges per month over the coming months
+
+Reports cover one user's subscriptions with ``--user`` and everyone's
+otherwise.  The database is only read, never upgraded: one the app has not
+opened since its schema last changed is refused.  Output is an aligned table, CSV or JSON (one object per line);
+dates are ISO.
+
+    python -m submanager_cli --db path/to/subscriptions.db --user alice summary --by brand
+    python -m submanager_cli --user alice filter --cycle monthly --within 7 --format csv
+    python -m submanager_cli --user alice due-alerts --format json
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from submanager_core import ValidationError, normalise_billing_cycle
+from submanager_db import Database, find_user, placeholders, resolve_database_path
+from submanager_io import SPEND_MONTHS, export_batches, filter_conditions
+from submanager_search import search_subscription_ids
+
+OUTPUT_FORMATS = ("table", "csv", "json")
+
+# Oldest schema the reports run against: per-user spend aggregates (10) and
+# only ISO billing dates (13)
+REQUIRED_SCHEMA_VERSION = 13
+
+# Grouping -> (label column, query); {where} takes the owner condition
+SUMMARY_QUERIES = {
+    "folder": ("folder", """
+        SELECT COALESCE(f.folderName, '(none)'), SUM(t.subscriptions), SUM(t.total_pence)
+        FROM FolderSpend t
+        LEFT JOIN Folder f ON t.folderid = f.folderid
+        {where}
+        GROUP BY t.folderid
+    """),
+    "brand": ("brand", """
+        SELECT COALESCE(b.brandName, '(none)'), SUM(t.subscriptions), SUM(t.total_pence)
+        FROM BrandSpend t
+        LEFT JOIN Brand b ON t.brandid = b.brandid
+        {where}
+        GROUP BY t.brandid
+    """),
+    "cycle": ("billingCycle", """
+        SELECT t.billingCycle, SUM(t.subscriptions), SUM(t.total_pence)
+        FROM CycleSpend t
+        {where}
+        GROUP BY t.billingCycle
+    """),
+}
+
+
+def subscription_filters(connection, args):
+    """WHERE conditions and parameters for the filter command's options"""
+    cycle = normalise_billing_cycle(args.cycle) if args.cycle is not None else None
+    conditions, params = filter_conditions(args.brand, args.folder, cycle)
+
+    if args.within is not None:
+        today = date.today()
+        conditions.append("s.nextBillingDate BETWEEN ? AND ?")
+        params += [today.isoformat(), (today + timedelta(days=args.within)).isoformat()]
+
+    if args.search is not None:
+        term = args.search.strip().lower()
+        subscription_ids = search_subscription_ids(connection, term, userid=args.userid)
+        if subscription_ids is None:
+            # Too short for the trigram index: name prefix, as the subscription list does
+            conditions += ["s.subscriptionName COLLATE NOCASE >= ?", "s.subscriptionName COLLATE NOCASE < ?"]
+            params += [term, term + "\U0010ffff"]
+        else:
+            conditions.append(f"s.subscriptionid IN ({placeholders(subscription_ids)})")
+            params += subscription_ids
+    return conditions, params
+
+
+def summary_rows(connection, by, userid=None):
+    """(label, subscriptions, total) per folder, brand or cycle, largest total first, then the overall row"""
+    label, query = SUMMARY_QUERIES[by]
+    where, params = ("WHERE t.userid = ?", (userid,)) if userid is not None else ("", ())
+    rows = sorted(connection.execute(query.format(where=where), params), key=lambda row: (-row[2], row[0]))
+
+    count = sum(row[1] for row in rows)
+    pence = sum(row[2] for row in rows)
+    rows = [(name, subscriptions, total / 100) for name, subscriptions, total in rows]
+    return (label, "subscriptions", "total"), rows + [("All", count, pence / 100)]
+
+
+def report(connection, args):
+    """(columns, batches of rows) for the command; JSON output gets rows of one encoded object"""
+    as_json = args.format == "json"
+    if args.command == "summary":
+        columns, rows = summary_rows(connection, args.by, args.userid)
+        batches = [rows]
+    elif args.command == "projected-spend":
+        return export_batches(connection, "spend", [], [], args.userid, as_json, months=args.months)
+    elif args.command == "due-alerts":
+        horizon = (date.today() + timedelta(days=args.within)).isoformat()
+        return export_batches(connection, "alerts", ["a.fired = 0", "a.alert_date <= ?"], [horizon],
+                              args.userid, as_json)
+    elif args.command == "filter":
+        conditions, params = subscription_filters(connection, args)
+        return export_batches(connection, "subscriptions", conditions, params, args.userid, as_json)
+    else:
+        return export_batches(connection, "subscriptions", [], [], args.userid, as_json)
+
+    if as_json:
+        batches = [[(json.dumps(dict(zip(columns, row)), separators=(",", ":")),) for row in batch]
+                   for batch in batches]
+    return columns, batches
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def write_table(out, columns, batches):
+    """Aligned columns (numbers to the right); the rows are held to measure them"""
+    rows = [row for batch in batches for row in batch]
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    numeric = [bool(rows) and all(isinstance(row[i], (int, float)) for row in rows if row[i] is not None)
+               for i in range(len(columns))]
+
+    def line(values):
+        return "  ".join(value.rjust(width) if right else value.ljust(width)
+                         for value, width, right in zip(values, widths, numeric)).rstrip()
+
+    out.write(line(columns) + "\n")
+    out.write(line(["-" * width for width in widths]) + "\n")
+    out.writelines(line(row) + "\n" for row in cells)
+    return len(rows)
+
+
+def write_csv(out, columns, batches):
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    written = 0
+    for rows in batches:
+        writer.writerows(rows)
+        written += len(rows)
+    return written
+
+
+def write_json_lines(out, columns, batches):
+    written = 0
+    for rows in batches:
+        out.writelines(row[0] + "\n" for row in rows)
+        written += len(rows)
+    return written
+
+
+WRITERS = {"table": write_table, "csv": write_csv, "json": write_json_lines}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="submanager_cli", description="Subscription reports without the GUI")
+    parser.add_argument("--db", help="path to the SQLite database")
+    parser.add_argument("--user", help="username whose subscriptions to report on (everyone's by default)")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=OUTPUT_FORMATS, default="table",
+                        help="output format; json writes one object per line")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", parents=[output], help="every subscription")
+
+    filter_parser = commands.add_parser("filter", parents=[output], help="subscriptions matching the options")
+    filter_parser.add_argument("--brand")
+    filter_parser.add_argument("--folder")
+    filter_parser.add_argument("--cycle", help="billing cycle, e.g. Monthly or 'Every 3 months'")
+    filter_parser.add_argument("--search", help="search term, matched as the subscription list's search box does")
+    filter_parser.add_argument("--within", type=int, metavar="DAYS", help="next billing date in the next DAYS days")
+
+    summary_parser = commands.add_parser("summary", parents=[output],
+                                         help="subscriptions and total cost per folder, brand or cycle")
+    summary_parser.add_argument("--by", choices=list(SUMMARY_QUERIES), default="folder")
+
+    alerts_parser = commands.add_parser("due-alerts", parents=[output], help="alerts due and not yet fired")
+    alerts_parser.add_argument("--within", type=int, default=0, metavar="DAYS",
+                               help="include alerts due in the next DAYS days")
+
+    spend_parser = commands.add_parser("projected-spend", parents=[output], help="projected charges per month")
+    spend_parser.add_argument("--months", type=int, default=SPEND_MONTHS)
+    return parser
+
+
+def schema_version(path):
+    """PRAGMA user_version of the database at path, read without changing the file"""
+    connection = sqlite3.connect(Path(path).absolute().as_uri() + "?mode=ro", uri=True)
+    try:
+        return connection.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    path = resolve_database_path(args.db)
+    if not os.path.exists(path):
+        print(f"No database at {path}", file=sys.stderr)
+        return 1
+
+    version = schema_version(path)
+    if version < REQUIRED_SCHEMA_VERSION:
+        print(f"{path} uses schema version {version}, older than the {REQUIRED_SCHEMA_VERSION} these reports "
+              "need; open it in the app once to upgrade it", file=sys.stderr)
+        return 1
+
+    # Reports never write, so the app's migrations are left to the app
+    database = Database(path, migrate_schema=False)
+    try:
+        connection = database.reader()
+        args.userid = None
+        if args.user is not None:
+            args.userid = find_user(connection, args.user)
+            if args.userid is None:
+                print(f"No such user: {args.user}", file=sys.stderr)
+                return 2
+
+        columns, batches = report(connection, args)
+        WRITERS[args.format](sys.stdout, columns, batches)
+        return 0
+    except ValidationError as e:
+        print(e, file=sys.stderr)
+        return 2
+    except sqlite3.Error as e:
+        print(f"Database error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
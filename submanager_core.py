@@ -0,0 +1,131 @@
+"""Subscription rules shared by the GUI, the importer and headless tools.
+
+Validation of the add/edit subscription fields (cost, next billing date and
+billing cycle) and billing cycle parsing live here, away from Tk and the
+database, so a bulk import applies exactly the rules the forms do.  Rule
+violations raise ``ValidationError`` with the message the forms show.
+"""
+import math
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+from submanager_db import DISPLAY_DATE_FORMAT, STORAGE_DATE_FORMAT
+
+# Cycle units
+ONCE = 0
+DAY = 1
+MONTH = 2
+
+NAMED_CYCLES = {
+    "daily": (DAY, 1),
+    "weekly": (DAY, 7),
+    "monthly": (MONTH, 1),
+    "yearly": (MONTH, 12),
+}
+
+UNIT_STEPS = {
+    "day": (DAY, 1),
+    "week": (DAY, 7),
+    "month": (MONTH, 1),
+    "year": (MONTH, 12),
+}
+
+# Furthest ahead a next billing date may be; anything later is a mistyped year
+MAX_BILLING_YEARS_AHEAD = 50
+
+# Matches the text produced by handle_custom_billing_cycle_modal, e.g. "Every 3 months"
+CUSTOM_CYCLE_PATTERN = re.compile(r"^every\s+(\d+)\s+(day|week|month|year)s?$")
+
+
+class ValidationError(ValueError):
+    """A subscription field breaks one of the form rules"""
+
+
+def parse_billing_cycle(cycle):
+    """Return (unit, step) for a billing cycle string.
+
+    Unknown or malformed cycles are treated as a single charge on the next
+    billing date, which is how the chart counted every subscription before.
+    """
+    text = " ".join((cycle or "").strip().lower().split())
+    if text in NAMED_CYCLES:
+        return NAMED_CYCLES[text]
+
+    match = CUSTOM_CYCLE_PATTERN.match(text)
+    if match and int(match.group(1)) > 0:
+        unit, step = UNIT_STEPS[match.group(2)]
+        return unit, step * int(match.group(1))
+
+    return ONCE, 0
+
+
+@lru_cache(maxsize=1024)
+def normalise_billing_cycle(cycle):
+    """The cycle as the form would have written it ("Monthly", "Every 3 months")"""
+    text = " ".join((cycle or "").strip().lower().split())
+    if text in NAMED_CYCLES:
+        return text.capitalize()
+
+    match = CUSTOM_CYCLE_PATTERN.match(text)
+    if not match or int(match.group(1)) <= 0:
+        raise ValidationError(f"Unknown billing cycle: {cycle}")
+    value, unit = int(match.group(1)), match.group(2)
+    return f"Every {value} {unit + 's' if value > 1 else unit}"
+
+
+def normalise_cost(cost):
+    """Cost text as stored ("£9.99"); accepts an optional leading £"""
+    cost = str(cost).strip()
+    if cost.startswith('£'):
+        cost = cost[1:]
+    try:
+        cost_float = float(cost)
+    except ValueError:
+        raise ValidationError("Please enter a valid number for the subscription cost") from None
+    if not math.isfinite(cost_float) or cost_float <= 0:
+        raise ValidationError("Please enter a valid number for the subscription cost")
+    return f"£{round(cost_float, 2):.2f}"
+
+
+# Imports repeat the same few hundred dates, and strptime is slow
+@lru_cache(maxsize=4096)
+def _parse_date(text):
+    for date_format in (DISPLAY_DATE_FORMAT, STORAGE_DATE_FORMAT):
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValidationError("Invalid date format, please use DD/MM/YYYY")
+
+
+def parse_billing_date(billing_date, today=None):
+    """Next billing date from DD/MM/YYYY (or stored ISO) text; it must be in the future"""
+    today = today or date.today()
+    parsed = _parse_date(str(billing_date).strip())
+    if parsed <= today:
+        raise ValidationError("Billing date must be in the future.")
+    if parsed.year > today.year + MAX_BILLING_YEARS_AHEAD:
+        raise ValidationError(f"Billing date must be within {MAX_BILLING_YEARS_AHEAD} years.")
+    return parsed
+
+
+def validate_subscription(name, cost, brand, folder, billing_cycle, billing_date, today=None):
+    """Check every field of a subscription and return the values to store.
+
+    Returns (name, cost, brand, folder, billing cycle, ISO next billing date).
+    """
+    fields = [name, cost, brand, folder, billing_cycle, billing_date]
+    fields = ["" if value is None else str(value).strip() for value in fields]
+    if not all(fields):
+        raise ValidationError("Must fill in all fields")
+    name, cost, brand, folder, billing_cycle, billing_date = fields
+
+    return (
+        name,
+        normalise_cost(cost),
+        brand,
+        folder,
+        normalise_billing_cycle(billing_cycle),
+        parse_billing_date(billing_date, today).isoformat(),
+    )
@@ -0,0 +1,756 @@
+"""Data access for the Subscription Manager: connections, schema and migrations.
+
+The database path comes from the ``--db`` command line flag, the
+``SUBMANAGER_DB`` environment variable or a ``submanager.ini`` config file,
+in that order, falling back to the original hard-coded location.
+
+``Database`` runs every connection in WAL mode with tuned pragmas.  It keeps
+one writer connection for the Tk main thread and gives each thread its own
+reader connection, so a chart query never waits on a write.
+
+Each subscription belongs to a ``User`` (``Subscription.userid``), and its
+alerts belong to it; brands and folders are lookup tables shared by everyone.
+
+Dates are stored as ISO ``YYYY-MM-DD`` text so they sort and compare
+correctly and can be served from an index.  The UI still shows and accepts
+``DD/MM/YYYY``; use ``to_storage_date``/``to_display_date`` at the edges.
+"""
+import configparser
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from submanager_aggregates import (
+    BULK_LOAD_GUARD, add_spend_since, create_spend_aggregates, create_spend_triggers, drop_spend_aggregates,
+    run_script, spend_insert_trigger
+)
+
+# Original SubManager.py database location, used when nothing else is configured
+DEFAULT_DATABASE_PATH = "Desktop/NEA Test/DB_Login_Test.db"
+DATABASE_PATH_ENV = "SUBMANAGER_DB"
+CONFIG_FILES = ["submanager.ini", os.path.join(os.path.expanduser("~"), ".submanager.ini")]
+
+# Per-connection tuning; cache_size is negative to mean KiB rather than pages
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# Prepared statements kept per connection (sqlite3 reuses them by SQL text)
+STATEMENT_CACHE_SIZE = 256
+
+DISPLAY_DATE_FORMAT = "%d/%m/%Y"
+STORAGE_DATE_FORMAT = "%Y-%m-%d"
+
+# Bumped whenever migrate() gains a new step (stored in PRAGMA user_version)
+SCHEMA_VERSION = 14
+
+# Ids bound per statement when working through long id lists (SQLite allows 999 variables)
+ID_CHUNK_SIZE = 500
+
+# Subscription columns a bulk edit may set
+BULK_EDIT_COLUMNS = ("cost", "brandid", "folderid", "billingCycle")
+
+# Brand/folder name -> id lookups kept per table by NameCache
+NAME_CACHE_SIZE = 1024
+
+# Table -> (key column, name column) for the name lookup tables
+NAME_TABLES = {
+    "Brand": ("brandid", "brandName"),
+    "Folder": ("folderid", "folderName"),
+}
+
+
+def resolve_database_path(cli_path=None):
+    """Database path from the CLI flag, environment, config file or the default"""
+    if cli_path:
+        return cli_path
+    if os.environ.get(DATABASE_PATH_ENV):
+        return os.environ[DATABASE_PATH_ENV]
+
+    config = configparser.ConfigParser()
+    config.read(CONFIG_FILES)
+    if config.has_option("database", "path"):
+        return os.path.expanduser(config.get("database", "path"))
+
+    return DEFAULT_DATABASE_PATH
+
+
+def connect(path, factory=sqlite3.Connection):
+    """Open a tuned connection to the database at path"""
+    connection = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE, factory=factory)
+    for name, value in PRAGMAS.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+class Database:
+    """Owns the app's SQLite connections.
+
+    ``writer`` belongs to the Tk main thread and does the app's everyday
+    writes.  ``reader()`` returns a connection private to the calling thread,
+    opened on first use and reused afterwards.  Bulk jobs that write from a
+    worker thread use ``open_writer()``; WAL lets them run alongside the
+    readers, and busy_timeout queues them behind the main writer.
+
+    Every connection is created with factory, e.g. a profiling subclass of
+    ``sqlite3.Connection``.
+    """
+
+    def __init__(self, path, migrate_schema=True, factory=sqlite3.Connection):
+        self.path = path
+        self.factory = factory
+        self.writer = connect(path, factory)
+        if migrate_schema:
+            migrate(self.writer)
+
+        # Name -> id caches for the writer
+        self.brands = NameCache("Brand")
+        self.folders = NameCache("Folder")
+        self.brands.watch(self.writer)
+        self.folders.watch(self.writer)
+
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+
+    def reader(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Readers may be closed from another thread by close()
+            connection = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE,
+                                         check_same_thread=False, factory=self.factory)
+            for name, value in PRAGMAS.items():
+                if name != "journal_mode":
+                    connection.execute(f"PRAGMA {name} = {value}")
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+            with self._lock:
+                self._readers.append(connection)
+        return connection
+
+    def open_writer(self):
+        """A separate writing connection for a worker thread; the caller closes it"""
+        return connect(self.path, self.factory)
+
+    def forget_names(self):
+        """Empty the name caches, e.g. after a rollback that undid new brands or folders"""
+        self.brands.clear()
+        self.folders.clear()
+
+    def close(self):
+        with self._lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+        self.writer.close()
+
+
+def to_storage_date(display_date):
+    """Convert a DD/MM/YYYY string into the ISO text stored in the database"""
+    return datetime.strptime(display_date, DISPLAY_DATE_FORMAT).strftime(STORAGE_DATE_FORMAT)
+
+
+def to_display_date(storage_date):
+    """Convert a stored ISO date back into DD/MM/YYYY for the UI"""
+    if not storage_date:
+        return storage_date
+    return datetime.strptime(storage_date, STORAGE_DATE_FORMAT).strftime(DISPLAY_DATE_FORMAT)
+
+
+def create_schema(connection):
+    """Create any missing tables, and add columns that later migrations rely on"""
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS User (
+            userid INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            firstname TEXT,
+            surname TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS Brand (
+            brandid INTEGER PRIMARY KEY AUTOINCREMENT,
+            brandName TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS Folder (
+            folderid INTEGER PRIMARY KEY AUTOINCREMENT,
+            folderName TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS Subscription (
+            subscriptionid INTEGER PRIMARY KEY AUTOINCREMENT,
+            subscriptionName TEXT,
+            cost TEXT,
+            brandid INTEGER,
+            folderid INTEGER,
+            billingCycle TEXT,
+            nextBillingDate TEXT,
+            userid INTEGER,
+            FOREIGN KEY (brandid) REFERENCES Brand(brandid),
+            FOREIGN KEY (folderid) REFERENCES Folder(folderid),
+            FOREIGN KEY (userid) REFERENCES User(userid)
+        );
+
+        CREATE TABLE IF NOT EXISTS Alert (
+            alertid INTEGER PRIMARY KEY AUTOINCREMENT,
+            subscriptionid INTEGER,
+            alert_date TEXT,
+            alert_type TEXT,
+            alert_message TEXT,
+            FOREIGN KEY (subscriptionid) REFERENCES Subscription(subscriptionid)
+        );
+    """)
+
+    # The owner column predates version 10, so the earlier steps' triggers and
+    # aggregates can already refer to it
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(Subscription)")]
+    if "userid" not in columns:
+        connection.execute("ALTER TABLE Subscription ADD COLUMN userid INTEGER REFERENCES User(userid)")
+    connection.commit()
+
+
+def _convert_date_column(connection, table, key_column, date_column):
+    """Rewrite DD/MM/YYYY values of one column as ISO dates"""
+    # Zero-padded values (the vast majority) can be rearranged in SQL directly
+    connection.execute(f"""
+        UPDATE {table}
+        SET {date_column} = substr({date_column}, 7, 4) || '-' ||
+                            substr({date_column}, 4, 2) || '-' ||
+                            substr({date_column}, 1, 2)
+        WHERE {date_column} GLOB '[0-3][0-9]/[01][0-9]/[0-9][0-9][0-9][0-9]'
+    """)
+
+    # Whatever is left (e.g. "1/2/2025", which strptime accepted) goes through Python
+    rows = connection.execute(
+        f"SELECT {key_column}, {date_column} FROM {table} WHERE {date_column} LIKE '%/%'"
+    ).fetchall()
+
+    updates = []
+    for key, value in rows:
+        try:
+            updates.append((to_storage_date(value.strip()), key))
+        except ValueError:
+            # Anything unparseable is cleared by version 13
+            continue
+
+    connection.executemany(
+        f"UPDATE {table} SET {date_column} = ? WHERE {key_column} = ?", updates
+    )
+    return len(updates)
+
+
+def _migrate_iso_dates(connection):
+    """Version 1: ISO billing/alert dates plus indexes that can serve range queries"""
+    _convert_date_column(connection, "Subscription", "subscriptionid", "nextBillingDate")
+    _convert_date_column(connection, "Alert", "alertid", "alert_date")
+
+    # cost is included so the insights chart can be answered from the index alone
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_subscription_billing_date
+        ON Subscription (nextBillingDate, cost)
+    """)
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_alert_date ON Alert (alert_date)")
+
+
+def _add_name_index(connection):
+    """Version 2: name-ordered index used for keyset pagination of the subscription list"""
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_subscription_name
+        ON Subscription (subscriptionName COLLATE NOCASE, subscriptionid)
+    """)
+
+
+def _add_search_index(connection):
+    """Version 3: FTS5 trigram index over subscription, brand and folder names"""
+    try:
+        connection.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS SubscriptionSearch
+            USING fts5(subscriptionName, brandName, folderName, tokenize = 'trigram')
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 (or too old for trigram): search falls back to prefixes
+        return
+
+    run_script(connection, """
+        CREATE TRIGGER IF NOT EXISTS subscription_search_insert
+        AFTER INSERT ON Subscription BEGIN
+            INSERT INTO SubscriptionSearch (rowid, subscriptionName, brandName, folderName)
+            VALUES (
+                new.subscriptionid,
+                new.subscriptionName,
+                (SELECT brandName FROM Brand WHERE brandid = new.brandid),
+                (SELECT folderName FROM Folder WHERE folderid = new.folderid)
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS subscription_search_update
+        AFTER UPDATE OF subscriptionid, subscriptionName, brandid, folderid ON Subscription BEGIN
+            DELETE FROM SubscriptionSearch WHERE rowid = old.subscriptionid;
+            INSERT INTO SubscriptionSearch (rowid, subscriptionName, brandName, folderName)
+            VALUES (
+                new.subscriptionid,
+                new.subscriptionName,
+                (SELECT brandName FROM Brand WHERE brandid = new.brandid),
+                (SELECT folderName FROM Folder WHERE folderid = new.folderid)
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS subscription_search_delete
+        AFTER DELETE ON Subscription BEGIN
+            DELETE FROM SubscriptionSearch WHERE rowid = old.subscriptionid;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS brand_search_update
+        AFTER UPDATE OF brandName ON Brand BEGIN
+            UPDATE SubscriptionSearch SET brandName = new.brandName
+            WHERE rowid IN (SELECT subscriptionid FROM Subscription WHERE brandid = new.brandid);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS folder_search_update
+        AFTER UPDATE OF folderName ON Folder BEGIN
+            UPDATE SubscriptionSearch SET folderName = new.folderName
+            WHERE rowid IN (SELECT subscriptionid FROM Subscription WHERE folderid = new.folderid);
+        END;
+    """)
+    # Filled when version 10 recreates it with an owner column
+
+
+# The search index's owner column holds "#<userid>#", which a MATCH can require
+SEARCH_OWNER = "'#' || {row}.userid || '#'"
+
+# Search index rows for subscriptions, filled by rebuilds and bulk loads
+SEARCH_ROWS_SQL = f"""
+    INSERT INTO SubscriptionSearch (rowid, subscriptionName, brandName, folderName, owner)
+    SELECT s.subscriptionid, s.subscriptionName, b.brandName, f.folderName, {SEARCH_OWNER.format(row="s")}
+    FROM Subscription s
+    LEFT JOIN Brand b ON s.brandid = b.brandid
+    LEFT JOIN Folder f ON s.folderid = f.folderid
+"""
+
+SEARCH_TRIGGERS = ("subscription_search_insert", "subscription_search_update", "subscription_search_delete",
+                   "brand_search_update", "folder_search_update")
+
+
+def create_search_index(connection):
+    """Create and fill the FTS5 trigram index and the triggers that keep it in step.
+
+    Returns False if this SQLite has no FTS5 (search then falls back to prefixes).
+    """
+    try:
+        connection.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS SubscriptionSearch
+            USING fts5(subscriptionName, brandName, folderName, owner, tokenize = 'trigram')
+        """)
+    except sqlite3.OperationalError:
+        return False
+
+    insert_new = f"""
+            INSERT INTO SubscriptionSearch (rowid, subscriptionName, brandName, folderName, owner)
+            VALUES (
+                new.subscriptionid,
+                new.subscriptionName,
+                (SELECT brandName FROM Brand WHERE brandid = new.brandid),
+                (SELECT folderName FROM Folder WHERE folderid = new.folderid),
+                {SEARCH_OWNER.format(row="new")}
+            );"""
+    run_script(connection, f"""
+        CREATE TRIGGER IF NOT EXISTS subscription_search_insert
+        AFTER INSERT ON Subscription {BULK_LOAD_GUARD} BEGIN{insert_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS subscription_search_update
+        AFTER UPDATE OF subscriptionid, subscriptionName, brandid, folderid, userid ON Subscription BEGIN
+            DELETE FROM SubscriptionSearch WHERE rowid = old.subscriptionid;{insert_new}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS subscription_search_delete
+        AFTER DELETE ON Subscription BEGIN
+            DELETE FROM SubscriptionSearch WHERE rowid = old.subscriptionid;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS brand_search_update
+        AFTER UPDATE OF brandName ON Brand BEGIN
+            UPDATE SubscriptionSearch SET brandName = new.brandName
+            WHERE rowid IN (SELECT subscriptionid FROM Subscription WHERE brandid = new.brandid);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS folder_search_update
+        AFTER UPDATE OF folderName ON Folder BEGIN
+            UPDATE SubscriptionSearch SET folderName = new.folderName
+            WHERE rowid IN (SELECT subscriptionid FROM Subscription WHERE folderid = new.folderid);
+        END;
+    """)
+    rebuild_search_index(connection)
+    return True
+
+
+def drop_search_index(connection):
+    for trigger in SEARCH_TRIGGERS:
+        connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.execute("DROP TABLE IF EXISTS SubscriptionSearch")
+
+
+def rebuild_search_index(connection):
+    """Refill the search index from the live data (if SQLite supports one)"""
+    if _has_search_index(connection):
+        connection.execute("DELETE FROM SubscriptionSearch")
+        connection.execute(SEARCH_ROWS_SQL)
+
+
+def _add_spend_aggregates(connection):
+    """Version 4: trigger-maintained spend totals by month, date/cycle, folder and brand"""
+    create_spend_aggregates(connection)
+
+
+def _add_alert_fired(connection):
+    """Version 5: record which alerts have fired, and index the pending ones by date"""
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(Alert)")]
+    if "fired" not in columns:
+        connection.execute("ALTER TABLE Alert ADD COLUMN fired INTEGER NOT NULL DEFAULT 0")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_alert_pending ON Alert (fired, alert_date)")
+
+
+def _add_generated_alert_key(connection):
+    """Version 6: at most one renewal/trial ending alert per subscription and date"""
+    generated_types = "('Subscription Renewal', 'Trial Ending')"
+    connection.execute(f"""
+        DELETE FROM Alert
+        WHERE alert_type IN {generated_types}
+        AND alertid NOT IN (
+            SELECT MIN(alertid) FROM Alert
+            WHERE alert_type IN {generated_types}
+            GROUP BY subscriptionid, alert_type, alert_date
+        )
+    """)
+    connection.execute(f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_alert_generated
+        ON Alert (subscriptionid, alert_type, alert_date)
+        WHERE alert_type IN {generated_types}
+    """)
+
+
+def _add_bulk_load(connection):
+    """Version 7: bulk loads skip the per-row insert triggers and index their rows per chunk"""
+    connection.execute("CREATE TABLE IF NOT EXISTS BulkLoad (active INTEGER)")
+    connection.execute("DROP TRIGGER IF EXISTS subscription_spend_insert")
+    connection.execute(spend_insert_trigger())
+    if _has_search_index(connection):
+        connection.execute("DROP TRIGGER IF EXISTS subscription_search_insert")
+        connection.execute(f"""
+            CREATE TRIGGER subscription_search_insert
+            AFTER INSERT ON Subscription {BULK_LOAD_GUARD} BEGIN
+                INSERT INTO SubscriptionSearch (rowid, subscriptionName, brandName, folderName)
+                VALUES (
+                    new.subscriptionid,
+                    new.subscriptionName,
+                    (SELECT brandName FROM Brand WHERE brandid = new.brandid),
+                    (SELECT folderName FROM Folder WHERE folderid = new.folderid)
+                );
+            END
+        """)
+
+
+def _has_search_index(connection):
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'SubscriptionSearch'"
+    ).fetchone() is not None
+
+
+def begin_write(connection):
+    """Take the write lock now, unless the caller's transaction already holds it.
+
+    Python's sqlite3 only opens a transaction at the first write, so before
+    then another connection can still insert rows.  Reads that must not see
+    those (the highest id before a bulk insert) go after this.
+    """
+    if not connection.in_transaction:
+        connection.execute("BEGIN IMMEDIATE")
+
+
+def bulk_insert_subscriptions(connection, rows, userid=None):
+    """Insert many subscriptions for userid in the caller's transaction and return their new ids.
+
+    rows are (name, cost, brandid, folderid, billing cycle, ISO next billing
+    date).  The per-row search and spend triggers are held off while the rows
+    go in; the search index and spend aggregates then take them in with one
+    statement each, which is several times faster for large batches.
+    """
+    # Inside the write transaction, so no other writer's rows land above last_id
+    begin_write(connection)
+    last_id = connection.execute("SELECT COALESCE(MAX(subscriptionid), 0) FROM Subscription").fetchone()[0]
+    connection.execute("INSERT INTO BulkLoad (active) VALUES (1)")
+    try:
+        connection.executemany(
+            "INSERT INTO Subscription"
+            " (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate, userid)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((*row, userid) for row in rows)
+        )
+    finally:
+        connection.execute("DELETE FROM BulkLoad")
+
+    if _has_search_index(connection):
+        connection.execute(SEARCH_ROWS_SQL + " WHERE s.subscriptionid > ?", (last_id,))
+    add_spend_since(connection, last_id)
+
+    # AUTOINCREMENT ids only grow, so everything above the old maximum is new
+    return [row[0] for row in connection.execute(
+        "SELECT subscriptionid FROM Subscription WHERE subscriptionid > ? ORDER BY subscriptionid", (last_id,)
+    )]
+
+
+def id_chunks(ids):
+    """Split ids into lists small enough to bind into one IN (...) clause"""
+    ids = list(ids)
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def delete_subscriptions(connection, subscription_ids):
+    """Delete subscriptions and their alerts in the caller's transaction.
+
+    One statement per table for every ID_CHUNK_SIZE ids.  Returns the ids of
+    the alerts deleted along with the subscriptions.
+    """
+    alert_ids = []
+    for chunk in id_chunks(subscription_ids):
+        marks = placeholders(chunk)
+        alert_ids.extend(row[0] for row in connection.execute(
+            f"DELETE FROM Alert WHERE subscriptionid IN ({marks}) RETURNING alertid", chunk
+        ).fetchall())
+        connection.execute(f"DELETE FROM Subscription WHERE subscriptionid IN ({marks})", chunk)
+    return alert_ids
+
+
+def update_subscriptions(connection, subscription_ids, changes):
+    """Set the same values on many subscriptions in the caller's transaction.
+
+    changes maps columns from BULK_EDIT_COLUMNS to their new values.
+    """
+    unknown = set(changes) - set(BULK_EDIT_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot bulk edit {', '.join(sorted(unknown))}")
+    assignments = ", ".join(f"{column} = ?" for column in changes)
+    for chunk in id_chunks(subscription_ids):
+        connection.execute(
+            f"UPDATE Subscription SET {assignments} WHERE subscriptionid IN ({placeholders(chunk)})",
+            [*changes.values(), *chunk]
+        )
+
+
+def _add_unique_names(connection):
+    """Version 8: brand and folder names are unique; duplicates merge into the oldest row"""
+    for table, (key_column, name_column) in NAME_TABLES.items():
+        duplicate = f"""
+            EXISTS (SELECT 1 FROM {table} AS older
+                    WHERE older.{name_column} = {table}.{name_column} AND older.{key_column} < {table}.{key_column})
+        """
+        connection.execute(f"""
+            UPDATE Subscription
+            SET {key_column} = (
+                SELECT MIN(older.{key_column}) FROM {table} AS older
+                INNER JOIN {table} ON older.{name_column} = {table}.{name_column}
+                WHERE {table}.{key_column} = Subscription.{key_column}
+            )
+            WHERE {key_column} IN (SELECT {key_column} FROM {table} WHERE {duplicate})
+        """)
+        connection.execute(f"DELETE FROM {table} WHERE {duplicate}")
+        connection.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table.lower()}_name ON {table} ({name_column})"
+        )
+
+
+def _add_alert_subscription_index(connection):
+    """Version 9: index alerts by subscription, so they can be deleted along with it"""
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_alert_subscription ON Alert (subscriptionid)")
+
+
+def _add_subscription_owner(connection):
+    """Version 10: subscriptions belong to a user, with per-user indexes, aggregates and search"""
+    # Rebuilt below, so the reassignment does not run their triggers row by row
+    drop_spend_aggregates(connection)
+    drop_search_index(connection)
+
+    # Existing subscriptions go to the first account (or, in a database with no
+    # accounts yet, to the first one created; see version 14).  Everything added
+    # later is added for an account
+    connection.execute("UPDATE Subscription SET userid = (SELECT MIN(userid) FROM User) WHERE userid IS NULL")
+
+    # Every list query is for one user, so the indexes lead with the owner
+    connection.execute("DROP INDEX IF EXISTS idx_subscription_name")
+    connection.execute("DROP INDEX IF EXISTS idx_subscription_billing_date")
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_subscription_user_name
+        ON Subscription (userid, subscriptionName COLLATE NOCASE, subscriptionid)
+    """)
+    connection.execute("""
+        CREATE INDEX IF NOT EXISTS idx_subscription_user_billing_date
+        ON Subscription (userid, nextBillingDate, cost)
+    """)
+
+    create_spend_aggregates(connection)
+    create_search_index(connection)
+
+
+def _add_subscription_owner_index(connection):
+    """Version 11: index subscriptions by owner alone, which keeps each user's rows in id order"""
+    # Id-ordered pages (the API, exports) seek straight to the cursor instead of
+    # sorting the user's whole range from the billing date index
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_subscription_user ON Subscription (userid)")
+
+
+def _drop_monthly_spend(connection):
+    """Version 12: drop MonthlySpend, which nothing read (month totals come from the in-memory columns)"""
+    # The triggers write to it, so they are recreated without it first
+    create_spend_triggers(connection)
+    connection.execute("DROP TABLE IF EXISTS MonthlySpend")
+
+
+def _clear_unreadable_dates(connection):
+    """Version 13: clear dates version 1 could not convert, which every reader expects to be ISO"""
+    # date() turns text that is not a date into NULL and rolls days past the
+    # end of a month over, so only real YYYY-MM-DD dates come back unchanged.
+    # A subscription without a next billing date is shown and charted as undated
+    connection.execute("""
+        UPDATE Subscription SET nextBillingDate = NULL
+        WHERE nextBillingDate IS NOT NULL AND date(nextBillingDate, '+0 days') IS NOT nextBillingDate
+    """)
+    # An alert without a date can never fire
+    connection.execute("DELETE FROM Alert WHERE alert_date IS NULL OR date(alert_date, '+0 days') IS NOT alert_date")
+
+
+def _own_rows_on_first_account(connection):
+    """Version 14: subscriptions left without an owner go to the first account created"""
+    # Version 10 hands them to the first account, but a database upgraded
+    # before it had one would otherwise keep them out of every account's view
+    connection.execute("""
+        CREATE TRIGGER IF NOT EXISTS user_first_account
+        AFTER INSERT ON User
+        WHEN NOT EXISTS (SELECT 1 FROM User WHERE userid <> new.userid) BEGIN
+            UPDATE Subscription SET userid = new.userid WHERE userid IS NULL;
+        END
+    """)
+    connection.execute("UPDATE Subscription SET userid = (SELECT MIN(userid) FROM User) WHERE userid IS NULL")
+
+
+def find_user(connection, username):
+    """userid for a username, or None if there is no such account"""
+    row = connection.execute("SELECT userid FROM User WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+
+def get_or_insert_name(connection, table, name):
+    """Id of the brand or folder called name, inserting it if it is new.
+
+    The insert is part of the caller's transaction.  Names are looked up
+    first: a single ``ON CONFLICT DO UPDATE ... RETURNING`` would rewrite an
+    existing name, which uses up an AUTOINCREMENT id and fires the search
+    index's rename trigger over every subscription of that brand or folder.
+    The ``DO NOTHING`` insert covers another connection adding the name in
+    between.
+    """
+    key_column, name_column = NAME_TABLES[table]
+    select = f"SELECT {key_column} FROM {table} WHERE {name_column} = ?"
+    rows = connection.execute(select, (name,)).fetchall()
+    if not rows:
+        rows = connection.execute(
+            f"INSERT INTO {table} ({name_column}) VALUES (?)"
+            f" ON CONFLICT ({name_column}) DO NOTHING RETURNING {key_column}",
+            (name,)
+        ).fetchall() or connection.execute(select, (name,)).fetchall()
+    return rows[0][0]
+
+
+class NameCache:
+    """Bounded LRU of brand or folder name -> id in front of get_or_insert_name.
+
+    ``watch(connection)`` drops a name as soon as its row is deleted through
+    that connection.  Ids of names inserted in a transaction that is then
+    rolled back are not dropped automatically; call ``clear()``.
+    """
+
+    def __init__(self, table, size=NAME_CACHE_SIZE):
+        self.table = table
+        self.size = size
+        self._ids = OrderedDict()
+
+    def get(self, connection, name):
+        key = self._ids.get(name)
+        if key is not None:
+            self._ids.move_to_end(name)
+            return key
+
+        key = get_or_insert_name(connection, self.table, name)
+        self._ids[name] = key
+        if len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+        return key
+
+    def discard(self, name):
+        self._ids.pop(name, None)
+
+    def clear(self):
+        self._ids.clear()
+
+    def watch(self, connection):
+        """Invalidate on deletes made through connection (a TEMP trigger calling back here)"""
+        name_column = NAME_TABLES[self.table][1]
+        function = f"forget_{self.table.lower()}_name"
+        connection.create_function(function, 1, self.discard)
+        connection.execute(f"""
+            CREATE TEMP TRIGGER IF NOT EXISTS {self.table.lower()}_name_cache_delete
+            AFTER DELETE ON main.{self.table} BEGIN
+                SELECT {function}(old.{name_column});
+            END
+        """)
+
+
+MIGRATIONS = [
+    (1, _migrate_iso_dates),
+    (2, _add_name_index),
+    (3, _add_search_index),
+    (4, _add_spend_aggregates),
+    (5, _add_alert_fired),
+    (6, _add_generated_alert_key),
+    (7, _add_bulk_load),
+    (8, _add_unique_names),
+    (9, _add_alert_subscription_index),
+    (10, _add_subscription_owner),
+    (11, _add_subscription_owner_index),
+    (12, _drop_monthly_spend),
+    (13, _clear_unreadable_dates),
+    (14, _own_rows_on_first_account),
+]
+
+
+def migrate(connection):
+    """Create the schema and bring an existing database up to SCHEMA_VERSION"""
+    create_schema(connection)
+
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    for target, step in MIGRATIONS:
+        if version >= target:
+            continue
+        try:
+            # Opened explicitly so DDL joins the transaction too (sqlite3 only opens
+            # one before INSERT/UPDATE/DELETE) and a failed step rolls back whole
+            begin_write(connection)
+            step(connection)
+            connection.execute(f"PRAGMA user_version = {target}")
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+        version = target
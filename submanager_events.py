@@ -0,0 +1,96 @@
+"""In-process change events, so every page hears about every write.
+
+Whoever writes to the database publishes what changed on the ``EventBus``;
+pages subscribe to the event types they care about and apply just those
+changes.  Events carry ids only (subscribers read whatever else they need),
+and a single event can cover several rows so bulk writes publish once.
+
+``Coalescer`` batches events until the UI is next idle, so a burst of writes
+costs each page one update rather than one per event.  Nothing here depends
+on Tk: the coalescer is given the scheduling function (``widget.after_idle``).
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SubscriptionsAdded:
+    ids: tuple
+
+
+@dataclass(frozen=True)
+class SubscriptionsUpdated:
+    ids: tuple
+
+
+@dataclass(frozen=True)
+class SubscriptionsDeleted:
+    ids: tuple
+
+
+@dataclass(frozen=True)
+class AlertsCreated:
+    ids: tuple
+
+
+@dataclass(frozen=True)
+class AlertsDeleted:
+    ids: tuple
+
+
+SUBSCRIPTION_EVENTS = (SubscriptionsAdded, SubscriptionsUpdated, SubscriptionsDeleted)
+ALERT_EVENTS = (AlertsCreated, AlertsDeleted)
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed by event type"""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, handler, *event_types):
+        for event_type in event_types:
+            self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, handler, *event_types):
+        for event_type in event_types:
+            if handler in self.handlers.get(event_type, []):
+                self.handlers[event_type].remove(handler)
+
+    def publish(self, event):
+        if not event.ids:
+            return
+        for handler in list(self.handlers.get(type(event), [])):
+            handler(event)
+
+
+class Coalescer:
+    """Event handler that delivers everything published since the last idle as one list"""
+
+    def __init__(self, schedule, handler):
+        self.schedule = schedule
+        self.handler = handler
+        self.pending = []
+
+    def __call__(self, event):
+        if not self.pending:
+            self.schedule(self.flush)
+        self.pending.append(event)
+
+    def flush(self):
+        events, self.pending = self.pending, []
+        if events:
+            self.handler(events)
+
+
+def net_changes(events, deleted_types):
+    """Reduce a batch of events to (changed ids, deleted ids), latest event winning"""
+    changed = set()
+    deleted = set()
+    for event in events:
+        if isinstance(event, deleted_types):
+            changed.difference_update(event.ids)
+            deleted.update(event.ids)
+        else:
+            deleted.difference_update(event.ids)
+            changed.update(event.ids)
+    return changed, deleted
@@ -0,0 +1,588 @@
+"""Streaming bulk import and export of subscriptions.
+
+Imports read CSV, JSON and JSON Lines files one record at a time and write in
+chunks.  Each record is checked with the add subscription form's rules
+(``submanager_core``); brand and folder names are resolved through in-memory
+maps, inserting each new name once; and every chunk of valid rows goes in
+with one ``executemany`` and one commit.  A bad row is reported with its row
+number and skipped, never stopping the load.  JSON arrays are decoded item by
+item rather than loaded whole.
+
+Column names are matched loosely: ``name``/``subscriptionName``, ``cost``,
+``brand``, ``folder``, ``billingCycle`` and ``nextBillingDate`` (DD/MM/YYYY
+or ISO) in any case, with spaces or underscores.
+
+Exports write subscriptions, alerts or projected monthly spend as CSV or
+JSON Lines, or subscriptions and their alerts as a SQLite snapshot the app
+can open.  Rows are streamed with ``fetchmany`` so memory use stays flat
+however many there are, and the brand, folder and billing cycle filters are
+the ones the subscription list offers.  Exported subscription files can be
+imported again.
+
+Both work on one user's subscriptions (``--user`` on the command line).
+Imports and SQLite snapshots always need one, so every row they write has an
+owner; CSV and JSON Lines exports without one cover everyone's.
+
+    python submanager_io.py --db path/to/subscriptions.db --user alice import subscriptions.csv
+    python submanager_io.py --db path/to/subscriptions.db --user alice export spend.csv --dataset spend
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from submanager_aggregates import COST_PENCE, rebuild_spend_aggregates
+from submanager_core import ValidationError, validate_subscription
+from submanager_db import (
+    NAME_TABLES, Database, bulk_insert_subscriptions, find_user, get_or_insert_name, rebuild_search_index,
+    resolve_database_path
+)
+
+# Valid rows written per transaction
+IMPORT_CHUNK_SIZE = 5000
+
+# Characters read at a time when decoding a JSON array, and the most one item may take
+JSON_READ_SIZE = 64 * 1024
+MAX_JSON_ITEM = 1024 * 1024
+
+# Record keys (lowercased, without spaces or underscores) -> subscription field
+FIELD_ALIASES = {
+    "name": "name",
+    "subscription": "name",
+    "subscriptionname": "name",
+    "cost": "cost",
+    "brand": "brand",
+    "brandname": "brand",
+    "folder": "folder",
+    "foldername": "folder",
+    "foldertype": "folder",
+    "cycle": "billing_cycle",
+    "billingcycle": "billing_cycle",
+    "billingdate": "billing_date",
+    "nextbillingdate": "billing_date",
+}
+
+FIELDS = ("name", "cost", "brand", "folder", "billing_cycle", "billing_date")
+
+# Rows fetched (and written) at a time when exporting
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = ("csv", "jsonl", "sqlite")
+
+# Months of charges the projected spend export covers by default
+SPEND_MONTHS = 24
+
+# Dataset -> (columns, query); {where} takes the filter conditions
+EXPORT_QUERIES = {
+    "subscriptions": (
+        ("subscriptionid", "subscriptionName", "cost", "brand", "folder", "billingCycle", "nextBillingDate"),
+        """
+        SELECT s.subscriptionid, s.subscriptionName, s.cost, b.brandName, f.folderName,
+               s.billingCycle, s.nextBillingDate
+        FROM Subscription s
+        INNER JOIN Brand b ON s.brandid = b.brandid
+        INNER JOIN Folder f ON s.folderid = f.folderid
+        {where}
+        ORDER BY s.subscriptionid
+        """,
+    ),
+    "alerts": (
+        ("alertid", "subscriptionid", "subscriptionName", "alert_date", "alert_type", "alert_message", "fired"),
+        """
+        SELECT a.alertid, a.subscriptionid, s.subscriptionName, a.alert_date, a.alert_type,
+               a.alert_message, a.fired
+        FROM Alert a
+        INNER JOIN Subscription s ON a.subscriptionid = s.subscriptionid
+        INNER JOIN Brand b ON s.brandid = b.brandid
+        INNER JOIN Folder f ON s.folderid = f.folderid
+        {where}
+        ORDER BY a.alert_date, a.alertid
+        """,
+    ),
+}
+
+SPEND_COLUMNS = ("month", "total")
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: list = field(default_factory=list)  # new subscription ids
+    errors: list = field(default_factory=list)  # (row number, message)
+    failure: str = None  # set if the load stopped early
+
+
+def read_csv(file):
+    """(row number, record) for each CSV row; row numbers count the header as 1"""
+    reader = csv.DictReader(file)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def read_json_lines(file):
+    """(line number, record) for each non-blank line of a JSON Lines file"""
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValidationError(f"Invalid JSON: {e.msg}")
+
+
+def read_json_array(file):
+    """(item number, record) for each item of a top-level JSON array, decoded incrementally"""
+    decoder = json.JSONDecoder()
+    buffer = file.read(JSON_READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValidationError("Expected a JSON array of subscriptions")
+    position = 1
+    item_number = 0
+    at_end = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        if position < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                # An item running to the end of the buffer may continue in the next read
+                if end < len(buffer) or at_end:
+                    item_number += 1
+                    position = end
+                    yield item_number, record
+                    continue
+            except json.JSONDecodeError:
+                if at_end or len(buffer) - position > MAX_JSON_ITEM:
+                    raise ValidationError(f"Invalid JSON after item {item_number}") from None
+        elif at_end:
+            raise ValidationError("JSON array is not closed")
+
+        more = file.read(JSON_READ_SIZE)
+        at_end = not more
+        buffer, position = buffer[position:] + more, 0
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        return "json"
+    return "csv"
+
+
+def read_records(path, format=None):
+    """Records from a CSV, JSON array or JSON Lines file (format from the extension by default)"""
+    format = format or file_format(path)
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if format == "json":
+            # A .json file holding one object per line is JSON Lines too
+            start = file.read(1)
+            while start and start.isspace():
+                start = file.read(1)
+            file.seek(0)
+            if start != "[":
+                format = "jsonl"
+
+        readers = {"csv": read_csv, "json": read_json_array, "jsonl": read_json_lines}
+        yield from readers[format](file)
+
+
+@lru_cache(maxsize=256)
+def field_name(key):
+    """Subscription field a record key stands for, or None"""
+    return FIELD_ALIASES.get(str(key).lower().replace(" ", "").replace("_", ""))
+
+
+def record_fields(record):
+    """Subscription fields of a record, whatever its keys are called"""
+    if not isinstance(record, dict):
+        raise ValidationError("Expected an object with subscription fields")
+    fields = {}
+    for key, value in record.items():
+        name = field_name(key)
+        if name:
+            fields[name] = value
+    return [fields.get(name) for name in FIELDS]
+
+
+def _name_map(connection, table):
+    key_column, name_column = NAME_TABLES[table]
+    return dict(connection.execute(f"SELECT {name_column}, {key_column} FROM {table}"))
+
+
+def _write_chunk(connection, rows, brands, folders, userid):
+    """Insert one chunk of validated rows in a single transaction and return the new ids"""
+    new_brands, new_folders = {}, {}
+    try:
+        # Names added since the maps were read (by the app, say) resolve to their existing rows
+        for name in dict.fromkeys(row[2] for row in rows):
+            if name not in brands:
+                new_brands[name] = get_or_insert_name(connection, "Brand", name)
+        for name in dict.fromkeys(row[3] for row in rows):
+            if name not in folders:
+                new_folders[name] = get_or_insert_name(connection, "Folder", name)
+
+        ids = bulk_insert_subscriptions(connection, [
+            (name, cost, brands.get(brand, new_brands.get(brand)),
+             folders.get(folder, new_folders.get(folder)), cycle, billing_date)
+            for name, cost, brand, folder, cycle, billing_date in rows
+        ], userid)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    # Only names that were committed go into the maps
+    brands.update(new_brands)
+    folders.update(new_folders)
+    return ids
+
+
+def import_subscriptions(connection, records, chunk_size=IMPORT_CHUNK_SIZE, progress=None, today=None,
+                         userid=None):
+    """Validate and insert (row number, record) pairs for userid, chunk by chunk.
+
+    ``progress(result)`` is called after every chunk.  Rows that fail
+    validation are listed in ``result.errors``; a database error or an
+    unreadable file stops the load, keeping the chunks already committed,
+    and is reported in ``result.failure``.  userid is required: imported
+    subscriptions always belong to an account.
+    """
+    if userid is None:
+        raise ValueError("Imports need the account to import into")
+    result = ImportResult()
+    brands = _name_map(connection, "Brand")
+    folders = _name_map(connection, "Folder")
+
+    chunk = []
+    try:
+        for row_number, record in records:
+            result.rows += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                chunk.append(validate_subscription(*record_fields(record), today=today))
+            except ValidationError as e:
+                result.errors.append((row_number, str(e)))
+
+            if len(chunk) >= chunk_size:
+                result.imported.extend(_write_chunk(connection, chunk, brands, folders, userid))
+                chunk = []
+                if progress:
+                    progress(result)
+
+        if chunk:
+            result.imported.extend(_write_chunk(connection, chunk, brands, folders, userid))
+    except (ValidationError, OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as e:
+        result.failure = str(e)
+
+    if progress:
+        progress(result)
+    return result
+
+
+def filter_conditions(brand=None, folder=None, billing_cycle=None, userid=None):
+    """WHERE conditions and parameters for the subscription list's filters (None = all)"""
+    conditions, params = [], []
+    if userid is not None:
+        conditions.append("s.userid = ?")
+        params.append(userid)
+    if brand is not None:
+        conditions.append("b.brandName = ?")
+        params.append(brand)
+    if folder is not None:
+        conditions.append("f.folderName = ?")
+        params.append(folder)
+    if billing_cycle is not None:
+        conditions.append("s.billingCycle = ?")
+        params.append(billing_cycle)
+    return conditions, params
+
+
+def _where(conditions):
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def fetch_batches(connection, query, params=(), size=EXPORT_BATCH_SIZE):
+    """Lists of up to size rows from query, fetched as they are needed"""
+    cursor = connection.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def spend_batches(connection, conditions, params, userid=None, months=SPEND_MONTHS, first_month=None):
+    """Projected (YYYY-MM, total) rows for months from first_month (this month by default), as one batch.
+
+    conditions are the brand, folder and cycle filters; the owner is separate
+    because CycleSpend can answer for one user but not for those filters.
+    first_month is a ``month_number``.
+    """
+    # The projection needs NumPy, which nothing else here does
+    from datetime import date
+    from submanager_projection import month_number, month_start, project_monthly_totals
+
+    if first_month is None:
+        first_month = month_number(date.today())
+    horizon = month_start(first_month + months)
+    if conditions:
+        # CycleSpend has no brand or folder, so filtered totals come from the rows
+        owner, owner_params = filter_conditions(userid=userid)
+        conditions, params = owner + conditions, owner_params + params
+        rows = connection.execute(f"""
+            SELECT s.nextBillingDate, COALESCE(s.billingCycle, ''), SUM({COST_PENCE.format(row="s")}) / 100.0
+            FROM Subscription s
+            INNER JOIN Brand b ON s.brandid = b.brandid
+            INNER JOIN Folder f ON s.folderid = f.folderid
+            {_where(conditions + ["s.nextBillingDate < ?"])}
+            GROUP BY 1, 2
+        """, params + [horizon]).fetchall()
+    elif userid is not None:
+        rows = connection.execute("""
+            SELECT nextBillingDate, billingCycle, total_pence / 100.0
+            FROM CycleSpend
+            WHERE userid = ? AND nextBillingDate < ?
+        """, (userid, horizon)).fetchall()
+    else:
+        rows = connection.execute("""
+            SELECT nextBillingDate, billingCycle, total_pence / 100.0
+            FROM CycleSpend
+            WHERE nextBillingDate < ?
+        """, (horizon,)).fetchall()
+
+    billing_dates, cycles, costs = zip(*rows) if rows else ((), (), ())
+    totals = project_monthly_totals(billing_dates, cycles, costs, first_month, months)
+    yield [(month_start(first_month + offset)[:7], round(float(total), 2)) for offset, total in enumerate(totals)]
+
+
+def json_query(columns, query):
+    """query with each row encoded as a JSON object by SQLite (much faster than json.dumps)"""
+    pairs = ", ".join(f"'{column}', {column}" for column in columns)
+    return f"WITH result ({', '.join(columns)}) AS ({query}) SELECT json_object({pairs}) FROM result"
+
+
+def export_batches(connection, dataset, conditions, params, userid=None, as_json=False, months=SPEND_MONTHS):
+    """(columns, batches of rows) for a dataset; as_json gives rows of one JSON object each"""
+    if dataset == "spend":
+        batches = spend_batches(connection, conditions, params, userid, months)
+        if as_json:
+            batches = ([(json.dumps(dict(zip(SPEND_COLUMNS, row)), separators=(",", ":")),) for row in rows]
+                       for rows in batches)
+        return SPEND_COLUMNS, batches
+    owner, owner_params = filter_conditions(userid=userid)
+    conditions, params = owner + conditions, owner_params + params
+    columns, query = EXPORT_QUERIES[dataset]
+    query = query.format(where=_where(conditions))
+    if as_json:
+        query = json_query(columns, query)
+    return columns, fetch_batches(connection, query, params)
+
+
+def _write_csv(file, columns, batches, progress):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    written = 0
+    for rows in batches:
+        writer.writerows(rows)
+        written += len(rows)
+        if progress:
+            progress(written)
+    return written
+
+
+def _write_json_lines(file, columns, batches, progress):
+    written = 0
+    for rows in batches:
+        file.writelines(row[0] + "\n" for row in rows)
+        written += len(rows)
+        if progress:
+            progress(written)
+    return written
+
+
+def _write_snapshot(connection, path, conditions, params, progress, userid):
+    """Copy userid's account and matching subscriptions, their brands, folders and alerts into a new database"""
+    snapshot = Database(path)
+    target = snapshot.writer
+    where = _where(conditions)
+    joins = """
+        FROM Subscription s
+        INNER JOIN Brand b ON s.brandid = b.brandid
+        INNER JOIN Folder f ON s.folderid = f.folderid
+    """
+    copies = [
+        ("INSERT INTO User (userid, username, password, firstname, surname) VALUES (?, ?, ?, ?, ?)",
+         "SELECT userid, username, password, firstname, surname FROM User WHERE userid = ?", (userid,)),
+        ("INSERT INTO Brand (brandid, brandName) VALUES (?, ?)",
+         f"SELECT DISTINCT b.brandid, b.brandName {joins} {where}", params),
+        ("INSERT INTO Folder (folderid, folderName) VALUES (?, ?)",
+         f"SELECT DISTINCT f.folderid, f.folderName {joins} {where}", params),
+        ("INSERT INTO Subscription (subscriptionid, subscriptionName, cost, brandid, folderid, billingCycle,"
+         " nextBillingDate, userid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+         f"SELECT s.subscriptionid, s.subscriptionName, s.cost, s.brandid, s.folderid, s.billingCycle,"
+         f" s.nextBillingDate, s.userid {joins} {where}", params),
+        ("INSERT INTO Alert (alertid, subscriptionid, alert_date, alert_type, alert_message, fired)"
+         " VALUES (?, ?, ?, ?, ?, ?)",
+         f"SELECT a.alertid, a.subscriptionid, a.alert_date, a.alert_type, a.alert_message, a.fired"
+         f" FROM Alert a INNER JOIN Subscription s ON a.subscriptionid = s.subscriptionid"
+         f" INNER JOIN Brand b ON s.brandid = b.brandid INNER JOIN Folder f ON s.folderid = f.folderid {where}",
+         params),
+    ]
+    written = 0
+    try:
+        # Triggers are held off while copying; the derived tables are built once at the end
+        target.execute("INSERT INTO BulkLoad (active) VALUES (1)")
+        for insert, query, query_params in copies:
+            for rows in fetch_batches(connection, query, query_params):
+                target.executemany(insert, rows)
+                written += len(rows)
+                if progress:
+                    progress(written)
+        target.execute("DELETE FROM BulkLoad")
+        rebuild_search_index(target)
+        rebuild_spend_aggregates(target)
+        target.commit()
+    finally:
+        snapshot.close()
+    return written
+
+
+def export_data(connection, path, dataset="subscriptions", format=None, brand=None, folder=None,
+                billing_cycle=None, progress=None, userid=None):
+    """Export a dataset (userid's rows, or everyone's) to path and return the number of rows written.
+
+    format is "csv", "jsonl" or "sqlite" (from the extension by default); a
+    SQLite snapshot holds the filtered subscriptions with their brands,
+    folders and alerts whatever the dataset, and the account they belong
+    to (so userid is required), which can log in to it.  ``progress(rows written)`` is
+    called after every batch.  The file is written under a temporary name and
+    only replaces path once complete.
+    """
+    format = format or export_format(path)
+    if format == "sqlite" and userid is None:
+        raise ValueError("A SQLite snapshot needs the account whose subscriptions it holds")
+    conditions, params = filter_conditions(brand, folder, billing_cycle)
+    partial = path + ".part"
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    # One read transaction, so every query sees the same data
+    connection.execute("BEGIN")
+    try:
+        if format == "sqlite":
+            owner, owner_params = filter_conditions(userid=userid)
+            written = _write_snapshot(connection, partial, owner + conditions, owner_params + params, progress,
+                                      userid)
+        else:
+            columns, batches = export_batches(connection, dataset, conditions, params, userid,
+                                              as_json=format == "jsonl")
+            writer = _write_csv if format == "csv" else _write_json_lines
+            with open(partial, "w", newline="", encoding="utf-8") as file:
+                written = writer(file, columns, batches, progress)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        connection.rollback()
+
+    os.replace(partial, path)
+    return written
+
+
+def export_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    return "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and export subscriptions")
+    parser.add_argument("--db", help="path to the SQLite database")
+    parser.add_argument("--user", help="username whose subscriptions to import into or export"
+                        " (required for imports and SQLite snapshots)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="add the subscriptions in a CSV, JSON or JSON Lines file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=["csv", "json", "jsonl"],
+                               help="file format (from the extension by default)")
+    import_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    export_parser = commands.add_parser("export", help="write subscriptions, alerts or projected spend to a file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--dataset", choices=["subscriptions", "alerts", "spend"], default="subscriptions")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, help="file format (from the extension by default)")
+    export_parser.add_argument("--brand")
+    export_parser.add_argument("--folder")
+    export_parser.add_argument("--cycle", help="billing cycle, e.g. Monthly")
+    args = parser.parse_args()
+
+    database = Database(resolve_database_path(args.db))
+    try:
+        args.userid = None
+        snapshot = args.command == "export" and (args.format or export_format(args.path)) == "sqlite"
+        if args.user is None and (args.command == "import" or snapshot):
+            print("--user is required for imports and SQLite snapshots", file=sys.stderr)
+            return 2
+        if args.user is not None:
+            args.userid = find_user(database.writer, args.user)
+            if args.userid is None:
+                print(f"No such user: {args.user}", file=sys.stderr)
+                return 2
+        if args.command == "export":
+            return export_main(database, args)
+        return import_main(database, args)
+    finally:
+        database.close()
+
+
+def import_main(database, args):
+    def report(result):
+        print(f"\r{result.rows:,} rows read, {len(result.imported):,} imported, "
+              f"{len(result.errors):,} rejected", end="", file=sys.stderr, flush=True)
+
+    result = import_subscriptions(database.writer, read_records(args.path, args.format),
+                                  chunk_size=args.chunk_size, progress=report, userid=args.userid)
+    print(file=sys.stderr)
+
+    for row_number, message in result.errors[:20]:
+        print(f"row {row_number}: {message}")
+    if len(result.errors) > 20:
+        print(f"... and {len(result.errors) - 20:,} more rejected rows")
+    if result.failure:
+        print(f"Import stopped: {result.failure}")
+        return 2
+    return 1 if result.errors else 0
+
+
+def export_main(database, args):
+    def report(written):
+        print(f"\r{written:,} rows written", end="", file=sys.stderr, flush=True)
+
+    try:
+        written = export_data(database.reader(), args.path, args.dataset, args.format,
+                              args.brand, args.folder, args.cycle, progress=report, userid=args.userid)
+    except (OSError, sqlite3.Error) as e:
+        print(f"\nExport failed: {e}", file=sys.stderr)
+        return 2
+    print(f"\r{written:,} rows written to {args.path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
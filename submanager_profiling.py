@@ -0,0 +1,347 @@
+"""Opt-in profiling of SQL statements and UI work, with a slow-operation log.
+
+Nothing is measured unless the app is started with ``--profile`` (or the
+``SUBMANAGER_PROFILE`` environment variable is set), which calls
+``profiler.enable()``.  From then on:
+
+* connections opened with ``factory=ProfiledConnection`` time every statement
+  from ``execute`` until its last row is fetched, and count the rows it read
+  or changed
+* ``profiler.span(kind, name)`` and the ``@profiled(kind)`` decorator time
+  blocks of UI work (page refreshes, Treeview rendering, chart drawing,
+  modals); rows fetched inside a span are added to the span's count
+* anything slower than ``SLOW_SQL_MS``/``SLOW_UI_MS`` is written to a rotating
+  log, statements with their ``EXPLAIN QUERY PLAN``
+
+``profiler.stats()`` gives the count, p50, p95 and slowest time per operation.
+Statement parameters are never logged (the login query binds a password),
+only how many there were.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain
+from logging.handlers import RotatingFileHandler
+
+PROFILE_ENV = "SUBMANAGER_PROFILE"
+
+# Written beside the database
+SLOW_LOG_NAME = "submanager_slow.log"
+SLOW_LOG_BYTES = 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+# Operations at least this slow are logged
+SLOW_SQL_MS = 50
+SLOW_UI_MS = 100
+
+# Latest timings kept per operation for the percentiles
+SAMPLES_KEPT = 1000
+
+# Statements with a query plan worth logging (not PRAGMA, DDL or transactions)
+PLANNED_STATEMENTS = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE"}
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def profile_requested(flag=False):
+    """Whether profiling was asked for by flag or the environment"""
+    return flag or os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+def slow_log_path(database_path):
+    return os.path.join(os.path.dirname(os.path.abspath(database_path)), SLOW_LOG_NAME)
+
+
+def statement_name(sql):
+    """SQL on one line, with placeholder lists folded so every IN (?, ...) size counts as one statement"""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+
+def percentile(samples, share):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Span:
+    """A block of work being timed; rows is set by the caller or counted from its SQL"""
+
+    def __init__(self):
+        self.rows = 0
+
+
+class OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.slowest = 0.0
+        self.samples = deque(maxlen=SAMPLES_KEPT)
+
+    def add(self, elapsed, rows):
+        self.count += 1
+        self.rows += rows
+        self.slowest = max(self.slowest, elapsed)
+        self.samples.append(elapsed)
+
+
+class Profiler:
+    """Timings per (kind, name) operation, collected from any thread"""
+
+    def __init__(self):
+        self.enabled = False
+        self.log = None
+        self.log_path = None
+        self.slow_sql = SLOW_SQL_MS / 1000
+        self.slow_ui = SLOW_UI_MS / 1000
+        self._operations = {}
+        self._lock = threading.Lock()
+        # Spans open on each thread, innermost last
+        self._local = threading.local()
+
+    def enable(self, log_path, slow_sql_ms=SLOW_SQL_MS, slow_ui_ms=SLOW_UI_MS):
+        handler = RotatingFileHandler(log_path, maxBytes=SLOW_LOG_BYTES, backupCount=SLOW_LOG_BACKUPS,
+                                      encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s [%(threadName)s] %(message)s"))
+        self.log = logging.getLogger("submanager.slow")
+        self.log.setLevel(logging.INFO)
+        self.log.propagate = False
+        self.log.addHandler(handler)
+        self.log_path = log_path
+        self.slow_sql = slow_sql_ms / 1000
+        self.slow_ui = slow_ui_ms / 1000
+        self.enabled = True
+
+    def _spans(self):
+        spans = getattr(self._local, "spans", None)
+        if spans is None:
+            spans = self._local.spans = []
+        return spans
+
+    def count_rows(self, rows):
+        """Add rows read or changed by a statement to every span open on this thread"""
+        for span in self._spans():
+            span.rows += rows
+
+    def record(self, kind, name, elapsed, rows=0, detail=None):
+        with self._lock:
+            operation = self._operations.get((kind, name))
+            if operation is None:
+                operation = self._operations[(kind, name)] = OperationStats()
+            operation.add(elapsed, rows)
+
+        if self.log is not None and elapsed >= (self.slow_sql if kind == "sql" else self.slow_ui):
+            message = f"slow {kind} {elapsed * 1000:.1f} ms, {rows} rows: {name}"
+            self.log.warning(message + (f"\n{detail}" if detail else ""))
+
+    def record_statement(self, connection, sql, parameters, elapsed, rows):
+        detail = None
+        if self.log is not None and elapsed >= self.slow_sql:
+            count = len(parameters) if parameters else 0
+            plan = self.explain(connection, sql, parameters)
+            detail = f"    {count} parameters" + "".join(f"\n    {line}" for line in plan)
+        self.record("sql", statement_name(sql), elapsed, rows, detail)
+
+    def explain(self, connection, sql, parameters):
+        """EXPLAIN QUERY PLAN lines for sql, indented by depth ([] if it has no plan)"""
+        words = sql.split(None, 1)
+        if not words or words[0].upper() not in PLANNED_STATEMENTS:
+            return []
+        try:
+            # The base class's execute, so the plan itself is not profiled
+            plan = sqlite3.Connection.execute(connection, "EXPLAIN QUERY PLAN " + sql, parameters or ()).fetchall()
+        except sqlite3.Error as e:
+            return [f"plan unavailable: {e}"]
+
+        depths = {0: 0}
+        lines = []
+        for node, parent, _, detail in plan:
+            depths[node] = depths.get(parent, 0) + 1
+            lines.append("  " * (depths[node] - 1) + detail)
+        return lines
+
+    @contextmanager
+    def span(self, kind, name):
+        """Time the with block as one (kind, name) operation"""
+        if not self.enabled:
+            yield Span()
+            return
+        span = Span()
+        spans = self._spans()
+        spans.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            elapsed = time.perf_counter() - started
+            spans.remove(span)
+            self.record(kind, name, elapsed, span.rows)
+
+    def stats(self):
+        """One dict per operation, slowest p95 first; times in milliseconds, rows per call"""
+        with self._lock:
+            operations = [(key, operation.count, operation.rows, operation.slowest, list(operation.samples))
+                          for key, operation in self._operations.items()]
+        stats = [
+            {
+                "kind": kind, "name": name, "count": count,
+                "p50_ms": percentile(samples, 0.5) * 1000,
+                "p95_ms": percentile(samples, 0.95) * 1000,
+                "max_ms": slowest * 1000,
+                "rows": rows / count,
+            }
+            for (kind, name), count, rows, slowest, samples in operations
+        ]
+        stats.sort(key=lambda stat: stat["p95_ms"], reverse=True)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
+
+profiler = Profiler()
+
+
+def profiled(kind, name=None, rows=None):
+    """Decorator timing each call as a (kind, name) operation; name defaults to the function's.
+
+    rows, if given, is called with the call's arguments and gives the rows it
+    handles; otherwise the rows its SQL fetched are counted.
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.span(kind, label) as span:
+                if rows is not None:
+                    span.rows = rows(*args, **kwargs)
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """A cursor that times each statement, including fetching its rows.
+
+    A statement is recorded once its rows run out, the cursor runs another
+    statement or is closed, or it is garbage collected.
+    """
+
+    _statement = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, parameters, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        # Keep the first parameter set for the query plan
+        seq_of_parameters = iter(seq_of_parameters)
+        first = next(seq_of_parameters, None)
+        started = time.perf_counter()
+        super().executemany(sql, chain([first], seq_of_parameters) if first is not None else [])
+        self._begin(sql, first, time.perf_counter() - started)
+        return self
+
+    def executescript(self, sql_script):
+        self._finish()
+        started = time.perf_counter()
+        super().executescript(sql_script)
+        self._begin(sql_script, None, time.perf_counter() - started)
+        return self
+
+    def _begin(self, sql, parameters, elapsed):
+        if not profiler.enabled:
+            return
+        self._statement = [sql, parameters, elapsed, 0]
+        if self.description is None:
+            # Nothing to fetch: done, having changed rowcount rows
+            self._fetched(0, max(self.rowcount, 0), True)
+
+    def _fetched(self, started, rows, done):
+        statement = self._statement
+        if statement is None:
+            return
+        if started:
+            statement[2] += time.perf_counter() - started
+        if rows:
+            statement[3] += rows
+            profiler.count_rows(rows)
+        if done:
+            self._finish()
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            profiler.record_statement(self.connection, *statement)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, 0 if row is None else 1, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(started, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass  # finalizers must not raise
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection factory whose statements all run on ProfiledCursor"""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection's shortcuts do not go through cursor(), so route them there
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,128 @@
+"""Billing-cycle projection for the expense insights chart.
+
+Expands every subscription's recurrence (Daily, Weekly, Monthly, Yearly and
+the custom "Every N days/weeks/months/years" strings) into per-month charge
+totals over a horizon.  Everything is done with NumPy array operations:
+
+* month-based cycles are bucketed by first charge month with ``np.bincount``
+  and carried forward every ``step`` months with a strided cumulative sum,
+  so memory stays proportional to the horizon, not rows times months;
+* day-based cycles are too dense to expand (a daily subscription charges
+  ~30 times a month), so the number of charges per month is worked out in
+  closed form from the month boundaries instead.
+"""
+import numpy as np
+
+from submanager_core import DAY, MONTH, ONCE, parse_billing_cycle
+
+# Cells (rows x month boundaries) per block of the day-cycle count matrix
+CHUNK_CELLS = 4_000_000
+
+
+def month_number(value):
+    """Months since 1970-01 for a date, datetime or ISO date string"""
+    month = np.datetime64(str(value)[:7], "M")
+    return int(month.astype(np.int64))
+
+
+def month_start(month):
+    """ISO date of the first day of a month_number() month"""
+    return f"{np.datetime64(int(month), 'M')}-01"
+
+
+def _cycle_arrays(cycles):
+    """Parse each distinct cycle string once and broadcast back to all rows"""
+    distinct, inverse = np.unique(np.asarray(cycles, dtype=object).astype(str), return_inverse=True)
+    parsed = np.array([parse_billing_cycle(cycle) for cycle in distinct], dtype=np.int64).reshape(-1, 2)
+    return parsed[inverse, 0], parsed[inverse, 1]
+
+
+def _month_cycle_totals(start_months, steps, costs, months):
+    """Charges per month, carried forward every step months from each first charge"""
+    totals = np.zeros(months)
+    for step in np.unique(steps):
+        mask = steps == step
+        starts = start_months[mask]
+
+        # Move anything that started before the horizon to its first charge inside it
+        behind = starts < 0
+        starts = starts.copy()
+        starts[behind] += (-starts[behind] + step - 1) // step * step
+
+        # A charge in month m recurs in m + step, m + 2 * step, ...: a running
+        # total along each stride of step months
+        inside = starts < months
+        first_charges = np.bincount(starts[inside], weights=costs[mask][inside], minlength=months)
+        for offset in range(min(step, months)):
+            totals[offset::step] += np.cumsum(first_charges[offset::step])
+    return totals
+
+
+def _day_cycle_totals(start_days, steps, costs, boundaries):
+    """Charges per month from the number of occurrences before each month boundary"""
+    totals = np.zeros(len(boundaries) - 1)
+    chunk = max(1, CHUNK_CELLS // len(boundaries))
+    for begin in range(0, len(start_days), chunk):
+        starts = start_days[begin:begin + chunk, None]
+        step = steps[begin:begin + chunk, None]
+        # Occurrences strictly before each boundary: floor((boundary - 1 - start) / step) + 1
+        before = np.clip((boundaries[None, :] - 1 - starts) // step + 1, 0, None)
+        totals += costs[begin:begin + chunk] @ np.diff(before, axis=1)
+    return totals
+
+
+def project_monthly_totals(billing_dates, cycles, costs, first_month, months):
+    """Total charges per month for ``months`` months starting at ``first_month``.
+
+    Args:
+        billing_dates: next billing dates as ISO strings (or datetime64[D])
+        cycles: billing cycle strings, one per subscription
+        costs: charge per occurrence, one per subscription
+        first_month: first month of the horizon, in month_number() units
+        months: horizon length in months
+
+    Returns:
+        float array of length ``months``
+    """
+    days = np.asarray(billing_dates, dtype="datetime64[D]")
+    units, steps = _cycle_arrays(cycles)
+    return project_cycle_totals(days, units, steps, costs, first_month, months)
+
+
+def project_cycle_totals(days, units, steps, costs, first_month, months):
+    """project_monthly_totals for cycles already parsed into (unit, step) arrays.
+
+    days are datetime64[D] next billing dates; used directly by
+    ``SubscriptionColumns``, which keeps its cycles parsed.
+    """
+    if months <= 0:
+        return np.zeros(0)
+    if len(costs) == 0:
+        return np.zeros(months)
+
+    days = np.asarray(days, dtype="datetime64[D]")
+    costs = np.asarray(costs, dtype=np.float64)
+    start_months = days.astype("datetime64[M]").astype(np.int64) - first_month
+
+    totals = np.zeros(months)
+
+    once = units == ONCE
+    if once.any():
+        inside = once & (start_months >= 0) & (start_months < months)
+        totals += np.bincount(start_months[inside], weights=costs[inside], minlength=months)
+
+    monthly = units == MONTH
+    if monthly.any():
+        totals += _month_cycle_totals(start_months[monthly], steps[monthly], costs[monthly], months)
+
+    daily = units == DAY
+    if daily.any():
+        boundaries = (
+            np.arange(first_month, first_month + months + 1)
+            .astype("datetime64[M]")
+            .astype("datetime64[D]")
+            .astype(np.int64)
+        )
+        totals += _day_cycle_totals(days[daily].astype(np.int64), steps[daily], costs[daily], boundaries)
+
+    return totals
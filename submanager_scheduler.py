@@ -0,0 +1,122 @@
+"""Fires alert reminders at their due time from a single timer.
+
+Pending alerts sit in a min-heap keyed by due datetime, and one timer is
+armed for the earliest of them, so nothing polls the Alert table.  Adding an
+alert is a heap push (O(log n)); cancelling only marks its heap entry, which
+is skipped when it reaches the top, and the heap is rebuilt without the dead
+entries once they outnumber the live ones.
+
+The timer is never set further ahead than ``MAX_TIMER_MS``, so a changed
+system clock or a suspended machine only delays a reminder by that much.
+The scheduler does not depend on Tk: it is given ``schedule(ms, callback)``
+and ``cancel(handle)`` functions (``widget.after``/``widget.after_cancel``).
+"""
+import heapq
+import itertools
+from datetime import date, datetime, time
+
+# Alerts are for a date; reminders go off at this time on the day
+ALERT_TIME = time(9, 0)
+
+# Longest single timer; the scheduler re-checks the clock at least this often
+MAX_TIMER_MS = 60 * 60 * 1000
+
+
+def alert_due(alert_date):
+    """Due datetime of an alert stored with an ISO date"""
+    return datetime.combine(date.fromisoformat(alert_date), ALERT_TIME)
+
+
+class AlertScheduler:
+    def __init__(self, schedule, cancel, on_due, clock=datetime.now):
+        self.schedule = schedule
+        self.cancel_timer = cancel
+        self.on_due = on_due
+        self.clock = clock
+
+        # Heap of [due, sequence, alert_id, live] entries, and each live entry by alert id
+        self.heap = []
+        self.entries = {}
+        self.sequence = itertools.count()
+
+        self.timer = None
+        self.timer_due = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, alert_id):
+        return alert_id in self.entries
+
+    def add(self, alert_id, due):
+        """Schedule (or reschedule) an alert"""
+        self._discard(alert_id)
+        entry = [due, next(self.sequence), alert_id, True]
+        self.entries[alert_id] = entry
+        heapq.heappush(self.heap, entry)
+        if self.timer_due is None or due < self.timer_due:
+            self.arm()
+
+    def add_many(self, alerts):
+        """Schedule many (alert_id, due) pairs at once"""
+        alerts = list(alerts)
+        if len(alerts) < len(self.heap) // 4:
+            for alert_id, due in alerts:
+                self.add(alert_id, due)
+            return
+
+        # Cheaper to append everything and heapify once
+        for alert_id, due in alerts:
+            self._discard(alert_id)
+            entry = [due, next(self.sequence), alert_id, True]
+            self.entries[alert_id] = entry
+            self.heap.append(entry)
+        heapq.heapify(self.heap)
+        self.arm()
+
+    def cancel(self, alert_id):
+        """Stop an alert from firing (its heap entry is dropped lazily)"""
+        self._discard(alert_id)
+        # Too many dead entries: rebuild the heap from the live ones
+        if len(self.heap) > 64 and len(self.heap) > 2 * len(self.entries):
+            self.heap = [entry for entry in self.heap if entry[3]]
+            heapq.heapify(self.heap)
+
+    def _discard(self, alert_id):
+        entry = self.entries.pop(alert_id, None)
+        if entry is not None:
+            entry[3] = False
+
+    def arm(self):
+        """Point the timer at the earliest live alert"""
+        if self.timer is not None:
+            self.cancel_timer(self.timer)
+            self.timer = None
+            self.timer_due = None
+
+        while self.heap and not self.heap[0][3]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return
+
+        due = self.heap[0][0]
+        delay = (due - self.clock()).total_seconds() * 1000
+        self.timer_due = due
+        self.timer = self.schedule(int(min(max(delay, 0), MAX_TIMER_MS)), self.fire)
+
+    def fire(self):
+        """Timer callback: hand every alert that is now due to on_due"""
+        self.timer = None
+        self.timer_due = None
+
+        now = self.clock()
+        due_ids = []
+        while self.heap and (not self.heap[0][3] or self.heap[0][0] <= now):
+            entry = heapq.heappop(self.heap)
+            if entry[3]:
+                del self.entries[entry[2]]
+                due_ids.append(entry[2])
+
+        self.arm()
+        if due_ids:
+            self.on_due(due_ids)
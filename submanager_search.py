@@ -0,0 +1,153 @@
+"""Ranked substring and typo-tolerant subscription search.
+
+Backed by the ``SubscriptionSearch`` FTS5 trigram table (subscription, brand
+and folder names, rowid = subscriptionid), which triggers on the base tables
+keep in sync.  Its owner column holds ``#<userid>#``; a search for one user
+requires that phrase as well, so it only reads that user's matches.
+
+A search first looks for the term as a substring.  Selective terms are
+ranked with bm25; terms matching more rows than can be shown are not ranked
+(that would mean scoring every match) and name matches are listed first
+instead.  If the substring pass finds little, a typo-tolerant pass looks for
+names that differ from the term by a single edit: an edit only breaks the
+trigrams around it, so for each edit position the trigrams away from it
+must all still match.
+"""
+import sqlite3
+
+# Trigram matching needs at least this many characters
+MIN_TERM_LENGTH = 3
+
+# Most results a single search returns
+SEARCH_RESULT_LIMIT = 500
+
+# Run the typo-tolerant pass when the substring pass finds fewer than this
+FUZZY_FALLBACK_BELOW = 10
+
+# Rows fetched for the typo-tolerant pass before they are scored in Python
+FUZZY_CANDIDATES = 200
+
+# bm25 column weights: subscription name, brand name, folder name, owner
+RANK = "bm25(SubscriptionSearch, 10.0, 3.0, 1.0, 0.0)"
+
+# Terms only ever match the name columns, never the owner tag
+NAME_COLUMNS = "{subscriptionName brandName folderName}"
+
+
+def has_search_index(connection):
+    """True if the FTS5 search table exists (SQLite may be built without FTS5)"""
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'SubscriptionSearch'"
+    ).fetchone()
+    return row is not None
+
+
+def trigram_list(text):
+    text = text.casefold()
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def quote(text):
+    """FTS5 string literal, so user input is never parsed as query syntax"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def single_edit_query(term):
+    """FTS5 query matching text within one edit of term.
+
+    An edit at position p only breaks the trigrams starting at p-2..p, so for
+    every p the remaining trigrams must all be present.
+    """
+    grams = trigram_list(term)
+    min_kept = 2 if len(grams) >= 5 else 1
+
+    clauses = set()
+    for position in range(len(term)):
+        kept = sorted({gram for start, gram in enumerate(grams) if start < position - 2 or start > position})
+        if len(kept) >= min_kept:
+            clauses.add(" AND ".join(quote(gram) for gram in kept))
+
+    return " OR ".join(f"({clause})" for clause in sorted(clauses))
+
+
+def scoped(query, userid=None):
+    """query limited to the name columns and, given a userid, to that user's rows"""
+    query = f"{NAME_COLUMNS} : ({query})"
+    if userid is None:
+        return query
+    return f"owner : {quote(f'#{userid}#')} AND {query}"
+
+
+def similarity(term_grams, text):
+    """Share of the term's trigrams that appear in text"""
+    if not term_grams or not text:
+        return 0.0
+    return len(term_grams & set(trigram_list(text))) / len(term_grams)
+
+
+def _match_ids(connection, query, limit, ranked=False):
+    order = f" ORDER BY {RANK}" if ranked else ""
+    return [row[0] for row in connection.execute(
+        f"SELECT rowid FROM SubscriptionSearch WHERE SubscriptionSearch MATCH ?{order} LIMIT ?",
+        (query, limit)
+    )]
+
+
+def _substring_ids(connection, term, limit, userid):
+    phrase = quote(term)
+    query = scoped(phrase, userid)
+
+    # Unranked probe: stops after limit + 1 rows however common the term is
+    ids = _match_ids(connection, query, limit + 1)
+    if len(ids) <= limit:
+        # Few enough matches that ranking all of them is cheap
+        return _match_ids(connection, query, limit, ranked=True)
+
+    name_query = scoped("{subscriptionName} : " + phrase, userid)
+    ids = _match_ids(connection, name_query, limit)
+    if len(ids) < limit:
+        found = set(ids)
+        ids += [rowid for rowid in _match_ids(connection, query, limit) if rowid not in found][:limit - len(ids)]
+    return ids
+
+
+def _fuzzy_ids(connection, term, exclude, limit, userid):
+    query = single_edit_query(term)
+    if not query:
+        return []
+    query = scoped(query, userid)
+
+    term_grams = set(trigram_list(term))
+    scored = []
+    for rowid, *names in connection.execute(
+        "SELECT rowid, subscriptionName, brandName, folderName FROM SubscriptionSearch"
+        " WHERE SubscriptionSearch MATCH ? LIMIT ?",
+        (query, FUZZY_CANDIDATES)
+    ):
+        if rowid not in exclude:
+            scored.append((-max(similarity(term_grams, name) for name in names), rowid))
+
+    return [rowid for _, rowid in sorted(scored)[:limit]]
+
+
+def search_subscription_ids(connection, term, limit=SEARCH_RESULT_LIMIT, userid=None):
+    """Return subscription ids matching term, best match first.
+
+    Only userid's subscriptions are searched when one is given.  Returns None
+    when the term is too short for trigram matching or the database has no
+    search index, so callers can fall back to prefix search.
+    """
+    term = " ".join(term.split())
+    if len(term) < MIN_TERM_LENGTH:
+        return None
+
+    try:
+        ids = _substring_ids(connection, term, limit, userid)
+    except sqlite3.OperationalError:
+        if not has_search_index(connection):
+            return None
+        raise
+
+    if len(ids) < FUZZY_FALLBACK_BELOW:
+        ids += _fuzzy_ids(connection, term, set(ids), limit - len(ids), userid)
+    return ids
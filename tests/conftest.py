@@ -0,0 +1,88 @@
+"""Fixtures shared by the tests: a throwaway database with one account in it"""
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from submanager_db import Database, bulk_insert_subscriptions  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "subscriptions.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def userid(database):
+    userid = database.writer.execute("INSERT INTO User (username, password) VALUES ('alice', 'secret')").lastrowid
+    database.writer.commit()
+    return userid
+
+
+@pytest.fixture
+def add_subscriptions(database, userid):
+    """add_subscriptions(rows) -> ids, rows being (name, cost, brand, folder, cycle, ISO date) tuples"""
+    def add(rows, owner=None):
+        writer = database.writer
+        rows = [
+            (name, cost, database.brands.get(writer, brand), database.folders.get(writer, folder), cycle, billing_date)
+            for name, cost, brand, folder, cycle, billing_date in rows
+        ]
+        ids = bulk_insert_subscriptions(writer, rows, owner or userid)
+        writer.commit()
+        return ids
+    return add
+
+
+class Treeview:
+    """Stand-in for the subscription list's ttk.Treeview: its rows in order, and the calls made"""
+
+    def __init__(self):
+        self.order = []
+        self.values = {}
+        self.calls = Counter()
+
+    def get_children(self, item=""):
+        return tuple(self.order)
+
+    def index(self, iid):
+        return self.order.index(iid)
+
+    def insert(self, parent, index, iid, text="", values=()):
+        self.calls["insert"] += 1
+        self.order.insert(index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+
+    def item(self, iid, values):
+        self.calls["item"] += 1
+        self.values[iid] = tuple(values)
+
+    def delete(self, *iids):
+        self.calls["delete"] += 1
+        for iid in iids:
+            self.order.remove(iid)
+            del self.values[iid]
+
+    def detach(self, iid):
+        self.order.remove(iid)
+
+    def move(self, iid, parent, index):
+        self.calls["move"] += 1
+        self.order.insert(index, iid)
+
+    def bind(self, sequence, func, add=None):
+        pass
+
+    def configure(self, **options):
+        pass
+
+
+@pytest.fixture
+def tree():
+    return Treeview()
@@ -0,0 +1,147 @@
+"""AlertScheduler fires each pending alert at its due time, in order, from one timer"""
+import itertools
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from submanager_scheduler import MAX_TIMER_MS, AlertScheduler, alert_due
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Timers:
+    """Stand-in for widget.after/after_cancel, run by moving the clock forward"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = {}
+        self.handles = itertools.count()
+        self.longest = 0
+
+    def schedule(self, ms, callback):
+        self.longest = max(self.longest, ms)
+        handle = next(self.handles)
+        self.pending[handle] = (self.clock.now + timedelta(milliseconds=ms), handle, callback)
+        return handle
+
+    def cancel(self, handle):
+        del self.pending[handle]
+
+    def advance(self, until):
+        while self.pending:
+            when, handle, callback = min(self.pending.values())
+            if when > until:
+                break
+            del self.pending[handle]
+            self.clock.now = when
+            callback()
+        self.clock.now = until
+
+
+@pytest.fixture
+def alerts(database, userid, add_subscriptions):
+    """(alertid, alert_date) rows not yet fired, as the app loads them at login"""
+    rng = random.Random(14)
+    ids = add_subscriptions([(f"Sub {i}", "£1.00", "Brand", "Folder", "Monthly", "2026-06-01") for i in range(20)])
+    writer = database.writer
+    writer.executemany(
+        "INSERT INTO Alert (subscriptionid, alert_date, alert_type, alert_message, fired) VALUES (?, ?, ?, ?, ?)",
+        [(rng.choice(ids), (date(2026, 2, 20) + timedelta(days=rng.randrange(60))).isoformat(), "Renewal",
+          "Renews soon", int(rng.random() < 0.2)) for _ in range(200)]
+    )
+    writer.commit()
+    return writer.execute(
+        "SELECT a.alertid, a.alert_date FROM Subscription s INNER JOIN Alert a ON a.subscriptionid = s.subscriptionid"
+        " WHERE s.userid = ? AND a.fired = 0", (userid,)
+    ).fetchall()
+
+
+@pytest.fixture
+def scheduler():
+    clock = Clock(START)
+    timers = Timers(clock)
+    fired = []
+
+    def on_due(alert_ids):
+        fired.extend((alert_id, clock.now) for alert_id in alert_ids)
+
+    scheduler = AlertScheduler(timers.schedule, timers.cancel, on_due, clock=clock)
+    scheduler.timers, scheduler.fired = timers, fired
+    return scheduler
+
+
+def test_alerts_fire_in_due_order_at_their_time(scheduler, alerts):
+    scheduler.add_many((alert_id, alert_due(alert_date)) for alert_id, alert_date in alerts)
+
+    # Overdue alerts go off straight away
+    scheduler.timers.advance(START)
+    overdue = {alert_id for alert_id, alert_date in alerts if alert_due(alert_date) <= START}
+    assert {alert_id for alert_id, _ in scheduler.fired} == overdue
+
+    for day in range(60):
+        scheduler.timers.advance(START + timedelta(days=day))
+        # Only ever one timer, never set further ahead than MAX_TIMER_MS
+        assert len(scheduler.timers.pending) <= 1
+    assert scheduler.timers.longest <= MAX_TIMER_MS
+
+    due = {alert_id: alert_due(alert_date) for alert_id, alert_date in alerts}
+    assert sorted(alert_id for alert_id, _ in scheduler.fired) == sorted(due)
+    fired_due = [due[alert_id] for alert_id, _ in scheduler.fired]
+    assert fired_due == sorted(fired_due)
+    assert all(when == max(due[alert_id], START) for alert_id, when in scheduler.fired)
+    assert len(scheduler) == 0
+
+
+def test_cancelled_alerts_never_fire(scheduler, alerts, database):
+    scheduler.add_many((alert_id, alert_due(alert_date)) for alert_id, alert_date in alerts)
+
+    # Deleting a subscription deletes its alerts; the app cancels them as it hears of it
+    subscription_id = database.writer.execute("SELECT subscriptionid FROM Alert WHERE alertid = ?",
+                                              (alerts[0][0],)).fetchone()[0]
+    deleted = [row[0] for row in database.writer.execute("SELECT alertid FROM Alert WHERE subscriptionid = ?",
+                                                         (subscription_id,))]
+    database.writer.execute("DELETE FROM Alert WHERE subscriptionid = ?", (subscription_id,))
+    for alert_id in deleted:
+        scheduler.cancel(alert_id)
+    assert all(alert_id not in scheduler for alert_id in deleted)
+
+    scheduler.timers.advance(START + timedelta(days=60))
+
+    fired = {alert_id for alert_id, _ in scheduler.fired}
+    assert fired == {alert_id for alert_id, _ in alerts} - set(deleted)
+
+
+def test_cancelling_most_alerts_drops_their_heap_entries(scheduler):
+    scheduler.add_many((alert_id, START + timedelta(days=1, minutes=alert_id)) for alert_id in range(1000))
+    for alert_id in range(900):
+        scheduler.cancel(alert_id)
+
+    assert len(scheduler) == 100
+    assert len(scheduler.heap) <= 2 * len(scheduler)
+
+    scheduler.timers.advance(START + timedelta(days=2))
+    assert [alert_id for alert_id, _ in scheduler.fired] == list(range(900, 1000))
+
+
+def test_rescheduling_moves_the_timer(scheduler):
+    scheduler.add(1, START + timedelta(days=3))
+    scheduler.add(2, START + timedelta(days=2))
+    # Sooner than the timer already set (MAX_TIMER_MS ahead), so it is re-armed
+    scheduler.add(1, START + timedelta(minutes=10))
+
+    scheduler.timers.advance(START + timedelta(hours=1))
+    assert scheduler.fired == [(1, START + timedelta(minutes=10))]
+
+    scheduler.cancel(2)
+    scheduler.timers.advance(START + timedelta(days=5))
+    assert scheduler.fired == [(1, START + timedelta(minutes=10))]
+    assert not scheduler.timers.pending
@@ -0,0 +1,108 @@
+"""delete_subscriptions and update_subscriptions over id lists longer than one IN (...) chunk"""
+import random
+
+import pytest
+
+from submanager_aggregates import check_spend_aggregates
+from submanager_db import ID_CHUNK_SIZE, delete_subscriptions, update_subscriptions
+from submanager_search import has_search_index, search_subscription_ids
+
+COUNT = 2 * ID_CHUNK_SIZE + 100
+
+
+@pytest.fixture
+def ids(database, add_subscriptions):
+    rng = random.Random(19)
+    ids = add_subscriptions([(f"Sub {i}", f"£{rng.randrange(1, 50)}.00", rng.choice(["Netflix", "Spotify"]), "Home",
+                              rng.choice(["Monthly", "Yearly"]), "2026-02-01") for i in range(COUNT)])
+    database.writer.executemany(
+        "INSERT INTO Alert (subscriptionid, alert_date, alert_type, alert_message, fired) "
+        "VALUES (?, '2026-01-25', 'Renewal', '', 0)",
+        [(subscription_id,) for subscription_id in ids[::2]]
+    )
+    database.writer.commit()
+    return ids
+
+
+def rows(connection):
+    return connection.execute(
+        "SELECT subscriptionid, subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate"
+        " FROM Subscription ORDER BY subscriptionid"
+    ).fetchall()
+
+
+def test_delete_removes_the_subscriptions_and_their_alerts(database, userid, ids):
+    writer = database.writer
+    rng = random.Random(1)
+    deleted = rng.sample(ids, ID_CHUNK_SIZE + 250)
+    expected_alerts = {row[0] for row in writer.execute(
+        f"SELECT alertid FROM Alert WHERE subscriptionid IN ({', '.join(map(str, deleted))})")}
+    kept = [row for row in rows(writer) if row[0] not in set(deleted)]
+
+    alert_ids = delete_subscriptions(writer, deleted)
+    writer.commit()
+
+    assert set(alert_ids) == expected_alerts and len(alert_ids) == len(expected_alerts)
+    assert rows(writer) == kept
+    assert writer.execute(
+        "SELECT COUNT(*) FROM Alert WHERE subscriptionid NOT IN (SELECT subscriptionid FROM Subscription)"
+    ).fetchone()[0] == 0
+    assert writer.execute("SELECT COUNT(*) FROM Alert").fetchone()[0] == len(ids[::2]) - len(expected_alerts)
+    assert check_spend_aggregates(writer) == {}
+    if has_search_index(writer):
+        found = search_subscription_ids(writer, "sub", userid=userid, limit=COUNT)
+        assert not set(found) & set(deleted)
+
+
+def test_delete_stays_in_the_callers_transaction(database, ids):
+    writer = database.writer
+    before = rows(writer)
+
+    delete_subscriptions(writer, ids)
+    writer.rollback()
+
+    assert rows(writer) == before
+    assert delete_subscriptions(writer, []) == []
+
+
+def test_update_sets_only_the_given_columns_on_the_selected_rows(database, ids):
+    writer = database.writer
+    selected = set(random.Random(2).sample(ids, ID_CHUNK_SIZE + 300))
+    brand = database.brands.get(writer, "Disney")
+    before = rows(writer)
+
+    update_subscriptions(writer, selected, {"cost": "£9.99", "brandid": brand})
+    writer.commit()
+
+    expected = [
+        (row[0], row[1], "£9.99", brand, *row[4:]) if row[0] in selected else row
+        for row in before
+    ]
+    assert rows(writer) == expected
+    assert check_spend_aggregates(writer) == {}
+
+
+def test_update_of_every_bulk_column(database, ids):
+    writer = database.writer
+    folder = database.folders.get(writer, "Work")
+    brand = database.brands.get(writer, "Disney")
+
+    update_subscriptions(writer, ids[:10], {"cost": "£1.00", "brandid": brand, "folderid": folder,
+                                            "billingCycle": "Weekly"})
+    writer.commit()
+
+    assert set(writer.execute(
+        f"SELECT cost, brandid, folderid, billingCycle FROM Subscription WHERE subscriptionid IN "
+        f"({', '.join(map(str, ids[:10]))})"
+    )) == {("£1.00", brand, folder, "Weekly")}
+    assert check_spend_aggregates(writer) == {}
+
+
+def test_update_refuses_other_columns(database, ids):
+    writer = database.writer
+    before = rows(writer)
+
+    with pytest.raises(ValueError):
+        update_subscriptions(writer, ids, {"cost": "£1.00", "userid": 99})
+
+    assert rows(writer) == before
@@ -0,0 +1,124 @@
+"""The insights chart must not grow with each year switch.
+
+Drives ExpenseInsightsFrame.update_visualization -> project_chart_totals ->
+draw_chart against a real columns snapshot, rendering every switch on an Agg
+canvas so no display is needed.  The frame's Tk widgets are replaced by the
+few attributes those methods use.
+
+The heap is measured in allocated blocks (``sys.getallocatedblocks``):
+tracemalloc makes each render several times slower, too slow for a thousand
+of them.
+"""
+import gc
+import os
+import random
+import sys
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+pytest.importorskip("mplcursors")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import SubManager_Combined as app  # noqa: E402
+from submanager_columns import SubscriptionColumns  # noqa: E402
+from submanager_db import Database, bulk_insert_subscriptions  # noqa: E402
+
+SWITCHES = 1000
+# Well under one leaked object per switch; the count varies by about 100 between runs
+MAX_GROWTH_BLOCKS = 500
+CYCLES = ["Monthly", "Yearly", "Weekly", "Every 3 months", "Every 2 weeks"]
+
+
+class Variable:
+    """Stand-in for the year Combobox's StringVar"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class ImmediateQueries:
+    """QueryRunner that runs each request on the calling thread"""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        on_done(func(self.reader, *args))
+
+
+@pytest.fixture
+def frame(tmp_path):
+    database = Database(str(tmp_path / "chart.db"))
+    writer = database.writer
+    userid = writer.execute("INSERT INTO User (username, password) VALUES ('chart', 'chart')").lastrowid
+    writer.execute("INSERT INTO Brand (brandName) VALUES ('Brand')")
+    writer.execute("INSERT INTO Folder (folderName) VALUES ('Folder')")
+    rng = random.Random(11)
+    today = date.today()
+    bulk_insert_subscriptions(writer, [
+        (f"Sub {i}", f"£{rng.uniform(1, 100):.2f}", 1, 1, rng.choice(CYCLES),
+         (today + timedelta(days=rng.randrange(0, 900))).isoformat())
+        for i in range(500)
+    ], userid)
+    writer.commit()
+
+    app.load_chart_libraries()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    reader = database.reader()
+    columns = SubscriptionColumns.load(reader, userid)
+    chart = app.ExpenseChart(app.Figure(figsize=(20, 9), dpi=30))
+    canvas = FigureCanvasAgg(chart.fig)
+    # Every switch is rendered, not just queued
+    canvas.draw_idle = canvas.draw
+
+    frame = SimpleNamespace(
+        year_var=Variable("All Years"), chart=chart, canvas=canvas, queries=ImmediateQueries(reader),
+        master=SimpleNamespace(with_columns=lambda callback: callback(columns)),
+    )
+    for name in ("get_available_years", "projection_window", "update_visualization", "draw_chart"):
+        setattr(frame, name, getattr(app.ExpenseInsightsFrame, name).__get__(frame))
+    frame.available_years = frame.get_available_years(*columns.billing_range())
+
+    yield frame
+    database.close()
+
+
+def test_year_switches_keep_memory_and_artists_flat(frame):
+    periods = ["All Years"] + sorted(frame.available_years)
+    assert len(periods) > 2
+
+    def switch(i):
+        frame.year_var.set(periods[i % len(periods)])
+        frame.update_visualization()
+
+    def artists():
+        return len(frame.chart.fig.findobj())
+
+    # The first switches settle matplotlib's glyph and transform caches; the
+    # measured ones are whole rounds of periods, ending where the first ones did
+    measured = SWITCHES // 2 // len(periods) * len(periods)
+    for i in range(SWITCHES - measured):
+        switch(i)
+    gc.collect()
+    artists_before = artists()
+    blocks_before = sys.getallocatedblocks()
+
+    for i in range(SWITCHES - measured, SWITCHES):
+        switch(i)
+    gc.collect()
+
+    assert artists() == artists_before, f"the figure went from {artists_before} to {artists()} artists"
+    growth = sys.getallocatedblocks() - blocks_before
+    assert growth < MAX_GROWTH_BLOCKS, f"heap grew by {growth} blocks over {measured} switches"
@@ -0,0 +1,160 @@
+"""SubscriptionColumns: a refreshed snapshot equals a fresh load, and its totals match SQL's"""
+import random
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from submanager_columns import NO_BILLING_DAY, SubscriptionColumns  # noqa: E402
+from submanager_io import spend_batches  # noqa: E402
+from submanager_projection import month_number  # noqa: E402
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Every 3 months", "Every 2 weeks"]
+
+
+def decoded(columns):
+    """Row tuples of a snapshot with cycles as text, since codes depend on the order cycles were seen"""
+    cycles = [columns.cycles[code] for code in columns.cycle_codes]
+    return list(zip(columns.ids.tolist(), columns.cost_pence.tolist(), columns.billing_days.tolist(), cycles,
+                    columns.brand_ids.tolist(), columns.folder_ids.tolist()))
+
+
+@pytest.fixture
+def catalog(database, userid, add_subscriptions):
+    rng = random.Random(25)
+    add_subscriptions([
+        (f"Sub {i}", f"£{rng.randrange(100, 9999) / 100:.2f}", rng.choice(["Netflix", "Spotify", "Gym"]),
+         rng.choice(["Home", "Work"]), rng.choice(CYCLES), f"2026-{rng.randrange(1, 13):02}-{rng.randrange(1, 29):02}")
+        for i in range(400)
+    ])
+    bob = database.writer.execute("INSERT INTO User (username, password) VALUES ('bob', '')").lastrowid
+    add_subscriptions([(f"Bob {i}", "£1.00", "Netflix", "Home", "Monthly", "2026-05-01") for i in range(50)],
+                      owner=bob)
+    return bob
+
+
+def test_load_reads_the_users_rows_in_id_order(database, userid, catalog):
+    columns = SubscriptionColumns.load(database.reader(), userid)
+
+    expected = database.writer.execute("""
+        SELECT subscriptionid, CAST(ROUND(CAST(REPLACE(cost, '£', '') AS REAL) * 100) AS INTEGER),
+               CAST(julianday(nextBillingDate) - 2440587.5 AS INTEGER), billingCycle, brandid, folderid
+        FROM Subscription WHERE userid = ? ORDER BY subscriptionid
+    """, (userid,)).fetchall()
+    assert decoded(columns) == expected
+    assert len(columns) == 400
+
+
+def test_refreshed_snapshot_equals_a_fresh_load(database, userid, catalog, add_subscriptions):
+    rng = random.Random(3)
+    writer = database.writer
+    reader = database.reader()
+    columns = SubscriptionColumns.load(reader, userid)
+
+    for _ in range(30):
+        ids = [row[0] for row in writer.execute("SELECT subscriptionid FROM Subscription WHERE userid = ?",
+                                                (userid,))]
+        changed, deleted = [], []
+        for _ in range(rng.randrange(1, 10)):
+            action = rng.random()
+            subscription_id = rng.choice(ids)
+            if action < 0.3:
+                changed += add_subscriptions([("New", "£3.50", "Disney", "Home", rng.choice(CYCLES + ["Every 5 days"]),
+                                               "2026-07-01")])
+            elif action < 0.6:
+                column, value = rng.choice([("cost", f"£{rng.randrange(1, 99)}.00"), ("billingCycle", "Every 4 weeks"),
+                                            ("nextBillingDate", None), ("nextBillingDate", "2027-01-31"),
+                                            ("folderid", 1), ("brandid", 2)])
+                writer.execute(f"UPDATE Subscription SET {column} = ? WHERE subscriptionid = ?",
+                               (value, subscription_id))
+                changed.append(subscription_id)
+            elif action < 0.7:
+                # Handed to another account: it leaves this user's snapshot
+                writer.execute("UPDATE Subscription SET userid = ? WHERE subscriptionid = ?",
+                               (catalog, subscription_id))
+                changed.append(subscription_id)
+            else:
+                writer.execute("DELETE FROM Subscription WHERE subscriptionid = ?", (subscription_id,))
+                deleted.append(subscription_id)
+        writer.commit()
+
+        before = decoded(columns)
+        refreshed = columns.refreshed(reader, changed, deleted)
+
+        assert decoded(refreshed) == decoded(SubscriptionColumns.load(reader, userid))
+        # The old snapshot is left as it was, for whoever is still reading it
+        assert decoded(columns) == before
+        columns = refreshed
+
+    assert columns.refreshed(reader) is columns
+
+
+def test_totals_match_the_spend_aggregates(database, userid, catalog):
+    columns = SubscriptionColumns.load(database.reader(), userid)
+
+    def table(name, key):
+        return sorted(database.writer.execute(
+            f"SELECT {key}, subscriptions, total_pence FROM {name} WHERE userid = ?", (userid,)))
+
+    def zipped(keys, counts, pence):
+        return sorted(zip(list(keys), counts.tolist(), pence.tolist()))
+
+    assert zipped(*columns.folder_totals()) == table("FolderSpend", "folderid")
+    assert zipped(*columns.brand_totals()) == table("BrandSpend", "brandid")
+    assert zipped(*columns.cycle_totals()) == sorted(database.writer.execute(
+        "SELECT billingCycle, SUM(subscriptions), SUM(total_pence) FROM CycleSpend WHERE userid = ?"
+        " GROUP BY billingCycle", (userid,)))
+
+
+def test_filters_and_month_totals(database, userid, catalog):
+    columns = SubscriptionColumns.load(database.reader(), userid)
+    home = database.writer.execute("SELECT folderid FROM Folder WHERE folderName = 'Home'").fetchone()[0]
+
+    mask = columns.select(folderid=home, billing_cycle="Monthly")
+    months, counts, pence = columns.month_totals(mask)
+
+    expected = database.writer.execute("""
+        SELECT strftime('%Y-%m', nextBillingDate), COUNT(*),
+               SUM(CAST(ROUND(CAST(REPLACE(cost, '£', '') AS REAL) * 100) AS INTEGER))
+        FROM Subscription WHERE userid = ? AND folderid = ? AND billingCycle = 'Monthly'
+        GROUP BY 1 ORDER BY 1
+    """, (userid, home)).fetchall()
+    assert [(str(np.datetime64(int(month), "M")), count, total)
+            for month, count, total in zip(months, counts.tolist(), pence.tolist())] == expected
+    assert not columns.select(billing_cycle="Fortnightly").any()
+
+
+def test_projection_matches_the_aggregate_projection(database, userid, catalog):
+    columns = SubscriptionColumns.load(database.reader(), userid)
+    first_month = month_number(date(2026, 1, 1))
+
+    (expected,) = spend_batches(database.reader(), [], [], userid, months=24, first_month=first_month)
+
+    assert np.round(columns.projected_totals(first_month, 24), 2).tolist() == pytest.approx(
+        [total for _, total in expected])
+
+
+def test_rows_without_a_date_are_left_out_of_date_totals(database, userid, catalog):
+    database.writer.execute("UPDATE Subscription SET nextBillingDate = NULL WHERE userid = ?", (userid,))
+    database.writer.commit()
+    columns = SubscriptionColumns.load(database.reader(), userid)
+
+    assert (columns.billing_days == NO_BILLING_DAY).all()
+    assert columns.billing_range() == (None, None)
+    assert len(columns.month_totals()[0]) == 0
+    assert len(columns.folder_totals()[0]) == 2
+
+
+def test_cost_order(database, userid, catalog):
+    columns = SubscriptionColumns.load(database.reader(), userid)
+    ids = columns.ids.tolist()[::3] + [10 ** 9]
+
+    order = columns.cost_order(ids, descending=True)
+
+    costs = dict(database.writer.execute(
+        "SELECT subscriptionid, CAST(ROUND(CAST(REPLACE(cost, '£', '') AS REAL) * 100) AS INTEGER)"
+        " FROM Subscription"))
+    ordered = [ids[i] for i in order]
+    assert ordered[-1] == 10 ** 9
+    assert ordered[:-1] == sorted(ids[:-1], key=lambda i: (-costs[i], i))
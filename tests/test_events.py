@@ -0,0 +1,122 @@
+"""EventBus, Coalescer and net_changes: a page applying coalesced events ends up matching the database"""
+import random
+
+from submanager_events import (
+    ALERT_EVENTS, SUBSCRIPTION_EVENTS, AlertsCreated, Coalescer, EventBus, SubscriptionsAdded, SubscriptionsDeleted,
+    SubscriptionsUpdated, net_changes
+)
+
+
+class Idle:
+    """Stand-in for after_idle: callbacks run when the test says the UI is idle"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def __call__(self, callback):
+        self.callbacks.append(callback)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def test_latest_event_wins():
+    events = [
+        SubscriptionsAdded((1, 2, 3)),
+        SubscriptionsUpdated((2,)),
+        SubscriptionsDeleted((2, 3)),
+        SubscriptionsAdded((3,)),
+        SubscriptionsDeleted((4,)),
+    ]
+    assert net_changes(events, SubscriptionsDeleted) == ({1, 3}, {2, 4})
+    assert net_changes([], SubscriptionsDeleted) == (set(), set())
+
+
+def test_bus_delivers_by_type_and_skips_empty_events():
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.append, *SUBSCRIPTION_EVENTS)
+    alerts = []
+    bus.subscribe(alerts.append, *ALERT_EVENTS)
+
+    bus.publish(SubscriptionsAdded((1,)))
+    bus.publish(SubscriptionsUpdated(()))
+    bus.publish(AlertsCreated((7,)))
+    bus.unsubscribe(received.append, *SUBSCRIPTION_EVENTS)
+    bus.publish(SubscriptionsDeleted((1,)))
+
+    assert received == [SubscriptionsAdded((1,))]
+    assert alerts == [AlertsCreated((7,))]
+
+
+def test_a_burst_is_delivered_once_at_the_next_idle():
+    idle = Idle()
+    batches = []
+    coalescer = Coalescer(idle, batches.append)
+
+    for i in range(5):
+        coalescer(SubscriptionsUpdated((i,)))
+    assert len(idle.callbacks) == 1
+    assert batches == []
+
+    idle.run()
+    assert batches == [[SubscriptionsUpdated((i,)) for i in range(5)]]
+
+    coalescer(SubscriptionsDeleted((9,)))
+    idle.run()
+    assert batches[-1] == [SubscriptionsDeleted((9,))]
+    idle.run()
+    assert len(batches) == 2
+
+
+def test_page_applying_net_changes_matches_the_database(database, userid, add_subscriptions):
+    rng = random.Random(13)
+    writer = database.writer
+    bus = EventBus()
+    idle = Idle()
+
+    def read(ids):
+        return {row[0]: row[1:] for row in writer.execute(
+            f"SELECT subscriptionid, subscriptionName, cost FROM Subscription"
+            f" WHERE subscriptionid IN ({', '.join(map(str, ids))})"
+        )}
+
+    # A page's copy of the list, updated only from the coalesced events
+    page = {}
+    reads = []
+
+    def apply(events):
+        changed, deleted = net_changes(events, SubscriptionsDeleted)
+        reads.append(len(changed))
+        for subscription_id in deleted:
+            page.pop(subscription_id, None)
+        page.update(read(changed))
+    bus.subscribe(Coalescer(idle, apply), *SUBSCRIPTION_EVENTS)
+
+    for _ in range(50):
+        # A burst of writes between two idles
+        for _ in range(rng.randrange(1, 8)):
+            ids = [row[0] for row in writer.execute("SELECT subscriptionid FROM Subscription WHERE userid = ?",
+                                                    (userid,))]
+            action = rng.random()
+            if action < 0.4 or not ids:
+                added = add_subscriptions([(f"Sub {rng.randrange(100)}", "£1.00", "Brand", "Folder", "Monthly",
+                                            "2026-01-01") for _ in range(rng.randrange(1, 4))])
+                bus.publish(SubscriptionsAdded(tuple(added)))
+            elif action < 0.75:
+                updated = rng.sample(ids, min(len(ids), 3))
+                writer.executemany("UPDATE Subscription SET cost = ? WHERE subscriptionid = ?",
+                                   [(f"£{rng.randrange(1, 99)}.00", i) for i in updated])
+                bus.publish(SubscriptionsUpdated(tuple(updated)))
+            else:
+                deleted = rng.sample(ids, min(len(ids), 2))
+                writer.executemany("DELETE FROM Subscription WHERE subscriptionid = ?", [(i,) for i in deleted])
+                bus.publish(SubscriptionsDeleted(tuple(deleted)))
+        idle.run()
+
+        assert page == read([row[0] for row in writer.execute("SELECT subscriptionid FROM Subscription")])
+
+    # Each burst cost the page one update
+    assert len(reads) == 50
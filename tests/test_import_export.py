@@ -0,0 +1,239 @@
+"""Streaming imports and exports of subscriptions, round-tripped through throwaway databases"""
+import csv
+import json
+from datetime import date
+
+import pytest
+
+from submanager_aggregates import check_spend_aggregates
+from submanager_db import Database
+from submanager_io import export_data, filter_conditions, import_subscriptions, read_records, spend_batches
+from submanager_search import has_search_index, search_subscription_ids
+
+TODAY = date(2026, 1, 1)
+
+CSV = """\
+Subscription Name,Cost,Brand,Folder,Billing Cycle,Next Billing Date
+Netflix,£15.99,Netflix,Streaming,Monthly,01/02/2026
+Spotify,17.99,Spotify,Music,monthly,2026-03-15
+Broken,abc,Brand,Folder,Monthly,01/02/2026
+Gym,30,PureGym,Health,every 3 months,10/01/2026
+Past,1.00,Brand,Folder,Monthly,01/01/2020
+,1.00,Brand,Folder,Monthly,01/02/2026
+Disney+,7.99,Disney,Streaming,Yearly,01/06/2026
+"""
+
+
+def stored(connection, userid):
+    """(name, cost, brand, folder, cycle, ISO date) of the user's subscriptions, by name"""
+    return connection.execute("""
+        SELECT s.subscriptionName, s.cost, b.brandName, f.folderName, s.billingCycle, s.nextBillingDate
+        FROM Subscription s
+        INNER JOIN Brand b ON s.brandid = b.brandid
+        INNER JOIN Folder f ON s.folderid = f.folderid
+        WHERE s.userid = ?
+        ORDER BY s.subscriptionName, s.subscriptionid
+    """, (userid,)).fetchall()
+
+
+def load(database, userid, path, **options):
+    return import_subscriptions(database.writer, read_records(str(path)), today=TODAY, userid=userid, **options)
+
+
+def test_csv_import_keeps_valid_rows_and_reports_the_rest(database, userid, tmp_path):
+    path = tmp_path / "subscriptions.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    result = load(database, userid, path)
+
+    assert result.rows == 7
+    assert result.failure is None
+    assert [row for row, _ in result.errors] == [4, 6, 7]
+    assert stored(database.writer, userid) == [
+        ("Disney+", "£7.99", "Disney", "Streaming", "Yearly", "2026-06-01"),
+        ("Gym", "£30.00", "PureGym", "Health", "Every 3 months", "2026-01-10"),
+        ("Netflix", "£15.99", "Netflix", "Streaming", "Monthly", "2026-02-01"),
+        ("Spotify", "£17.99", "Spotify", "Music", "Monthly", "2026-03-15"),
+    ]
+    assert sorted(result.imported) == [row[0] for row in database.writer.execute(
+        "SELECT subscriptionid FROM Subscription ORDER BY subscriptionid")]
+
+
+def test_imported_rows_reach_the_aggregates_and_search(database, userid, tmp_path):
+    path = tmp_path / "subscriptions.csv"
+    path.write_text(CSV, encoding="utf-8")
+    load(database, userid, path)
+
+    assert check_spend_aggregates(database.writer) == {}
+    assert database.writer.execute("SELECT COUNT(*) FROM BulkLoad").fetchone()[0] == 0
+    (netflix,) = database.writer.execute("SELECT subscriptionid FROM Subscription WHERE subscriptionName = 'Netflix'"
+                                         ).fetchone()
+    if has_search_index(database.writer):
+        assert search_subscription_ids(database.reader(), "netflix", userid=userid)[0] == netflix
+
+
+def test_existing_brands_and_folders_are_reused(database, userid, add_subscriptions, tmp_path):
+    add_subscriptions([("Old", "£1.00", "Netflix", "Streaming", "Monthly", "2026-05-01")])
+    path = tmp_path / "subscriptions.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    load(database, userid, path)
+
+    assert database.writer.execute("SELECT COUNT(*) FROM Brand WHERE brandName = 'Netflix'").fetchone()[0] == 1
+    assert database.writer.execute("SELECT COUNT(*) FROM Folder WHERE folderName = 'Streaming'").fetchone()[0] == 1
+
+
+def test_chunks_are_committed_and_reported_as_they_go(database, userid, tmp_path):
+    path = tmp_path / "subscriptions.jsonl"
+    path.write_text("\n".join(
+        json.dumps({"name": f"Sub {i}", "cost": "£2.00", "brand": f"Brand {i % 7}", "folder": "Folder",
+                    "cycle": "Weekly", "billing_date": "2026-02-01"})
+        for i in range(250)
+    ), encoding="utf-8")
+    seen = []
+
+    result = load(database, userid, path, chunk_size=100, progress=lambda result: seen.append(len(result.imported)))
+
+    assert seen == [100, 200, 250]
+    assert len(result.imported) == 250
+    assert len(stored(database.writer, userid)) == 250
+    assert not database.writer.in_transaction
+
+
+def test_json_lines_report_bad_lines(database, userid, tmp_path):
+    path = tmp_path / "subscriptions.jsonl"
+    path.write_text('{"name": "A", "cost": 1, "brand": "B", "folder": "F", "cycle": "Monthly", '
+                    '"billing_date": "01/02/2026"}\n'
+                    '\n'
+                    '{"name": "B", "cost": 1,\n'
+                    '["not", "an", "object"]\n', encoding="utf-8")
+
+    result = load(database, userid, path)
+
+    assert len(result.imported) == 1
+    assert [row for row, _ in result.errors] == [3, 4]
+
+
+def test_a_broken_json_array_stops_the_load_keeping_committed_chunks(database, userid, tmp_path):
+    items = [{"Subscription Name": f"Sub {i}", "Cost": "1.50", "Brand": "Brand", "Folder": "Folder",
+              "Billing Cycle": "Monthly", "Next Billing Date": "01/02/2026"} for i in range(25)]
+    path = tmp_path / "subscriptions.json"
+    path.write_text(json.dumps(items)[:-1], encoding="utf-8")
+
+    result = load(database, userid, path, chunk_size=10)
+
+    # The last, partial chunk was still waiting when the file ran out
+    assert result.failure
+    assert len(result.imported) == 20
+    assert len(stored(database.writer, userid)) == len(result.imported)
+
+
+def test_imports_need_an_account(database):
+    with pytest.raises(ValueError):
+        import_subscriptions(database.writer, [], userid=None)
+
+
+@pytest.fixture
+def catalog(database, userid, add_subscriptions):
+    """alice's subscriptions (with alerts) next to bob's; returns bob's userid"""
+    ids = add_subscriptions([
+        ("Netflix", "£15.99", "Netflix", "Streaming", "Monthly", "2026-02-01"),
+        ("Disney+, \"Premier\"", "£7.99", "Disney", "Streaming", "Yearly", "2026-06-01"),
+        ("Spotify", "£17.99", "Spotify", "Music", "Monthly", "2026-03-15"),
+        ("Gym", "£1030.00", "PureGym", "Health", "Every 3 months", "2026-01-10"),
+    ])
+    database.writer.executemany(
+        "INSERT INTO Alert (subscriptionid, alert_date, alert_type, alert_message, fired) VALUES (?, ?, ?, ?, 0)",
+        [(subscription_id, "2026-01-05", "Renewal", f"Renews {subscription_id}") for subscription_id in ids]
+    )
+    bob = database.writer.execute("INSERT INTO User (username, password) VALUES ('bob', '')").lastrowid
+    add_subscriptions([("Netflix", "£4.99", "Netflix", "Streaming", "Monthly", "2026-02-01")], owner=bob)
+    database.writer.commit()
+    return bob
+
+
+def reimport(tmp_path, path):
+    """Import an export into a fresh database; returns what its account ended up with"""
+    target = Database(str(tmp_path / "target.db"))
+    try:
+        userid = target.writer.execute("INSERT INTO User (username, password) VALUES ('carol', '')").lastrowid
+        result = import_subscriptions(target.writer, read_records(str(path)), today=TODAY, userid=userid)
+        assert result.errors == [] and result.failure is None
+        return stored(target.writer, userid)
+    finally:
+        target.close()
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_exports_import_back_unchanged(database, userid, catalog, tmp_path, extension):
+    path = tmp_path / f"export.{extension}"
+    written = export_data(database.reader(), str(path), userid=userid)
+
+    assert written == 4
+    assert reimport(tmp_path, path) == stored(database.writer, userid)
+    assert not (tmp_path / f"export.{extension}.part").exists()
+
+
+def test_filtered_export_holds_only_the_matching_rows(database, userid, catalog, tmp_path):
+    path = tmp_path / "export.csv"
+    export_data(database.reader(), str(path), folder="Streaming", billing_cycle="Monthly", userid=userid)
+
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["subscriptionName"], row["cost"]) for row in rows] == [("Netflix", "£15.99")]
+
+
+def test_alert_export(database, userid, catalog, tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    export_data(database.reader(), str(path), dataset="alerts", userid=userid)
+
+    with open(path, encoding="utf-8") as file:
+        alerts = [json.loads(line) for line in file]
+    assert len(alerts) == 4
+    assert {alert["subscriptionName"] for alert in alerts} == {row[0] for row in stored(database.writer, userid)}
+    assert all(alert["alert_message"] == f"Renews {alert['subscriptionid']}" for alert in alerts)
+
+
+def test_sqlite_snapshot_is_a_working_database_for_the_account(database, userid, catalog, tmp_path):
+    path = tmp_path / "snapshot.db"
+    export_data(database.reader(), str(path), folder="Streaming", userid=userid)
+
+    snapshot = Database(str(path))
+    try:
+        connection = snapshot.writer
+        assert connection.execute("SELECT userid, username, password FROM User").fetchall() == [
+            (userid, "alice", "secret")]
+        assert stored(connection, userid) == [row for row in stored(database.writer, userid) if row[3] == "Streaming"]
+        assert connection.execute("SELECT COUNT(*) FROM Alert").fetchone()[0] == 2
+        assert check_spend_aggregates(connection) == {}
+        if has_search_index(connection):
+            assert len(search_subscription_ids(connection, "premier", userid=userid)) == 1
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_needs_an_account(database, tmp_path):
+    with pytest.raises(ValueError):
+        export_data(database.reader(), str(tmp_path / "snapshot.db"))
+    assert not (tmp_path / "snapshot.db").exists()
+
+
+def test_filtered_spend_adds_up_to_the_aggregate_projection(database, userid, catalog):
+    pytest.importorskip("numpy")
+    from submanager_projection import month_number
+
+    first_month = month_number(TODAY)
+    reader = database.reader()
+    (totals,) = spend_batches(reader, [], [], userid, months=12, first_month=first_month)
+
+    by_folder = [0.0] * 12
+    for folder in ("Streaming", "Music", "Health"):
+        conditions, params = filter_conditions(folder=folder)
+        (rows,) = spend_batches(reader, conditions, params, userid, months=12, first_month=first_month)
+        by_folder = [running + total for running, (_, total) in zip(by_folder, rows)]
+
+    assert [month for month, _ in totals] == [f"2026-{month:02}" for month in range(1, 13)]
+    assert [total for _, total in totals] == pytest.approx(by_folder)
+    # January: the gym's first charge; Netflix from February, Spotify from March, Disney+ in June
+    assert totals[0][1] == pytest.approx(1030.00)
+    assert totals[5][1] == pytest.approx(15.99 + 17.99 + 7.99)
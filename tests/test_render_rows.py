@@ -0,0 +1,169 @@
+"""ViewSubscriptionsFrame.render_rows: the Treeview ends up matching the rows, with as few Tk calls as it takes.
+
+The frame's methods run against a stand-in Treeview that records its calls,
+fed from the subscription list's own queries on a throwaway database.
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import SubManager_Combined as app
+
+CYCLES = ["Monthly", "Yearly", "Weekly"]
+
+
+class ImmediateQueries:
+    """QueryRunner that runs each request on the calling thread"""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        on_done(func(self.reader, *args))
+
+    def is_pending(self, key):
+        return False
+
+
+@pytest.fixture
+def view(database, userid, tree, monkeypatch):
+    # apply_subscription_changes reads written rows through the module's cursor
+    monkeypatch.setattr(app, "cursor", database.writer.cursor(), raising=False)
+    view = SimpleNamespace(
+        tree=tree, rendered_rows={}, rendered_order=[], userid=userid, large_catalog=False,
+        queries=ImmediateQueries(database.reader()), sorted_index=app.SortedSubscriptionIndex(),
+        virtual_list=SimpleNamespace(deactivate=lambda: None),
+    )
+    for name in ("longest_increasing_run", "render_rows", "refresh_treeview", "show_catalog",
+                 "apply_subscription_changes"):
+        setattr(view, name, getattr(app.ViewSubscriptionsFrame, name).__get__(view))
+    return view
+
+
+def listed(view):
+    """(iid, values) for every Treeview row, in order"""
+    return [(iid, view.tree.values[iid]) for iid in view.tree.order]
+
+
+def expected(database, userid):
+    rows = database.writer.execute(
+        app.SUBSCRIPTION_ROWS_SQL + " WHERE s.userid = ? ORDER BY s.subscriptionName COLLATE NOCASE, s.subscriptionid",
+        (userid,)
+    ).fetchall()
+    return [(str(row[0]), tuple(row[1:])) for row in rows]
+
+
+def test_first_render_inserts_every_row_in_name_order(view, database, userid, add_subscriptions):
+    add_subscriptions([(name, "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")
+                       for name in ["Netflix", "apple", "Spotify", "Disney+"]])
+    view.refresh_treeview()
+
+    assert listed(view) == expected(database, userid)
+    assert [values[0] for _, values in listed(view)] == ["apple", "Disney+", "Netflix", "Spotify"]
+    assert view.tree.calls == {"insert": 4}
+
+
+def test_unchanged_rows_make_no_tk_calls(view, add_subscriptions):
+    add_subscriptions([(f"Sub {i}", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01") for i in range(50)])
+    view.refresh_treeview()
+    view.tree.calls.clear()
+
+    view.refresh_treeview()
+
+    assert view.tree.calls == {}
+
+
+def test_edited_row_is_updated_in_place(view, database, userid, add_subscriptions):
+    ids = add_subscriptions([(f"Sub {i:02}", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")
+                             for i in range(20)])
+    view.refresh_treeview()
+    view.tree.calls.clear()
+
+    database.writer.execute("UPDATE Subscription SET cost = '£2.50' WHERE subscriptionid = ?", (ids[7],))
+    view.apply_subscription_changes(changed_ids=[ids[7]])
+
+    assert listed(view) == expected(database, userid)
+    assert view.tree.calls == {"item": 1}
+
+
+def test_renamed_row_is_the_only_one_moved(view, database, userid, add_subscriptions):
+    ids = add_subscriptions([(f"Sub {i:02}", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")
+                             for i in range(20)])
+    view.refresh_treeview()
+    view.tree.calls.clear()
+
+    database.writer.execute("UPDATE Subscription SET subscriptionName = 'Sub 99' WHERE subscriptionid = ?",
+                            (ids[0],))
+    view.apply_subscription_changes(changed_ids=[ids[0]])
+
+    assert listed(view) == expected(database, userid)
+    assert view.tree.order[-1] == str(ids[0])
+    assert view.tree.calls == {"item": 1, "move": 1}
+
+
+def test_deletes_go_in_one_call_and_additions_are_inserted_in_place(view, database, userid, add_subscriptions):
+    ids = add_subscriptions([(f"Sub {i:02}", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")
+                             for i in range(0, 20, 2)])
+    view.refresh_treeview()
+    view.tree.calls.clear()
+
+    database.writer.execute(f"DELETE FROM Subscription WHERE subscriptionid IN ({ids[1]}, {ids[4]}, {ids[8]})")
+    added = add_subscriptions([("Sub 05", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01"),
+                               ("Sub 11", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")])
+    view.apply_subscription_changes(changed_ids=added, deleted_ids=[ids[1], ids[4], ids[8]])
+
+    assert listed(view) == expected(database, userid)
+    assert view.tree.calls == {"delete": 1, "insert": 2}
+
+
+def test_reordered_rows_keep_their_longest_increasing_run(view):
+    rows = [(i, f"Sub {i:02}", "£1.00", "Brand", "Folder", "Monthly", "01/01/2026") for i in range(1, 11)]
+    view.render_rows(rows)
+    view.tree.calls.clear()
+
+    # Positions 3, 1, 2, 4..10 in the new order: all but row 3 are still increasing
+    reordered = [rows[2], rows[0], rows[1]] + rows[3:]
+    view.render_rows(reordered)
+
+    assert view.tree.order == [str(row[0]) for row in reordered]
+    assert view.tree.calls == {"move": 1}
+
+
+def test_longest_increasing_run():
+    run = app.ViewSubscriptionsFrame.longest_increasing_run(None, [3, 1, 4, 1, 5, 9, 2, 6])
+    positions = [[3, 1, 4, 1, 5, 9, 2, 6][i] for i in sorted(run)]
+    assert len(run) == 4
+    assert positions == sorted(positions)
+    assert app.ViewSubscriptionsFrame.longest_increasing_run(None, []) == set()
+
+
+def test_random_edits_always_leave_the_tree_matching_the_list(view, database, userid, add_subscriptions):
+    rng = random.Random(3)
+    names = ["Netflix", "Spotify", "iCloud", "Disney+", "Gym", "Xbox", "Adobe", "Zoom", "Notion", "Figma"]
+    add_subscriptions([(f"{rng.choice(names)} {i}", "£1.00", "Brand", "Folder", rng.choice(CYCLES), "2026-01-01")
+                       for i in range(60)])
+    view.refresh_treeview()
+
+    for _ in range(40):
+        ids = [row[0] for row in database.writer.execute("SELECT subscriptionid FROM Subscription")]
+        renamed = rng.sample(ids, 3)
+        deleted = rng.sample([i for i in ids if i not in renamed], 2)
+        for subscription_id in renamed:
+            database.writer.execute("UPDATE Subscription SET subscriptionName = ?, cost = ? WHERE subscriptionid = ?",
+                                    (f"{rng.choice(names)} {rng.randrange(100)}", f"£{rng.randrange(1, 50)}.00",
+                                     subscription_id))
+        database.writer.execute(f"DELETE FROM Subscription WHERE subscriptionid IN ({deleted[0]}, {deleted[1]})")
+        added = add_subscriptions([(f"{rng.choice(names)} {rng.randrange(100)}", "£1.00", "Brand", "Folder",
+                                    "Monthly", "2026-01-01") for _ in range(2)])
+
+        before = list(view.tree.order)
+        view.tree.calls.clear()
+        view.apply_subscription_changes(changed_ids=renamed + added, deleted_ids=deleted)
+
+        assert listed(view) == expected(database, userid)
+        # Rows that kept their relative order were left where they were
+        kept = [iid for iid in before if iid in view.rendered_rows]
+        positions = [view.tree.order.index(iid) for iid in kept]
+        longest = len(app.ViewSubscriptionsFrame.longest_increasing_run(None, positions))
+        assert view.tree.calls["move"] == len(kept) - longest
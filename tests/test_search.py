@@ -0,0 +1,98 @@
+"""search_subscription_ids: the substring and typo-tolerant passes over the FTS5 trigram index"""
+import pytest
+
+from submanager_db import drop_search_index
+from submanager_search import has_search_index, search_subscription_ids
+
+
+@pytest.fixture
+def catalog(database, userid, add_subscriptions):
+    if not has_search_index(database.writer):
+        pytest.skip("SQLite built without FTS5 trigram support")
+    ids = add_subscriptions([
+        ("Netflix Premium", "£15.99", "Netflix", "Streaming", "Monthly", "2026-01-01"),
+        ("Spotify Family", "£17.99", "Spotify", "Music", "Monthly", "2026-01-01"),
+        ("Gym", "£30.00", "PureGym", "Health", "Monthly", "2026-01-01"),
+        ("Cloud storage", "£2.99", "Apple", "Netflix fans", "Monthly", "2026-01-01"),
+        ("Disney+", "£7.99", "Disney", "Streaming", "Yearly", "2026-01-01"),
+    ])
+    return dict(zip(["netflix", "spotify", "gym", "cloud", "disney"], ids))
+
+
+def search(database, term, **options):
+    return search_subscription_ids(database.reader(), term, **options)
+
+
+def test_substring_matches_any_part_of_a_name_ignoring_case(database, userid, catalog):
+    assert search(database, "FAMIL", userid=userid) == [catalog["spotify"]]
+    assert search(database, "tflix pre", userid=userid)[0] == catalog["netflix"]
+
+
+def test_name_matches_rank_above_folder_matches(database, userid, catalog):
+    assert search(database, "netflix", userid=userid) == [catalog["netflix"], catalog["cloud"]]
+
+
+def test_brand_and_folder_names_are_searched(database, userid, catalog):
+    assert search(database, "puregym", userid=userid) == [catalog["gym"]]
+    assert set(search(database, "streaming", userid=userid)) == {catalog["netflix"], catalog["disney"]}
+
+
+def test_single_typos_are_found(database, userid, catalog):
+    # A missing, a substituted and an extra character
+    assert search(database, "spotfy", userid=userid) == [catalog["spotify"]]
+    assert search(database, "netflux", userid=userid)[0] == catalog["netflix"]
+    assert search(database, "disnay", userid=userid)[0] == catalog["disney"]
+    assert search(database, "spottify", userid=userid)[0] == catalog["spotify"]
+
+
+def test_short_terms_fall_back_to_prefix_search(database, userid, catalog):
+    assert search(database, "ne", userid=userid) is None
+    # Runs of whitespace count as one space, and the ends are trimmed
+    assert search(database, "  ne  ", userid=userid) is None
+    assert search(database, "flix  \t prem", userid=userid)[0] == catalog["netflix"]
+
+
+def test_query_syntax_in_the_term_is_matched_literally(database, userid, catalog):
+    assert search(database, 'flix" OR "gym', userid=userid) == []
+    assert search(database, "disney+", userid=userid) == [catalog["disney"]]
+
+
+def test_only_the_users_rows_are_searched(database, userid, catalog, add_subscriptions):
+    other = database.writer.execute("INSERT INTO User (username, password) VALUES ('bob', '')").lastrowid
+    (theirs,) = add_subscriptions([("Netflix Basic", "£4.99", "Netflix", "Streaming", "Monthly", "2026-01-01")],
+                                  owner=other)
+
+    assert theirs not in search(database, "netflix", userid=userid)
+    assert search(database, "netflix", userid=other) == [theirs]
+    assert theirs in search(database, "netflix")
+
+
+def test_common_terms_list_name_matches_first(database, userid, catalog, add_subscriptions):
+    add_subscriptions([(f"Plan {i}", "£1.00", "Brand", "Plans folder", "Monthly", "2026-01-01") for i in range(20)]
+                      + [(f"Other {i}", "£1.00", "Brand", "Plans folder", "Monthly", "2026-01-01") for i in range(20)])
+
+    ids = search(database, "plan", userid=userid, limit=30)
+
+    names = dict(database.writer.execute("SELECT subscriptionid, subscriptionName FROM Subscription"))
+    assert len(ids) == 30
+    assert all(names[i].startswith("Plan ") for i in ids[:20])
+
+
+def test_index_follows_edits(database, userid, catalog):
+    writer = database.writer
+    writer.execute("UPDATE Subscription SET subscriptionName = 'Crunchyroll' WHERE subscriptionid = ?",
+                   (catalog["gym"],))
+    writer.execute("UPDATE Brand SET brandName = 'Fitness First' WHERE brandName = 'PureGym'")
+    writer.execute("DELETE FROM Subscription WHERE subscriptionid = ?", (catalog["disney"],))
+    writer.commit()
+
+    assert search(database, "crunchy", userid=userid) == [catalog["gym"]]
+    assert search(database, "fitness", userid=userid) == [catalog["gym"]]
+    assert search(database, "disney", userid=userid) == []
+
+
+def test_database_without_the_index_falls_back(database, userid, catalog):
+    drop_search_index(database.writer)
+    database.writer.commit()
+
+    assert search(database, "netflix", userid=userid) is None
@@ -0,0 +1,83 @@
+"""SortedSubscriptionIndex keeps the order SQLite's NOCASE name index gives, through every edit."""
+import random
+
+import SubManager_Combined as app
+
+# NOCASE folds ASCII letters only, so "Ébène" sorts before "äpple" (str.lower would swap them)
+NAMES = ["netflix", "Netflix", "NETFLIX", "Spotify", "apple", "Apple", "Äpple", "äpple", "Ébène", "éclair", "Zoom",
+         "zoom", "_gym", "[box]", "Disney+", "disney", "iCloud", "ICLOUD"]
+
+
+def listed_rows(database, userid):
+    """The subscription list's rows in the database's own NOCASE order"""
+    return database.writer.execute(
+        app.SUBSCRIPTION_ROWS_SQL + " WHERE s.userid = ? ORDER BY s.subscriptionName COLLATE NOCASE, s.subscriptionid",
+        (userid,)
+    ).fetchall()
+
+
+def row(database, subscription_id):
+    return database.writer.execute(app.SUBSCRIPTION_ROWS_SQL + " WHERE s.subscriptionid = ?",
+                                   (subscription_id,)).fetchone()
+
+
+def test_rebuild_matches_the_nocase_index(database, userid, add_subscriptions):
+    rng = random.Random(5)
+    add_subscriptions([(rng.choice(NAMES), "£1.00", "Brand", "Folder", "Monthly", "2026-01-01") for _ in range(300)])
+    rows = listed_rows(database, userid)
+
+    shuffled = list(rows)
+    rng.shuffle(shuffled)
+    index = app.SortedSubscriptionIndex(shuffled)
+
+    assert index.rows == rows
+    assert len(index) == len(rows)
+    assert index[0] == rows[0]
+
+
+def test_adds_updates_and_removes_keep_the_order(database, userid, add_subscriptions):
+    rng = random.Random(9)
+    add_subscriptions([(rng.choice(NAMES), "£1.00", "Brand", "Folder", "Monthly", "2026-01-01") for _ in range(100)])
+    index = app.SortedSubscriptionIndex(listed_rows(database, userid))
+
+    for _ in range(200):
+        ids = [r[0] for r in index.rows]
+        action = rng.random()
+        if action < 0.4:
+            (new_id,) = add_subscriptions([(rng.choice(NAMES), "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")])
+            index.add(row(database, new_id))
+        elif action < 0.8:
+            subscription_id = rng.choice(ids)
+            database.writer.execute("UPDATE Subscription SET subscriptionName = ? WHERE subscriptionid = ?",
+                                    (rng.choice(NAMES), subscription_id))
+            index.update(row(database, subscription_id))
+        else:
+            subscription_id = rng.choice(ids)
+            database.writer.execute("DELETE FROM Subscription WHERE subscriptionid = ?", (subscription_id,))
+            index.remove(subscription_id)
+
+        assert index.rows == listed_rows(database, userid)
+
+
+def test_removing_an_unknown_id_does_nothing(database, userid, add_subscriptions):
+    add_subscriptions([("Netflix", "£1.00", "Brand", "Folder", "Monthly", "2026-01-01")])
+    index = app.SortedSubscriptionIndex(listed_rows(database, userid))
+
+    index.remove(12345)
+
+    assert index.rows == listed_rows(database, userid)
+
+
+def test_prefix_lookups_ignore_ascii_case(database, userid, add_subscriptions):
+    add_subscriptions([(name, "£1.00", "Brand", "Folder", "Monthly", "2026-01-01") for name in NAMES])
+    index = app.SortedSubscriptionIndex(listed_rows(database, userid))
+
+    matches = index.prefix_matches("NET")
+    assert sorted(r[1] for r in matches) == ["NETFLIX", "Netflix", "netflix"]
+    assert index.find_prefix("net") == index.rows.index(matches[0])
+
+    # Only ASCII letters are folded, as NOCASE does
+    assert [r[1] for r in index.prefix_matches("äp")] == ["äpple"]
+    assert [r[1] for r in index.prefix_matches("Äp")] == ["Äpple"]
+    assert index.find_prefix("nothing") == -1
+    assert index.prefix_matches("nothing") == []
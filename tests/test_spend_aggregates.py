@@ -0,0 +1,95 @@
+"""The trigger-maintained spend aggregates always agree with check_spend_aggregates' recount"""
+import random
+
+from submanager_aggregates import SPEND_AGGREGATES, check_spend_aggregates, rebuild_spend_aggregates
+
+CYCLES = ["Monthly", "Yearly", "Weekly", "Every 3 months"]
+COSTS = ["£9.99", "£1,234.50", "£0.01", "£100", "free", None]
+
+
+def random_subscription(rng):
+    return (f"Sub {rng.randrange(1000)}", rng.choice(COSTS), rng.choice(["Netflix", "Spotify", "Gym"]),
+            rng.choice(["Home", "Work"]), rng.choice(CYCLES), f"2026-{rng.randrange(1, 13):02}-01")
+
+
+def test_row_by_row_writes_keep_every_table_exact(database, userid, add_subscriptions):
+    rng = random.Random(12)
+    writer = database.writer
+    other = writer.execute("INSERT INTO User (username, password) VALUES ('bob', '')").lastrowid
+    brands = [database.brands.get(writer, name) for name in ("Netflix", "Spotify", "Gym")]
+    folders = [database.folders.get(writer, name) for name in ("Home", "Work")]
+
+    for step in range(300):
+        ids = [row[0] for row in writer.execute("SELECT subscriptionid FROM Subscription")]
+        action = rng.random()
+        if action < 0.4 or not ids:
+            writer.execute(
+                "INSERT INTO Subscription (subscriptionName, cost, brandid, folderid, billingCycle, nextBillingDate,"
+                " userid) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (f"Sub {step}", rng.choice(COSTS), rng.choice(brands), rng.choice(folders), rng.choice(CYCLES),
+                 rng.choice([f"2026-{rng.randrange(1, 13):02}-01", None]), rng.choice([userid, other]))
+            )
+        elif action < 0.8:
+            column, value = rng.choice([
+                ("cost", rng.choice(COSTS)),
+                ("billingCycle", rng.choice(CYCLES)),
+                ("nextBillingDate", f"2027-{rng.randrange(1, 13):02}-15"),
+                ("folderid", rng.choice(folders)),
+                ("brandid", rng.choice(brands)),
+                ("userid", rng.choice([userid, other])),
+                ("subscriptionName", "Renamed"),
+            ])
+            writer.execute(f"UPDATE Subscription SET {column} = ? WHERE subscriptionid = ?", (value, rng.choice(ids)))
+        else:
+            writer.execute("DELETE FROM Subscription WHERE subscriptionid = ?", (rng.choice(ids),))
+
+        if step % 10 == 0:
+            assert check_spend_aggregates(writer) == {}
+    writer.commit()
+    assert check_spend_aggregates(writer) == {}
+
+
+def test_bulk_loads_fold_their_rows_in_afterwards(database, userid, add_subscriptions):
+    rng = random.Random(4)
+    add_subscriptions([random_subscription(rng) for _ in range(50)])
+    add_subscriptions([random_subscription(rng) for _ in range(2000)])
+
+    assert check_spend_aggregates(database.writer) == {}
+    assert database.writer.execute("SELECT COUNT(*) FROM BulkLoad").fetchone()[0] == 0
+
+
+def test_costs_are_summed_in_whole_pence(database, userid, add_subscriptions):
+    add_subscriptions([
+        ("A", "£1,234.50", "Netflix", "Home", "Monthly", "2026-01-01"),
+        ("B", "£0.10", "Netflix", "Home", "Monthly", "2026-01-01"),
+        ("C", "£0.20", "Netflix", "Home", "Monthly", "2026-01-01"),
+        ("D", "free", "Netflix", "Home", "Monthly", "2026-01-01"),
+    ])
+
+    assert database.writer.execute(
+        "SELECT subscriptions, total_pence FROM FolderSpend WHERE userid = ?", (userid,)
+    ).fetchall() == [(4, 123480)]
+
+
+def test_emptied_rows_are_removed(database, userid, add_subscriptions):
+    ids = add_subscriptions([random_subscription(random.Random(1)) for _ in range(20)])
+    database.writer.execute(f"DELETE FROM Subscription WHERE subscriptionid IN ({', '.join(map(str, ids))})")
+
+    for table in SPEND_AGGREGATES:
+        assert database.writer.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+
+
+def test_check_reports_drift_and_rebuild_repairs_it(database, userid, add_subscriptions):
+    add_subscriptions([random_subscription(random.Random(2)) for _ in range(20)])
+    writer = database.writer
+    writer.execute("UPDATE BrandSpend SET total_pence = total_pence + 1")
+    writer.execute("DELETE FROM CycleSpend")
+
+    differences = check_spend_aggregates(writer)
+    assert set(differences) == {"BrandSpend", "CycleSpend"}
+    for key, stored, live in differences["BrandSpend"]:
+        assert stored == (live[0], live[1] + 1)
+    assert all(stored is None for key, stored, live in differences["CycleSpend"])
+
+    rebuild_spend_aggregates(writer)
+    assert check_spend_aggregates(writer) == {}
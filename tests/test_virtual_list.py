@@ -0,0 +1,140 @@
+"""VirtualSubscriptionList: paging a large list by keyset shows the same rows as one sorted query.
+
+Scrolls a stand-in Treeview and scrollbar through a throwaway database and
+compares every visible window with an OFFSET query over the whole list.
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import SubManager_Combined as app
+
+VISIBLE = 20
+
+
+class ImmediateQueries:
+    """QueryRunner that runs each request on the calling thread"""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        on_done(func(self.reader, *args))
+
+
+class Scrollbar:
+    def __init__(self):
+        self.position = None
+
+    def configure(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+@pytest.fixture
+def listing(database, userid, tree, add_subscriptions, monkeypatch):
+    # Repeated names (in mixed case) so ties are broken by subscriptionid
+    rng = random.Random(7)
+    names = ["netflix", "Netflix", "Spotify", "apple music", "Apple TV", "Zoom", "Xbox", "disney+", "Gym"]
+    add_subscriptions([(f"{rng.choice(names)} {rng.randrange(5)}", "£1.00", "Brand", rng.choice(["Home", "Work"]),
+                        "Monthly", "2026-01-01") for _ in range(500)])
+    # Someone else's rows must never appear
+    other = database.writer.execute("INSERT INTO User (username, password) VALUES ('bob', '')").lastrowid
+    add_subscriptions([(f"Netflix {i}", "£1.00", "Brand", "Home", "Monthly", "2026-01-01") for i in range(50)],
+                      owner=other)
+
+    monkeypatch.setattr(app, "cursor", database.writer.cursor(), raising=False)
+    view = SimpleNamespace(tree=tree, vscrollbar=Scrollbar(), userid=userid, rendered_rows={}, rendered_order=[],
+                           queries=ImmediateQueries(database.reader()))
+    for name in ("longest_increasing_run", "render_rows"):
+        setattr(view, name, getattr(app.ViewSubscriptionsFrame, name).__get__(view))
+    listing = app.VirtualSubscriptionList(view)
+    listing.visible_rows = VISIBLE
+
+    # Count the OFFSET queries, which only jumps should need
+    listing.offset_fetches = 0
+    fetch_at = listing.fetch_at
+
+    def counted_fetch_at(offset, limit):
+        listing.offset_fetches += 1
+        return fetch_at(offset, limit)
+    listing.fetch_at = counted_fetch_at
+    return listing
+
+
+def ordered_ids(database, userid, condition="", params=()):
+    return [str(row[0]) for row in database.writer.execute(
+        "SELECT s.subscriptionid FROM Subscription s WHERE s.userid = ?" + condition +
+        " ORDER BY s.subscriptionName COLLATE NOCASE, s.subscriptionid", (userid, *params)
+    )]
+
+
+def test_first_page_is_the_start_of_the_name_order(listing, database, userid):
+    listing.show()
+
+    expected = ordered_ids(database, userid)
+    assert listing.total == len(expected) == 500
+    assert listing.tree.order == expected[:VISIBLE]
+    assert listing.view.vscrollbar.position == (0, VISIBLE / 500)
+
+
+def test_scrolling_down_and_back_pages_by_keyset(listing, database, userid):
+    listing.show()
+    expected = ordered_ids(database, userid)
+
+    for top in range(1, len(expected) - VISIBLE + 1):
+        listing.on_scrollbar("scroll", "1", "units")
+        assert listing.tree.order == expected[top:top + VISIBLE]
+    # Past the end stays on the last page
+    listing.on_scrollbar("scroll", "1", "pages")
+    assert listing.tree.order == expected[-VISIBLE:]
+
+    for top in range(len(expected) - VISIBLE - 1, -1, -1):
+        listing.on_scrollbar("scroll", "-1", "units")
+        assert listing.tree.order == expected[top:top + VISIBLE]
+
+    # Only the first page was read by offset; the rest followed on from the rows held
+    assert listing.offset_fetches == 1
+
+
+def test_window_stays_bounded(listing):
+    listing.show()
+    for _ in range(30):
+        listing.on_scrollbar("scroll", "1", "pages")
+        assert len(listing.window) <= VISIBLE + 2 * app.VIRTUAL_LIST_BUFFER
+        assert len(listing.tree.order) == VISIBLE
+
+
+def test_dragging_the_scrollbar_jumps_by_offset(listing, database, userid):
+    listing.show()
+    expected = ordered_ids(database, userid)
+
+    listing.on_scrollbar("moveto", "0.5")
+    assert listing.tree.order == expected[250:250 + VISIBLE]
+    listing.on_scrollbar("moveto", "1.0")
+    assert listing.tree.order == expected[-VISIBLE:]
+    assert listing.offset_fetches == 3
+
+
+def test_filtered_list_pages_only_the_matches(listing, database, userid):
+    listing.show(["f.folderName = ?"], ["Work"])
+    expected = ordered_ids(database, userid, " AND s.folderid = (SELECT folderid FROM Folder WHERE folderName = ?)",
+                           ("Work",))
+
+    assert listing.total == len(expected) > VISIBLE
+    seen = list(listing.tree.order)
+    for _ in range(listing.total - VISIBLE):
+        listing.on_scrollbar("scroll", "1", "units")
+        seen.append(listing.tree.order[-1])
+    assert seen == expected
+
+
+def test_empty_list(listing):
+    listing.show(["s.subscriptionName = ?"], ["nothing"])
+
+    assert listing.total == 0
+    assert listing.tree.order == []
+    assert listing.view.vscrollbar.position == (0, 1)